@@ -0,0 +1,161 @@
+"""
+Department attendance analytics bucketed by day, week or month.
+
+Counts are aggregated in the database. A bucket that has fully ended only
+changes if a past record is edited, so closed buckets are cached per
+(bucket size, bucket start) under a generation number. Writes to a past
+date, and employee changes, advance the generation once they commit. The
+generation is a shared counter (`hrms_lite.versions`), so the change
+reaches every worker. Only the currently open bucket, plus any uncached
+closed ones, are recomputed per request.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from hrms_lite import versions
+from .models import Attendance
+
+
+BUCKETS = ['day', 'week', 'month']
+DEFAULT_SPAN = {'day': 30, 'week': 12, 'month': 12}
+MAX_BUCKETS = 1000
+
+_GENERATION = 'attendance-analytics'
+# Entries of old generations are never read again; let them expire
+CACHE_TIMEOUT = 24 * 3600
+
+
+def bucket_start(bucket, date):
+    """Start date of the `bucket` containing `date`."""
+    if bucket == 'week':
+        return date - datetime.timedelta(days=date.weekday())
+    if bucket == 'month':
+        return date.replace(day=1)
+    return date
+
+
+def next_bucket_start(bucket, start):
+    """Start date of the bucket after the one starting at `start`."""
+    if bucket == 'week':
+        return start + datetime.timedelta(days=7)
+    if bucket == 'month':
+        return (start + datetime.timedelta(days=32)).replace(day=1)
+    return start + datetime.timedelta(days=1)
+
+
+def default_range(bucket, today):
+    """The last DEFAULT_SPAN buckets, ending with the current one."""
+    start = bucket_start(bucket, today)
+    for _ in range(DEFAULT_SPAN[bucket] - 1):
+        start = bucket_start(bucket, start - datetime.timedelta(days=1))
+    return start, today
+
+
+def _cache_key(generation, bucket, start):
+    return f'attendance-analytics:{generation}:{bucket}:{start.isoformat()}'
+
+
+def invalidate_dates(dates):
+    """Forget cached buckets containing any of `dates`, in every worker."""
+    today = timezone.localdate()
+    # Only closed buckets are cached, and a date in one is before today
+    if any(date is not None and date < today for date in dates):
+        invalidate_all()
+
+
+def invalidate_all():
+    """Forget every cached bucket (e.g. after an employee changes department)."""
+    versions.bump_on_commit(_GENERATION)
+
+
+def _aggregate(bucket, start, end):
+    """Return {bucket_start: {department: [present, absent]}} for [start, end]."""
+    if bucket == 'week':
+        period = TruncWeek('date')
+    elif bucket == 'month':
+        period = TruncMonth('date')
+    else:
+        period = F('date')
+
+    rows = (
+        Attendance.objects.filter(date__range=(start, end))
+        .order_by()
+        .annotate(period=period, department=F('employee__department'))
+        .values('period', 'department')
+        .annotate(
+            present=Count('id', filter=Q(status='present')),
+            absent=Count('id', filter=Q(status='absent'))
+        )
+    )
+    results = defaultdict(dict)
+    for row in rows:
+        period_start = row['period']
+        if isinstance(period_start, datetime.datetime):
+            period_start = period_start.date()
+        results[period_start][row['department']] = [row['present'], row['absent']]
+    return results
+
+
+def department_trends(bucket, start, end, department=None, today=None):
+    """
+    Present/absent counts per bucket and department between `start` and `end`.
+
+    The range is widened to whole buckets. Returns a list of dicts ordered
+    by period, then department.
+    """
+    today = today or timezone.localdate()
+    periods = []
+    period = bucket_start(bucket, start)
+    while period <= end:
+        periods.append(period)
+        period = next_bucket_start(bucket, period)
+
+    counts = {}
+    generation = versions.get(_GENERATION)
+    cached = cache.get_many([_cache_key(generation, bucket, period) for period in periods])
+    missing = []
+    for period in periods:
+        key = _cache_key(generation, bucket, period)
+        if key in cached:
+            counts[period] = cached[key]
+        else:
+            missing.append(period)
+
+    # Recompute contiguous runs of missing buckets with one query each
+    runs = []
+    for period in missing:
+        if runs and next_bucket_start(bucket, runs[-1][-1]) == period:
+            runs[-1].append(period)
+        else:
+            runs.append([period])
+    for run in runs:
+        run_end = next_bucket_start(bucket, run[-1]) - datetime.timedelta(days=1)
+        fresh = _aggregate(bucket, run[0], run_end)
+        closed = {}
+        for period in run:
+            counts[period] = fresh.get(period, {})
+            if next_bucket_start(bucket, period) <= today:
+                closed[_cache_key(generation, bucket, period)] = counts[period]
+        cache.set_many(closed, CACHE_TIMEOUT)
+
+    data = []
+    for period in periods:
+        for name, (present, absent) in sorted(counts[period].items()):
+            if department and name != department:
+                continue
+            total = present + absent
+            data.append({
+                'period': period.isoformat(),
+                'department': name,
+                'present': present,
+                'absent': absent,
+                'total': total,
+                'present_rate': round(present / total, 4) if total else None,
+            })
+    return data
@@ -0,0 +1,179 @@
+"""
+Async versions of the attendance read endpoints, for ASGI deployments.
+
+JSON GETs are answered with the async ORM and produce the same bytes as the
+views in `views`; every other request is delegated to those views.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from .filters import filter_attendance
+from .models import Attendance
+from .serializers import ATTENDANCE_LIST_COLUMNS, attendance_list_data
+from . import views
+from employees.models import Employee
+from hrms_lite import events
+from hrms_lite.async_views import async_read_view, json_response
+from hrms_lite.cache import cached_response
+from hrms_lite.conditional import version_condition
+from hrms_lite.fieldsets import FieldsetError
+from hrms_lite.pagination import PaginationError, apaginate_keyset, aget_total
+
+
+@version_condition('attendance', 'employees')
+@async_read_view(views.attendance_list_create)
+async def attendance_list_create(request):
+    """
+    GET: List attendance records with the same filters, pagination, `fields`
+         and `format` as `views.attendance_list_create`
+    POST: Create a new attendance record (delegated)
+    """
+    try:
+        fieldset = views.attendance_list_fieldset(request.GET)
+    except FieldsetError as exc:
+        return json_response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': {exc.param: [str(exc)]}
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    attendance = filter_attendance(Attendance.objects.all(), request.GET)
+
+    if 'cursor' in request.GET or 'page_size' in request.GET:
+        columns = fieldset.columns_with(views.ATTENDANCE_KEYSET_COLUMNS)
+        try:
+            page, next_cursor = await apaginate_keyset(
+                attendance.values_list(*columns), request.GET,
+                views.ATTENDANCE_KEYSET_ORDERING, views.attendance_cursor_values(columns)
+            )
+        except PaginationError as exc:
+            return json_response({
+                'success': False,
+                'error': {
+                    'status_code': 400,
+                    'message': 'Invalid pagination parameters',
+                    'details': {'pagination': [str(exc)]}
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        body = {'success': True, 'count': len(page)}
+        total = await aget_total(attendance, request.GET)
+        if total is not None:
+            body['total'] = total
+        body.update(next=next_cursor, data=fieldset.data(page))
+        return json_response(body)
+
+    rows = [row async for row in attendance.values_list(*fieldset.columns)]
+    return json_response({
+        'success': True,
+        'count': len(rows),
+        'data': fieldset.data(rows)
+    })
+
+
+@version_condition('attendance', 'employees')
+@async_read_view(views.attendance_by_employee)
+async def attendance_by_employee(request, employee_pk):
+    """
+    GET: List attendance records for a specific employee
+    """
+    employee = await Employee.objects.filter(pk=employee_pk).values(
+        'id', 'employee_id', 'full_name', 'department'
+    ).afirst()
+    if employee is None:
+        return json_response({
+            'success': False,
+            'error': {
+                'status_code': 404,
+                'message': f'Employee with ID {employee_pk} not found',
+                'details': {}
+            }
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    attendance = views.attendance_by_employee_queryset(request, employee_pk).order_by('-date')
+    data = attendance_list_data([row async for row in attendance.values_list(*ATTENDANCE_LIST_COLUMNS)])
+
+    # Status is either present or absent, so the summary comes from the rows
+    total_present = sum(1 for record in data if record['status'] == 'present')
+    return json_response({
+        'success': True,
+        'employee': employee,
+        'summary': {
+            'total_present': total_present,
+            'total_absent': len(data) - total_present,
+            'total_records': len(data)
+        },
+        'data': data
+    })
+
+
+@cached_response('attendance', 'employees')
+@async_read_view(views.attendance_summary)
+async def attendance_summary(request):
+    """
+    GET: Get attendance summary for all employees from the bitsets or rollups;
+         `month=YYYY-MM` for one month's totals
+    """
+    try:
+        month_date = views.parse_summary_month(request)
+    except ValueError:
+        return json_response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': {'month': ['Month must be in YYYY-MM format.']}
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    totals = await sync_to_async(views.attendance_summary_totals)(month_date)
+    employees = [emp async for emp in views.attendance_summary_queryset(month_date, rollups=totals is None)]
+    data = views.attendance_summary_data(employees, totals)
+    return json_response({
+        'success': True,
+        'count': len(data),
+        'data': data
+    })
+
+
+async def attendance_events(request):
+    """
+    GET: Server-sent event stream of attendance changes and updated summary
+         totals (see `live`). Resumes after the `Last-Event-ID` header (or
+         `last_event_id` parameter). Served under ASGI only.
+    """
+    if request.method != 'GET':
+        response = json_response({
+            'success': False,
+            'error': {
+                'status_code': 405,
+                'message': 'Method Not Allowed',
+                'details': {'detail': f'Method "{request.method}" not allowed.'}
+            }
+        }, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+        response['Allow'] = 'GET'
+        return response
+    if not events.enabled() or not isinstance(request, ASGIRequest):
+        # Under WSGI each open stream would hold a worker thread
+        return json_response({
+            'success': False,
+            'error': {
+                'status_code': 503,
+                'message': 'Live events are not available',
+                'details': {'non_field_errors': ['Live events need LIVE_EVENTS and the ASGI deployment.']}
+            }
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    response = StreamingHttpResponse(
+        events.get_broker().stream(last_event_id), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Ask nginx-style proxies not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
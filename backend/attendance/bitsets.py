@@ -0,0 +1,396 @@
+"""
+Packed per-employee, per-year attendance bitmaps.
+
+Each worker keeps, for every employee and calendar year, two 366-bit Python
+integers: `marked` has bit N set when a record exists for day N of the year
+(January 1 = bit 0), `present` when that record's status is present. Totals
+for any date range are then a mask and a popcount (`int.bit_count`), and
+questions across employees are ANDs and ORs of whole years at once; nothing
+touches the database.
+
+The bitmaps are kept in step with writes through `hrms_lite.memory_index`:
+the signal handlers and bulk write paths call `record_changes`, which logs
+the touched days once the transaction commits, and every worker reloads
+those days on its next read. Views ask `available()` first: while this
+worker's bitmaps are being built (on first use, or after `rebuild`), which
+happens in a background thread, they answer from the rollups and the
+attendance table instead.
+
+With ATTENDANCE_BITSETS_PERSIST the bitmaps are also stored in the
+`attendance_bitmaps` table within the writing transaction, and a build
+loads one row per employee-year instead of every record.
+"""
+
+import datetime
+from collections import defaultdict
+from functools import reduce
+
+from django.conf import settings
+from django.db import transaction
+
+from hrms_lite.memory_index import WorkerIndex
+from .models import Attendance, AttendanceBitmap
+
+
+# Keep IN (...) lists under SQLite's default bound-parameter limit
+CHUNK_SIZE = 900
+
+YEAR_BYTES = 46  # 366 bits
+
+
+def enabled():
+    return getattr(settings, 'ATTENDANCE_BITSETS', False)
+
+
+def persisted():
+    return getattr(settings, 'ATTENDANCE_BITSETS_PERSIST', False)
+
+
+def day_index(date):
+    """Bit position of `date` within its year."""
+    return date.timetuple().tm_yday - 1
+
+
+def year_mask(year, start=None, end=None):
+    """Bits of `year` that fall within [start, end]; open ends are unbounded."""
+    low = day_index(start) if start is not None and start.year == year else 0
+    high = day_index(end) if end is not None and end.year == year else 365
+    if (start is not None and start.year > year) or (end is not None and end.year < year) or low > high:
+        return 0
+    return (1 << (high + 1)) - (1 << low)
+
+
+def dates_of(bitmap, year):
+    """The dates whose bits are set in a year bitmap, in order."""
+    first = datetime.date(year, 1, 1)
+    dates = []
+    while bitmap:
+        lowest = bitmap & -bitmap
+        dates.append(first + datetime.timedelta(days=lowest.bit_length() - 1))
+        bitmap ^= lowest
+    return dates
+
+
+def _set_day(bitmaps, date, status):
+    """Set (status) or clear (status None) one day in a [present, marked] pair."""
+    bit = 1 << day_index(date)
+    if status is None:
+        bitmaps[0] &= ~bit
+        bitmaps[1] &= ~bit
+    else:
+        bitmaps[1] |= bit
+        if status == 'present':
+            bitmaps[0] |= bit
+        else:
+            bitmaps[0] &= ~bit
+
+
+def _apply(years, employee_id, date, status):
+    """`_set_day` in a {employee_id: {year: [present, marked]}} dict."""
+    _set_day(years[employee_id].setdefault(date.year, [0, 0]), date, status)
+
+
+def _build_from_records():
+    years = defaultdict(dict)
+    records = Attendance.objects.order_by().values_list('employee_id', 'date', 'status')
+    for employee_id, date, status in records.iterator(chunk_size=5000):
+        _apply(years, employee_id, date, status)
+    return years
+
+
+def _build_from_table():
+    years = defaultdict(dict)
+    rows = AttendanceBitmap.objects.values_list('employee_id', 'year', 'present', 'marked')
+    for employee_id, year, present, marked in rows.iterator(chunk_size=5000):
+        years[employee_id][year] = [
+            int.from_bytes(bytes(present), 'little'), int.from_bytes(bytes(marked), 'little')
+        ]
+    return years
+
+
+class AttendanceBitsets(WorkerIndex):
+    """The bitmaps of one worker; use the module-level functions."""
+
+    version_key = 'attendance-bitsets:version'
+
+    def __init__(self):
+        super().__init__()
+        self.years = defaultdict(dict)
+
+    def load(self):
+        return _build_from_table() if persisted() else _build_from_records()
+
+    def install(self, years):
+        self.years = years
+
+    def dump_keys(self, days):
+        return [[employee_id, date and date.isoformat()] for employee_id, date in days]
+
+    def load_keys(self, data):
+        return {(employee_id, date and datetime.date.fromisoformat(date)) for employee_id, date in data}
+
+    def refresh(self, days):
+        """Reload (employee_id, date) days; a date of None reloads all of the employee's."""
+        by_date = defaultdict(list)
+        for employee_id, date in days:
+            by_date[date].append(employee_id)
+        employee_ids = by_date.pop(None, [])
+        for start in range(0, len(employee_ids), CHUNK_SIZE):
+            chunk = employee_ids[start:start + CHUNK_SIZE]
+            for employee_id in chunk:
+                self.years.pop(employee_id, None)
+            records = Attendance.objects.filter(employee_id__in=chunk).values_list('employee_id', 'date', 'status')
+            for employee_id, date, status in records:
+                _apply(self.years, employee_id, date, status)
+        for date, employee_ids in by_date.items():
+            for start in range(0, len(employee_ids), CHUNK_SIZE):
+                chunk = employee_ids[start:start + CHUNK_SIZE]
+                statuses = dict(Attendance.objects.filter(
+                    date=date, employee_id__in=chunk).values_list('employee_id', 'status'))
+                for employee_id in chunk:
+                    _apply(self.years, employee_id, date, statuses.get(employee_id))
+
+
+_engine = AttendanceBitsets()
+
+
+def available():
+    """
+    Whether the queries below can be answered now: the bitsets are enabled
+    and this worker's are current. Otherwise a build is started in the
+    background, and callers should read the rollups or records instead.
+    """
+    return enabled() and _engine.catch_up()
+
+
+def warm():
+    """Build (or bring up to date) this worker's bitmaps in the calling thread."""
+    _engine.sync()
+
+
+def _persist(changes):
+    """Apply changes to the attendance_bitmaps rows, in the current transaction."""
+    by_row = defaultdict(list)
+    for employee_id, date, status in changes:
+        by_row[(employee_id, date.year)].append((date, status))
+
+    with transaction.atomic():
+        # Only setting a bit needs a new row; skipping clears also keeps
+        # cascading employee deletes from re-creating rows
+        new_rows = [key for key, updates in by_row.items() if any(status for _, status in updates)]
+        empty = bytes(YEAR_BYTES)
+        for start in range(0, len(new_rows), CHUNK_SIZE):
+            AttendanceBitmap.objects.bulk_create(
+                [AttendanceBitmap(employee_id=employee_id, year=year, present=empty, marked=empty)
+                 for employee_id, year in new_rows[start:start + CHUNK_SIZE]],
+                ignore_conflicts=True
+            )
+
+        by_year = defaultdict(list)
+        for employee_id, year in by_row:
+            by_year[year].append(employee_id)
+        for year, employee_ids in by_year.items():
+            for start in range(0, len(employee_ids), CHUNK_SIZE):
+                rows = list(AttendanceBitmap.objects.select_for_update().filter(
+                    year=year, employee_id__in=employee_ids[start:start + CHUNK_SIZE]
+                ))
+                for row in rows:
+                    bitmaps = [
+                        int.from_bytes(bytes(row.present), 'little'), int.from_bytes(bytes(row.marked), 'little')
+                    ]
+                    for date, status in by_row[(row.employee_id, year)]:
+                        _set_day(bitmaps, date, status)
+                    row.present = bitmaps[0].to_bytes(YEAR_BYTES, 'little')
+                    row.marked = bitmaps[1].to_bytes(YEAR_BYTES, 'little')
+                AttendanceBitmap.objects.bulk_update(rows, ['present', 'marked'])
+
+
+def record_changes(changes):
+    """
+    Record attendance writes made in the current transaction, as
+    (employee_id, date, status) tuples; status None means the record is gone.
+    """
+    if not enabled():
+        return
+    if persisted():
+        _persist(changes)
+    _engine.publish_on_commit({(employee_id, date) for employee_id, date, _ in changes})
+
+
+def record_saved(instance, created):
+    """Record a saved attendance record; call before the rollups forget its previous state."""
+    previous = None if created else getattr(instance, '_rollup_state', None)
+    if not created and previous is None:
+        # We don't know which day the record used to be on
+        refresh_employees([instance.employee_id])
+        return
+    changes = []
+    if previous is not None and previous[:2] != (instance.employee_id, instance.date):
+        changes.append((previous[0], previous[1], None))
+    changes.append((instance.employee_id, instance.date, instance.status))
+    record_changes(changes)
+
+
+def record_deleted(instance):
+    previous = getattr(instance, '_rollup_state', None) or (instance.employee_id, instance.date)
+    record_changes([(previous[0], previous[1], None)])
+
+
+def _write_table(years, batch_size=2000):
+    AttendanceBitmap.objects.bulk_create(
+        (AttendanceBitmap(employee_id=employee_id, year=year,
+                          present=present.to_bytes(YEAR_BYTES, 'little'),
+                          marked=marked.to_bytes(YEAR_BYTES, 'little'))
+         for employee_id, employee_years in years.items()
+         for year, (present, marked) in employee_years.items() if marked),
+        batch_size=batch_size
+    )
+
+
+def refresh_employees(employee_ids):
+    """Rebuild the bitmaps of the given employees from their attendance records."""
+    if not enabled():
+        return
+    if persisted():
+        for start in range(0, len(employee_ids), CHUNK_SIZE):
+            chunk = employee_ids[start:start + CHUNK_SIZE]
+            years = defaultdict(dict)
+            for employee_id, date, status in Attendance.objects.filter(
+                    employee_id__in=chunk).values_list('employee_id', 'date', 'status'):
+                _apply(years, employee_id, date, status)
+            AttendanceBitmap.objects.filter(employee_id__in=chunk).delete()
+            _write_table(years)
+    _engine.publish_on_commit({(employee_id, None) for employee_id in employee_ids})
+
+
+def remove_employees(employee_ids):
+    """Drop the bitmaps of employees whose records are going away in bulk."""
+    if not enabled():
+        return
+    if persisted():
+        for start in range(0, len(employee_ids), CHUNK_SIZE):
+            AttendanceBitmap.objects.filter(employee_id__in=employee_ids[start:start + CHUNK_SIZE]).delete()
+    _engine.publish_on_commit({(employee_id, None) for employee_id in employee_ids})
+
+
+def rebuild():
+    """Recompute the stored bitmaps (if persisted) and make every worker rebuild its own."""
+    if persisted():
+        with transaction.atomic():
+            AttendanceBitmap.objects.all().delete()
+            _write_table(_build_from_records())
+    _engine.publish_on_commit(None)
+
+
+def verify():
+    """
+    Compare the bitmaps (stored, if persisted, else this worker's) against the
+    attendance records. Returns human-readable mismatches (empty if consistent).
+    """
+    expected = _build_from_records()
+    if persisted():
+        stored = _build_from_table()
+    else:
+        _engine.sync()
+        stored = _engine.years
+    mismatches = []
+    for employee_id in expected.keys() | stored.keys():
+        want = {year: bitmaps for year, bitmaps in expected.get(employee_id, {}).items() if bitmaps[1]}
+        have = {year: bitmaps for year, bitmaps in stored.get(employee_id, {}).items() if bitmaps[1]}
+        for year in want.keys() | have.keys():
+            if want.get(year) != have.get(year):
+                mismatches.append(f'employee {employee_id} year {year}: bitmaps differ')
+    return mismatches
+
+
+# Queries; check `available()` first
+
+def employee_totals(employee_id, start=None, end=None):
+    """(present, absent) for one employee within [start, end]."""
+    with _engine.lock:
+        return _totals(_engine.years.get(employee_id, {}), start, end)
+
+
+def _totals(employee_years, start, end):
+    present = absent = 0
+    for year, (present_bits, marked_bits) in employee_years.items():
+        mask = year_mask(year, start, end)
+        if mask:
+            present += (present_bits & mask).bit_count()
+            absent += (marked_bits & ~present_bits & mask).bit_count()
+    return present, absent
+
+
+def totals(start=None, end=None):
+    """{employee_id: (present, absent)} within [start, end], for every employee with records."""
+    with _engine.lock:
+        return {
+            employee_id: _totals(employee_years, start, end)
+            for employee_id, employee_years in _engine.years.items()
+        }
+
+
+def absent_on(date):
+    """Ids of the employees marked absent on `date`."""
+    bit = 1 << day_index(date)
+    absent = []
+    with _engine.lock:
+        for employee_id, employee_years in _engine.years.items():
+            present_bits, marked_bits = employee_years.get(date.year, [0, 0])
+            if marked_bits & ~present_bits & bit:
+                absent.append(employee_id)
+    return absent
+
+
+def day_counts(date):
+    """(present, absent) across all employees on `date`."""
+    bit = 1 << day_index(date)
+    present = absent = 0
+    with _engine.lock:
+        for employee_years in _engine.years.values():
+            present_bits, marked_bits = employee_years.get(date.year, [0, 0])
+            if marked_bits & bit:
+                if present_bits & bit:
+                    present += 1
+                else:
+                    absent += 1
+    return present, absent
+
+
+def status_codes(employee_ids, start, end, codes='PA-'):
+    """
+    One string per employee with a character per day of [start, end], which
+    must lie within one year: codes[0] present, codes[1] absent, codes[2]
+    not marked.
+    """
+    low = day_index(start)
+    days = (end - start).days + 1
+    mask = (1 << days) - 1
+    strings = []
+    with _engine.lock:
+        for employee_id in employee_ids:
+            present_bits, marked_bits = _engine.years.get(employee_id, {}).get(start.year, [0, 0])
+            present_bits = (present_bits >> low) & mask
+            absent_bits = (marked_bits >> low) & mask & ~present_bits
+            strings.append(''.join(
+                codes[0] if present_bits >> day & 1 else codes[1] if absent_bits >> day & 1 else codes[2]
+                for day in range(days)
+            ))
+    return strings
+
+
+def combine(employee_ids, year, every=True, status='present'):
+    """
+    Dates in `year` on which every (or, with every=False, any) of the
+    employees was present (or absent), as one AND/OR over their bitmaps.
+    """
+    with _engine.lock:
+        bitmaps = []
+        for employee_id in employee_ids:
+            present_bits, marked_bits = _engine.years.get(employee_id, {}).get(year, [0, 0])
+            bitmaps.append(present_bits if status == 'present' else marked_bits & ~present_bits)
+    if not bitmaps:
+        return []
+    if every:
+        return dates_of(reduce(lambda left, right: left & right, bitmaps), year)
+    return dates_of(reduce(lambda left, right: left | right, bitmaps), year)
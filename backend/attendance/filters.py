@@ -0,0 +1,34 @@
+"""
+Query-string filters shared by the attendance list and export endpoints.
+"""
+
+
+def filter_attendance(queryset, query_params):
+    """
+    Apply the `date`, `employee_id`, `status`, `start_date` and `end_date`
+    query parameters to an attendance queryset.
+    """
+    # Filter by date (bonus feature)
+    date_filter = query_params.get('date')
+    if date_filter:
+        queryset = queryset.filter(date=date_filter)
+
+    # Filter by date range
+    start_date = query_params.get('start_date')
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    end_date = query_params.get('end_date')
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+
+    # Filter by employee
+    employee_id = query_params.get('employee_id')
+    if employee_id:
+        queryset = queryset.filter(employee_id=employee_id)
+
+    # Filter by status
+    status_filter = query_params.get('status')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    return queryset
@@ -0,0 +1,96 @@
+"""
+Live attendance events, streamed by `GET /api/attendance/events/` (see
+`hrms_lite.events`).
+
+- `attendance`: `{"created": [...], "updated": [...], "deleted": [ids]}`,
+  records with every field of ATTENDANCE_FIELDS.
+- `summary`: `{"employees": [{"employee_id", "total_present",
+  "total_absent", "total_records"}]}`, the new all-time totals of the
+  employees whose records changed, to merge into `/api/attendance/summary/`
+  by `employee_id`.
+- `reset`: bulk changes without per-record events; refetch.
+
+Events are built once the write commits, from what was committed, and only
+when a stream could receive them.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+
+from hrms_lite import events
+from hrms_lite.fieldsets import Fieldset
+from .models import Attendance, AttendanceTotals
+from .serializers import ATTENDANCE_FIELDS, rows_in_chunks
+
+
+RECORD_FIELDS = list(ATTENDANCE_FIELDS)
+
+
+def record_changes(created=(), updated=(), deleted=()):
+    """
+    Publish attendance changes once the transaction commits. `created` and
+    `updated` hold (employee pk, date) keys, `deleted` (record pk, employee pk)
+    pairs.
+    """
+    if events.enabled():
+        transaction.on_commit(lambda: publish_changes(created, updated, deleted))
+
+
+def record_marked(date, employee_ids, existing):
+    """Publish a bulk mark; `existing` holds the employees already marked that day."""
+    record_changes(
+        created=[(employee_id, date) for employee_id in employee_ids if employee_id not in existing],
+        updated=[(employee_id, date) for employee_id in employee_ids if employee_id in existing],
+    )
+
+
+def record_reset():
+    if events.enabled():
+        transaction.on_commit(lambda: events.publish('reset', {}))
+
+
+def read_records(keys):
+    """{(employee pk, date): row} of the records with these keys."""
+    fieldset = Fieldset(ATTENDANCE_FIELDS, RECORD_FIELDS)
+    by_date = defaultdict(list)
+    for employee_id, date in keys:
+        by_date[date].append(employee_id)
+    employee_index = fieldset.columns.index('employee_id')
+    rows = {}
+    for date, employee_ids in by_date.items():
+        for row in rows_in_chunks(Attendance.objects.filter(date=date), 'employee_id', employee_ids,
+                                  *fieldset.columns):
+            rows[(row[employee_index], date)] = row
+    return rows
+
+
+def publish_changes(created, updated, deleted):
+    if not events.active():
+        return
+    fieldset = Fieldset(ATTENDANCE_FIELDS, RECORD_FIELDS)
+    rows = read_records([*created, *updated])
+    events.publish('attendance', {
+        'created': fieldset.data([rows[key] for key in created if key in rows]),
+        'updated': fieldset.data([rows[key] for key in updated if key in rows]),
+        'deleted': [pk for pk, _ in deleted],
+    })
+
+    employee_ids = {employee_id for employee_id, _ in [*created, *updated, *deleted]}
+    totals = {
+        employee_id: (present, absent)
+        for employee_id, present, absent in rows_in_chunks(
+            AttendanceTotals.objects.all(), 'employee_id', employee_ids,
+            'employee_id', 'total_present', 'total_absent'
+        )
+    }
+    summary = []
+    for employee_id in sorted(employee_ids):
+        present, absent = totals.get(employee_id, (0, 0))
+        summary.append({
+            'employee_id': employee_id,
+            'total_present': present,
+            'total_absent': absent,
+            'total_records': present + absent,
+        })
+    events.publish('summary', {'employees': summary})
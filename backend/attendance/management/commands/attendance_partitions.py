@@ -0,0 +1,74 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from attendance import partitions
+
+
+def parse_month(value):
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise CommandError(f'Invalid month {value!r}; use YYYY-MM.')
+
+
+class Command(BaseCommand):
+    help = (
+        'Manage the monthly partitions of the attendance table (PostgreSQL, '
+        'ATTENDANCE_PARTITIONING): show them, convert the table, create upcoming '
+        'months, or detach/drop old ones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['status', 'convert', 'create', 'detach', 'drop'])
+        parser.add_argument('--ahead', type=int, default=3,
+                            help='Months after the current one to create partitions for (convert, create)')
+        parser.add_argument('--before', help='Detach or drop partitions of months before this one (YYYY-MM)')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='Drop without asking for confirmation')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Attendance partitioning requires PostgreSQL.')
+        action = options['action']
+
+        if action == 'convert':
+            if partitions.convert(ahead=options['ahead']):
+                self.stdout.write(self.style.SUCCESS('Attendance table converted to monthly partitions.'))
+            else:
+                self.stdout.write('Attendance table is already partitioned.')
+            return
+
+        if not partitions.is_partitioned():
+            raise CommandError('The attendance table is not partitioned; run `attendance_partitions convert`.')
+
+        if action == 'status':
+            for partition in partitions.list_partitions():
+                bounds = f'{partition.start} .. {partition.end}' if partition.start else 'DEFAULT'
+                self.stdout.write(f'{partition.name:28} {bounds:26} ~{partition.rows} rows')
+            return
+
+        if action == 'create':
+            created = partitions.ensure_partitions(options['ahead'])
+            for month in created:
+                self.stdout.write(f'Created {partitions.partition_name(month)}')
+            self.stdout.write(self.style.SUCCESS(f'{len(created)} partitions created.'))
+            return
+
+        if not options['before']:
+            raise CommandError(f'{action} requires --before YYYY-MM.')
+        before = parse_month(options['before'])
+        if action == 'drop' and options['interactive']:
+            confirm = input(
+                f'This permanently deletes all attendance records before {before:%Y-%m}. '
+                "Type 'yes' to continue: "
+            )
+            if confirm != 'yes':
+                raise CommandError('Drop cancelled.')
+
+        retired = partitions.retire_partitions(before, drop=action == 'drop')
+        done = 'dropped' if action == 'drop' else 'detached'
+        for partition in retired:
+            self.stdout.write(f'{done.capitalize()} {partition.name}')
+        self.stdout.write(self.style.SUCCESS(f'{len(retired)} partitions {done}.'))
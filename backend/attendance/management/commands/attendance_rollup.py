@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance import bitsets, rollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild or verify the precomputed attendance totals and bitsets behind '
+        '/api/attendance/summary/.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['rebuild', 'verify'])
+
+    def handle(self, *args, **options):
+        if options['action'] == 'rebuild':
+            rollup.rebuild()
+            bitsets.rebuild()
+            self.stdout.write(self.style.SUCCESS('Attendance rollups rebuilt.'))
+            return
+
+        mismatches = rollup.verify() + bitsets.verify()
+        for mismatch in mismatches[:50]:
+            self.stderr.write(mismatch)
+        if mismatches:
+            raise CommandError(
+                f'{len(mismatches)} rollup rows are out of date; run `attendance_rollup rebuild`.'
+            )
+        self.stdout.write(self.style.SUCCESS('Attendance rollups are consistent.'))
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+
+def populate_rollups(apps, schema_editor):
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceTotals = apps.get_model('attendance', 'AttendanceTotals')
+    MonthlyAttendanceTotals = apps.get_model('attendance', 'MonthlyAttendanceTotals')
+    counts = {
+        'present': Count('id', filter=Q(status='present')),
+        'absent': Count('id', filter=Q(status='absent')),
+    }
+
+    AttendanceTotals.objects.bulk_create(
+        (AttendanceTotals(employee_id=row['employee_id'], total_present=row['present'], total_absent=row['absent'])
+         for row in Attendance.objects.order_by().values('employee_id').annotate(**counts).iterator()),
+        batch_size=2000
+    )
+    MonthlyAttendanceTotals.objects.bulk_create(
+        (MonthlyAttendanceTotals(employee_id=row['employee_id'], month=row['month'],
+                                 total_present=row['present'], total_absent=row['absent'])
+         for row in Attendance.objects.order_by().annotate(month=TruncMonth('date'))
+         .values('employee_id', 'month').annotate(**counts).iterator()),
+        batch_size=2000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0001_initial'),
+        ('attendance', '0002_attendance_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceTotals',
+            fields=[
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attendance_totals', serialize=False, to='employees.employee')),
+                ('total_present', models.IntegerField(default=0)),
+                ('total_absent', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Attendance Totals',
+                'verbose_name_plural': 'Attendance Totals',
+                'db_table': 'attendance_totals',
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyAttendanceTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('total_present', models.IntegerField(default=0)),
+                ('total_absent', models.IntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_attendance_totals', to='employees.employee')),
+            ],
+            options={
+                'verbose_name': 'Monthly Attendance Totals',
+                'verbose_name_plural': 'Monthly Attendance Totals',
+                'db_table': 'attendance_monthly_totals',
+                'ordering': ['-month'],
+                'unique_together': {('employee', 'month')},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
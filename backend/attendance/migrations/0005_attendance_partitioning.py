@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_attendance(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql' or not settings.ATTENDANCE_PARTITIONING:
+        return
+    from attendance import partitions
+    partitions.convert(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    Convert `attendance` to a table partitioned by month when
+    ATTENDANCE_PARTITIONING is on. No model state changes: Django still
+    sees `id` as the primary key.
+    """
+
+    dependencies = [
+        ('attendance', '0004_attendance_date_status_index'),
+    ]
+
+    operations = [
+        # Reversing leaves the table partitioned; it behaves the same
+        migrations.RunPython(partition_attendance, migrations.RunPython.noop),
+    ]
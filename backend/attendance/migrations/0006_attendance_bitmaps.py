@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0001_initial'),
+        ('attendance', '0005_attendance_partitioning'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('present', models.BinaryField()),
+                ('marked', models.BinaryField()),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_bitmaps', to='employees.employee')),
+            ],
+            options={
+                'verbose_name': 'Attendance Bitmap',
+                'verbose_name_plural': 'Attendance Bitmaps',
+                'db_table': 'attendance_bitmaps',
+                'unique_together': {('employee', 'year')},
+            },
+        ),
+    ]
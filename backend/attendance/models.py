@@ -2,9 +2,23 @@ from django.db import models
 from employees.models import Employee
 
 
+class AttendanceManager(models.Manager):
+    """Records of employees that have not been removed."""
+
+    def get_queryset(self):
+        # One uncorrelated subquery, the same SQL in every context and no
+        # join: it reads the few removed employees (usually none) from the
+        # partial `employees_removed_idx`, once per query
+        return super().get_queryset().exclude(
+            employee_id__in=Employee.all_objects.filter(deleted_at__isnull=False).values('pk')
+        )
+
+
 class Attendance(models.Model):
     """
-    Attendance model for tracking employee attendance.
+    Attendance model for tracking employee attendance. `objects` hides the
+    records of removed employees until they are purged; `all_objects`
+    includes them.
     """
     STATUS_CHOICES = [
         ('present', 'Present'),
@@ -29,12 +43,119 @@ class Attendance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AttendanceManager()
+    all_objects = models.Manager()
+
     class Meta:
         db_table = 'attendance'
         ordering = ['-date', '-created_at']
         verbose_name = 'Attendance'
         verbose_name_plural = 'Attendance Records'
         unique_together = ['employee', 'date']  # One record per employee per day
+        indexes = [
+            # Backs keyset pagination of the attendance list
+            models.Index(fields=['-date', '-created_at', 'id'], name='attendance_keyset_idx'),
+            # Date-range analytics grouped by status; (employee, date) is
+            # already covered by the unique constraint's index
+            models.Index(fields=['date', 'status'], name='attendance_date_status_idx'),
+            # Change stream read by delta sync
+            models.Index(fields=['updated_at', 'id'], name='attendance_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.employee.employee_id} - {self.date} - {self.status}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rollup_state()
+        return instance
+
+    def remember_rollup_state(self):
+        """
+        Record the values the attendance rollups currently count for this row,
+        so a later save or delete can apply the right delta.
+        """
+        if {'employee_id', 'date', 'status'} <= self.__dict__.keys():
+            self._rollup_state = (self.employee_id, self.date, self.status)
+        else:
+            self._rollup_state = None
+
+
+class AttendanceTotals(models.Model):
+    """
+    Lifetime attendance counts for one employee.
+
+    Maintained incrementally from `Attendance` writes (see `attendance.rollup`)
+    so the summary endpoint reads one row per employee instead of aggregating
+    every attendance record.
+    """
+    employee = models.OneToOneField(
+        Employee,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='attendance_totals'
+    )
+    total_present = models.IntegerField(default=0)
+    total_absent = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'attendance_totals'
+        verbose_name = 'Attendance Totals'
+        verbose_name_plural = 'Attendance Totals'
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.total_present} present / {self.total_absent} absent"
+
+
+class MonthlyAttendanceTotals(models.Model):
+    """
+    Attendance counts for one employee in one calendar month.
+    """
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='monthly_attendance_totals'
+    )
+    month = models.DateField(help_text="First day of the month")
+    total_present = models.IntegerField(default=0)
+    total_absent = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'attendance_monthly_totals'
+        ordering = ['-month']
+        verbose_name = 'Monthly Attendance Totals'
+        verbose_name_plural = 'Monthly Attendance Totals'
+        unique_together = ['employee', 'month']
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.month:%Y-%m} - {self.total_present} present / {self.total_absent} absent"
+
+
+class AttendanceBitmap(models.Model):
+    """
+    Packed attendance of one employee in one calendar year (see
+    `attendance.bitsets`): bit N of `marked` is set when a record exists for
+    day N of the year (January 1 = bit 0), and the same bit of `present` when
+    its status is present.
+
+    Only maintained with ATTENDANCE_BITSETS_PERSIST, so workers can load
+    the bitsets without scanning every attendance record.
+    """
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='attendance_bitmaps'
+    )
+    year = models.IntegerField()
+    present = models.BinaryField()
+    marked = models.BinaryField()
+
+    class Meta:
+        db_table = 'attendance_bitmaps'
+        verbose_name = 'Attendance Bitmap'
+        verbose_name_plural = 'Attendance Bitmaps'
+        unique_together = ['employee', 'year']
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.year}"
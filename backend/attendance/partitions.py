@@ -0,0 +1,222 @@
+"""
+Monthly range partitioning of the `attendance` table on PostgreSQL.
+
+Optional (`ATTENDANCE_PARTITIONING=True`): migration 0005 converts the table,
+or run `manage.py attendance_partitions convert` later. Afterwards
+`attendance` is a partitioned table with
+
+- one partition per calendar month, named `attendance_yYYYYmMM`, so
+  date-bounded queries only scan the months they touch;
+- an `attendance_default` partition catching dates no monthly partition
+  covers yet;
+- the primary key widened to `(id, date)`, because PostgreSQL requires
+  every unique constraint to include the partition key. `(employee, date)`
+  uniqueness is unaffected and `id` stays unique through its sequence.
+
+`manage.py attendance_partitions create` adds partitions for upcoming months
+(run it monthly, e.g. from cron); `detach` and `drop` retire old months and
+take their records out of the rollups and bitsets.
+"""
+
+import collections
+import datetime
+import re
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from hrms_lite.cache import bump_version_on_commit
+from sync import tombstones
+from . import analytics, bitsets, live, rollup
+from .models import Attendance
+
+
+TABLE = Attendance._meta.db_table
+PARTITION_COLUMN = 'date'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+Partition = collections.namedtuple('Partition', 'name start end rows')
+
+_BOUND_RE = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+
+def partition_name(month):
+    return f'{TABLE}_y{month:%Y}m{month:%m}'
+
+
+def add_months(month, count):
+    for _ in range(count):
+        month = analytics.next_bucket_start('month', month)
+    return month
+
+
+def is_partitioned(conn=connection):
+    with conn.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def list_partitions(conn=connection):
+    """Partitions of the attendance table, oldest first; the default partition has no bounds."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), GREATEST(c.reltuples, 0)::bigint '
+            'FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = %s::regclass',
+            [TABLE]
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound, estimate in rows:
+        match = _BOUND_RE.search(bound)
+        if match:
+            start, end = (datetime.date.fromisoformat(value) for value in match.groups())
+        else:
+            start = end = None
+        partitions.append(Partition(name, start, end, estimate))
+    return sorted(partitions, key=lambda partition: (partition.start is None, partition.start))
+
+
+def convert(conn=connection, ahead=3):
+    """
+    Rebuild the attendance table as a partitioned table, keeping its rows,
+    constraints and indexes. Returns False if it already is one.
+
+    Runs in one transaction and holds an exclusive lock on the table while
+    the rows are copied, so schedule it for a quiet period.
+    """
+    if conn.vendor != 'postgresql':
+        raise ValueError('Attendance partitioning requires PostgreSQL.')
+    quote = conn.ops.quote_name
+    table = quote(TABLE)
+    staging = quote(f'{TABLE}_partitioned')
+    sequence = f'{TABLE}_id_seq'
+
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        if is_partitioned(conn):
+            return False
+        cursor.execute(f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'SELECT MIN({quote(PARTITION_COLUMN)}), MAX(id) FROM {table}')
+        first_date, max_id = cursor.fetchone()
+
+        # Definitions of everything dropped with the old table, except the
+        # primary key, which has to include the partition key now
+        cursor.execute(
+            'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+            "WHERE conrelid = %s::regclass AND contype <> 'p' ORDER BY conname",
+            [TABLE]
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            'SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i '
+            'WHERE i.indrelid = %s::regclass '
+            'AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid) '
+            'ORDER BY i.indexrelid',
+            [TABLE]
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(
+            f'CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({quote(PARTITION_COLUMN)})'
+        )
+        month = rollup.month_start(first_date or timezone.localdate())
+        last = add_months(rollup.month_start(timezone.localdate()), ahead)
+        while month <= last:
+            next_month = add_months(month, 1)
+            cursor.execute(
+                f'CREATE TABLE {quote(partition_name(month))} PARTITION OF {staging} '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+            )
+            month = next_month
+        cursor.execute(f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {staging} DEFAULT')
+
+        cursor.execute(f'INSERT INTO {staging} SELECT * FROM {table}')
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute(f'ALTER TABLE {staging} RENAME TO {table}')
+
+        # Identity columns are not supported on partitioned tables (before
+        # PostgreSQL 17); an owned sequence behaves the same for Django
+        cursor.execute(f'CREATE SEQUENCE {quote(sequence)} OWNED BY {table}.id')
+        cursor.execute('SELECT setval(%s, %s, false)', [sequence, (max_id or 0) + 1])
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+
+        cursor.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {quote(TABLE + "_pkey")} '
+            f'PRIMARY KEY (id, {quote(PARTITION_COLUMN)})'
+        )
+        for name, definition in constraints:
+            cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}')
+        for definition in indexes:
+            cursor.execute(definition)
+        cursor.execute(f'ANALYZE {table}')
+    return True
+
+
+def create_partition(month, conn=connection):
+    """
+    Add the partition for `month`. Rows for that month that already landed
+    in the default partition are moved into it.
+    """
+    quote = conn.ops.quote_name
+    name = quote(partition_name(month))
+    bounds = f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        if not any(partition.start is None for partition in list_partitions(conn)):
+            cursor.execute(f'CREATE TABLE {name} PARTITION OF {quote(TABLE)} FOR VALUES {bounds}')
+            return
+        cursor.execute(f'CREATE TABLE {name} (LIKE {quote(TABLE)} INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} '
+            f'WHERE {quote(PARTITION_COLUMN)} >= %s AND {quote(PARTITION_COLUMN)} < %s RETURNING *) '
+            f'INSERT INTO {name} SELECT * FROM moved',
+            [month, add_months(month, 1)]
+        )
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} ATTACH PARTITION {name} FOR VALUES {bounds}')
+
+
+def ensure_partitions(ahead=3, conn=connection):
+    """Create any missing partitions from the current month to `ahead` months out; returns the new months."""
+    existing = {partition.start for partition in list_partitions(conn)}
+    month = rollup.month_start(timezone.localdate())
+    created = []
+    for _ in range(ahead + 1):
+        if month not in existing:
+            create_partition(month, conn)
+            created.append(month)
+        month = add_months(month, 1)
+    return created
+
+
+def retire_partitions(before, drop=False, conn=connection):
+    """
+    Detach (or drop) every monthly partition ending on or before `before`.
+
+    The removed records are subtracted from the rollups and the bitsets. A detached
+    partition stays in the database as a plain table; if it is attached
+    again, run `attendance_rollup rebuild`.
+    """
+    quote = conn.ops.quote_name
+    retired = [
+        partition for partition in list_partitions(conn)
+        if partition.end is not None and partition.end <= before
+    ]
+    if not retired:
+        return []
+
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        for partition in retired:
+            rollup.remove_months(partition.start, partition.end)
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(partition.name)}')
+            if drop:
+                cursor.execute(f'DROP TABLE {quote(partition.name)}')
+        bitsets.rebuild()
+        # The retired records leave no tombstones
+        tombstones.record_reset()
+        live.record_reset()
+        bump_version_on_commit('attendance')
+        transaction.on_commit(analytics.invalidate_all, using=conn.alias)
+    return retired
@@ -0,0 +1,256 @@
+"""
+Incrementally maintained attendance rollups.
+
+`AttendanceTotals` (per employee) and `MonthlyAttendanceTotals` (per employee
+per month) are kept current by applying +/-1 deltas whenever an attendance
+record is created, changes status or date, or is deleted. Deltas are applied
+set-based: one UPDATE per distinct delta, so a bulk write of thousands of
+records costs a handful of queries.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import Attendance, AttendanceTotals, MonthlyAttendanceTotals
+
+
+# Keep IN (...) lists under SQLite's default bound-parameter limit
+CHUNK_SIZE = 900
+
+
+def month_start(date):
+    """First day of the month containing `date`."""
+    if isinstance(date, str):
+        date = datetime.date.fromisoformat(date)
+    return date.replace(day=1)
+
+
+def status_delta(status, sign=1):
+    """(present, absent) delta for adding (sign=1) or removing (sign=-1) a status."""
+    if status == 'present':
+        return (sign, 0)
+    if status == 'absent':
+        return (0, sign)
+    return (0, 0)
+
+
+def record_deltas(deltas, employee_id, date, status, sign=1):
+    """Accumulate the delta for one record into a {(employee_id, month): (present, absent)} dict."""
+    present, absent = status_delta(status, sign)
+    key = (employee_id, month_start(date))
+    current = deltas.get(key, (0, 0))
+    deltas[key] = (current[0] + present, current[1] + absent)
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), CHUNK_SIZE):
+        yield values[start:start + CHUNK_SIZE]
+
+
+def _increment(queryset, present, absent):
+    return queryset.update(
+        total_present=F('total_present') + present,
+        total_absent=F('total_absent') + absent
+    )
+
+
+def _apply_totals(groups):
+    for (present, absent), employee_ids in groups.items():
+        for chunk in _chunks(employee_ids):
+            updated = _increment(AttendanceTotals.objects.filter(employee_id__in=chunk), present, absent)
+            if updated == len(chunk) or (present <= 0 and absent <= 0):
+                # Decrements never need a new row; skipping them also keeps
+                # cascading employee deletes from re-creating totals rows
+                continue
+            existing = set(
+                AttendanceTotals.objects.filter(employee_id__in=chunk).values_list('employee_id', flat=True)
+            ) if updated else set()
+            missing = [employee_id for employee_id in chunk if employee_id not in existing]
+            AttendanceTotals.objects.bulk_create(
+                [AttendanceTotals(employee_id=employee_id) for employee_id in missing],
+                ignore_conflicts=True
+            )
+            _increment(AttendanceTotals.objects.filter(employee_id__in=missing), present, absent)
+
+
+def _apply_monthly(groups):
+    for (month, present, absent), employee_ids in groups.items():
+        monthly = MonthlyAttendanceTotals.objects.filter(month=month)
+        for chunk in _chunks(employee_ids):
+            updated = _increment(monthly.filter(employee_id__in=chunk), present, absent)
+            if updated == len(chunk) or (present <= 0 and absent <= 0):
+                continue
+            existing = set(
+                monthly.filter(employee_id__in=chunk).values_list('employee_id', flat=True)
+            ) if updated else set()
+            missing = [employee_id for employee_id in chunk if employee_id not in existing]
+            MonthlyAttendanceTotals.objects.bulk_create(
+                [MonthlyAttendanceTotals(employee_id=employee_id, month=month) for employee_id in missing],
+                ignore_conflicts=True
+            )
+            _increment(monthly.filter(employee_id__in=missing), present, absent)
+
+
+def apply_deltas(deltas):
+    """
+    Apply a {(employee_id, month): (present, absent)} dict of deltas to both rollups.
+    """
+    totals = defaultdict(lambda: (0, 0))
+    monthly_groups = defaultdict(list)
+    for (employee_id, month), (present, absent) in deltas.items():
+        if present or absent:
+            monthly_groups[(month, present, absent)].append(employee_id)
+            current = totals[employee_id]
+            totals[employee_id] = (current[0] + present, current[1] + absent)
+
+    totals_groups = defaultdict(list)
+    for employee_id, delta in totals.items():
+        if delta != (0, 0):
+            totals_groups[delta].append(employee_id)
+
+    if not totals_groups and not monthly_groups:
+        return
+    with transaction.atomic():
+        _apply_totals(totals_groups)
+        _apply_monthly(monthly_groups)
+
+
+def record_saved(instance, created):
+    """Update the rollups after an attendance record was saved."""
+    deltas = {}
+    previous = getattr(instance, '_rollup_state', None)
+    if not created:
+        if previous is None:
+            # We don't know what the row counted as before; recount it
+            refresh_employees([instance.employee_id])
+            instance.remember_rollup_state()
+            return
+        record_deltas(deltas, *previous, sign=-1)
+    record_deltas(deltas, instance.employee_id, instance.date, instance.status)
+    apply_deltas(deltas)
+    instance.remember_rollup_state()
+
+
+def record_deleted(instance):
+    """Update the rollups after an attendance record was deleted."""
+    previous = getattr(instance, '_rollup_state', None)
+    if previous is None:
+        previous = (instance.employee_id, instance.date, instance.status)
+    deltas = {}
+    record_deltas(deltas, *previous, sign=-1)
+    apply_deltas(deltas)
+
+
+def remove_months(start, end):
+    """
+    Take every record dated in the months [start, end) out of the rollups,
+    before those records are removed in bulk (e.g. a dropped partition).
+    """
+    months = MonthlyAttendanceTotals.objects.filter(month__gte=start, month__lt=end)
+    removed = months.filter(employee_id=OuterRef('employee_id')).order_by().values('employee_id')
+    with transaction.atomic():
+        AttendanceTotals.objects.filter(employee_id__in=months.values('employee_id')).update(
+            total_present=F('total_present') - Coalesce(
+                Subquery(removed.annotate(total=Sum('total_present')).values('total')), 0),
+            total_absent=F('total_absent') - Coalesce(
+                Subquery(removed.annotate(total=Sum('total_absent')).values('total')), 0)
+        )
+        months.delete()
+
+
+def remove_employees(employee_ids):
+    """Drop the rollups of employees whose records are going away in bulk."""
+    with transaction.atomic():
+        for chunk in _chunks(employee_ids):
+            AttendanceTotals.objects.filter(employee_id__in=chunk).delete()
+            MonthlyAttendanceTotals.objects.filter(employee_id__in=chunk).delete()
+
+
+def _aggregate(attendance):
+    return attendance.annotate(
+        present=Count('id', filter=Q(status='present')),
+        absent=Count('id', filter=Q(status='absent'))
+    )
+
+
+def _write_rollups(attendance, batch_size=2000):
+    totals = _aggregate(attendance.order_by().values('employee_id'))
+    AttendanceTotals.objects.bulk_create(
+        (AttendanceTotals(employee_id=row['employee_id'], total_present=row['present'],
+                          total_absent=row['absent']) for row in totals.iterator()),
+        batch_size=batch_size
+    )
+    monthly = _aggregate(
+        attendance.order_by().annotate(month=TruncMonth('date')).values('employee_id', 'month')
+    )
+    MonthlyAttendanceTotals.objects.bulk_create(
+        (MonthlyAttendanceTotals(employee_id=row['employee_id'], month=row['month'],
+                                 total_present=row['present'], total_absent=row['absent'])
+         for row in monthly.iterator()),
+        batch_size=batch_size
+    )
+
+
+def refresh_employees(employee_ids):
+    """Recount the rollups of the given employees from their attendance records."""
+    with transaction.atomic():
+        for chunk in _chunks(employee_ids):
+            AttendanceTotals.objects.filter(employee_id__in=chunk).delete()
+            MonthlyAttendanceTotals.objects.filter(employee_id__in=chunk).delete()
+            _write_rollups(Attendance.objects.filter(employee_id__in=chunk))
+
+
+def rebuild():
+    """Recompute both rollup tables from scratch."""
+    with transaction.atomic():
+        AttendanceTotals.objects.all().delete()
+        MonthlyAttendanceTotals.objects.all().delete()
+        _write_rollups(Attendance.objects.all())
+
+
+def verify():
+    """
+    Compare the rollups against a fresh aggregation.
+
+    Returns a list of human-readable mismatch descriptions (empty if consistent).
+    """
+    mismatches = []
+
+    expected = {
+        row['employee_id']: (row['present'], row['absent'])
+        for row in _aggregate(Attendance.objects.order_by().values('employee_id')).iterator()
+    }
+    stored = {
+        employee_id: (present, absent)
+        for employee_id, present, absent in AttendanceTotals.objects.values_list(
+            'employee_id', 'total_present', 'total_absent').iterator()
+    }
+    for employee_id in expected.keys() | stored.keys():
+        want = expected.get(employee_id, (0, 0))
+        have = stored.get(employee_id, (0, 0))
+        if want != have:
+            mismatches.append(f'employee {employee_id}: expected {want}, stored {have}')
+
+    expected = {
+        (row['employee_id'], row['month']): (row['present'], row['absent'])
+        for row in _aggregate(
+            Attendance.objects.order_by().annotate(month=TruncMonth('date')).values('employee_id', 'month')
+        ).iterator()
+    }
+    stored = {
+        (employee_id, month): (present, absent)
+        for employee_id, month, present, absent in MonthlyAttendanceTotals.objects.values_list(
+            'employee_id', 'month', 'total_present', 'total_absent').iterator()
+    }
+    for key in expected.keys() | stored.keys():
+        want = expected.get(key, (0, 0))
+        have = stored.get(key, (0, 0))
+        if want != have:
+            mismatches.append(f'employee {key[0]} month {key[1]:%Y-%m}: expected {want}, stored {have}')
+
+    return mismatches
@@ -1,8 +1,26 @@
+from django.db import transaction
 from rest_framework import serializers
+from hrms_lite.cache import bump_version_on_commit
+from hrms_lite.renderers import datetime_formatter, format_date
+from . import analytics, bitsets, rollup
 from .models import Attendance
 from employees.models import Employee
 
 
+# Keep IN (...) lists under SQLite's default bound-parameter limit
+IN_QUERY_CHUNK_SIZE = 900
+
+
+def rows_in_chunks(queryset, lookup_field, values, *fields):
+    """Return `fields` tuples for rows whose `lookup_field` is in `values`."""
+    values = list(values)
+    rows = []
+    for start in range(0, len(values), IN_QUERY_CHUNK_SIZE):
+        chunk = values[start:start + IN_QUERY_CHUNK_SIZE]
+        rows.extend(queryset.filter(**{f'{lookup_field}__in': chunk}).values_list(*fields))
+    return rows
+
+
 class AttendanceSerializer(serializers.ModelSerializer):
     """
     Serializer for Attendance model with validation.
@@ -79,6 +97,147 @@ class AttendanceListSerializer(serializers.ModelSerializer):
         ]
 
 
+# Columns fetched for the fast list path, in AttendanceListSerializer field order
+ATTENDANCE_LIST_COLUMNS = [
+    'id', 'employee__full_name', 'employee__employee_id', 'employee__department',
+    'date', 'status', 'created_at'
+]
+
+ATTENDANCE_LIST_FIELDS = AttendanceListSerializer.Meta.fields
+
+# Fields selectable with `?fields=` (see hrms_lite.fieldsets), in
+# AttendanceSerializer order: name -> (column, kind). `employee_id` is the
+# employee's pk, as when writing.
+ATTENDANCE_FIELDS = {
+    'id': ('id', None),
+    'employee_id': ('employee_id', None),
+    'employee_name': ('employee__full_name', None),
+    'employee_code': ('employee__employee_id', None),
+    'employee_department': ('employee__department', None),
+    'date': ('date', 'date'),
+    'status': ('status', None),
+    'created_at': ('created_at', 'datetime'),
+    'updated_at': ('updated_at', 'datetime'),
+}
+
+
+def attendance_list_data(rows):
+    """
+    Build AttendanceListSerializer output from ATTENDANCE_LIST_COLUMNS tuples
+    without per-row serializer overhead or dotted-source lookups.
+    """
+    format_datetime = datetime_formatter()
+    return [
+        {
+            'id': row[0],
+            'employee_name': row[1],
+            'employee_code': row[2],
+            'employee_department': row[3],
+            'date': format_date(row[4]),
+            'status': row[5],
+            'created_at': format_datetime(row[6]),
+        }
+        for row in rows
+    ]
+
+
+class AttendanceBulkItemSerializer(serializers.Serializer):
+    """
+    A single (employee, status) pair within a bulk attendance request.
+    """
+    employee_id = serializers.IntegerField()
+    status = serializers.ChoiceField(
+        choices=Attendance.STATUS_CHOICES,
+        error_messages={'invalid_choice': "Status must be either 'present' or 'absent'."}
+    )
+
+
+class AttendanceBulkSerializer(serializers.Serializer):
+    """
+    Serializer for marking attendance for many employees on one date.
+
+    Validation is set-based: employee existence and existing records are
+    checked with a few IN (...) queries for the whole batch. Per-item errors
+    are keyed by the item's index in `records`.
+    """
+    date = serializers.DateField()
+    records = serializers.ListField(
+        child=AttendanceBulkItemSerializer(),
+        allow_empty=False,
+        max_length=10000
+    )
+    overwrite = serializers.BooleanField(
+        default=False,
+        help_text="Update existing records for the date instead of rejecting them"
+    )
+
+    def validate(self, data):
+        records = data['records']
+        employee_ids = {item['employee_id'] for item in records}
+
+        known_employees = {pk for pk, in rows_in_chunks(Employee.objects.all(), 'pk', employee_ids, 'pk')}
+        already_marked = dict(rows_in_chunks(
+            Attendance.objects.filter(date=data['date']), 'employee_id', employee_ids, 'employee_id', 'status'
+        ))
+
+        errors = {}
+        seen = set()
+        for index, item in enumerate(records):
+            employee_id = item['employee_id']
+            if employee_id not in known_employees:
+                errors[index] = {'employee_id': [f'Employee with ID {employee_id} not found.']}
+            elif employee_id in seen:
+                errors[index] = {'employee_id': [f'Employee with ID {employee_id} appears more than once.']}
+            elif employee_id in already_marked and not data['overwrite']:
+                errors[index] = {'non_field_errors': [
+                    f"Attendance for employee with ID {employee_id} on {data['date']} already exists."
+                ]}
+            seen.add(employee_id)
+
+        if errors:
+            raise serializers.ValidationError({'records': errors})
+
+        data['existing'] = already_marked
+        return data
+
+    def create(self, validated_data):
+        date = validated_data['date']
+        records = [
+            Attendance(employee_id=item['employee_id'], date=date, status=item['status'])
+            for item in validated_data['records']
+        ]
+
+        with transaction.atomic():
+            if validated_data['overwrite']:
+                Attendance.objects.bulk_create(
+                    records,
+                    update_conflicts=True,
+                    unique_fields=['employee', 'date'],
+                    update_fields=['status', 'updated_at']
+                )
+            else:
+                Attendance.objects.bulk_create(records)
+
+            # bulk_create skips model signals, so update the rollups and bitsets here
+            existing = validated_data['existing']
+            deltas = {}
+            for record in records:
+                if record.employee_id in existing:
+                    rollup.record_deltas(deltas, record.employee_id, date, existing[record.employee_id], sign=-1)
+                rollup.record_deltas(deltas, record.employee_id, date, record.status)
+            rollup.apply_deltas(deltas)
+            bitsets.record_changes([(record.employee_id, date, record.status) for record in records])
+            bump_version_on_commit('attendance')
+        analytics.invalidate_dates([date])
+
+        updated = len(existing)
+        return {
+            'date': date,
+            'created': len(records) - updated,
+            'updated': updated
+        }
+
+
 class AttendanceSummarySerializer(serializers.Serializer):
     """
     Serializer for attendance summary (bonus feature).
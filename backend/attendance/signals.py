@@ -0,0 +1,59 @@
+"""
+Signal handlers keeping attendance rollups, bitsets, cached analytics and
+cached responses in step with `Attendance` and `Employee` writes (and
+employee removals), and publishing live attendance events.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from employees.models import Employee
+from employees.signals import employee_removed
+from hrms_lite.cache import bump_version_on_commit
+from . import analytics, bitsets, live, rollup
+from .models import Attendance
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_state', None)
+    analytics.invalidate_dates([instance.date, previous[1] if previous else None])
+    # Before the rollups, which replace the record's remembered state
+    bitsets.record_saved(instance, created)
+    rollup.record_saved(instance, created)
+    bump_version_on_commit('attendance')
+    key = (instance.employee_id, instance.date)
+    live.record_changes(created=[key] if created else (), updated=() if created else [key])
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    analytics.invalidate_dates([instance.date])
+    bitsets.record_deleted(instance)
+    rollup.record_deleted(instance)
+    bump_version_on_commit('attendance')
+    live.record_changes(deleted=[(instance.pk, instance.employee_id)])
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, created, raw=False, **kwargs):
+    # A department change moves history between departments
+    if not created and not raw:
+        analytics.invalidate_all()
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    analytics.invalidate_all()
+
+
+@receiver(employee_removed)
+def employee_removed_handler(sender, instance, **kwargs):
+    # The records are hidden now and purged later without signals
+    bitsets.remove_employees([instance.pk])
+    rollup.remove_employees([instance.pk])
+    analytics.invalidate_all()
+    bump_version_on_commit('attendance')
+    live.record_reset()
@@ -0,0 +1,14 @@
+"""
+Background jobs of the attendance app (see `hrms_lite.jobs`).
+"""
+
+from hrms_lite import jobs
+from . import bitsets, rollup
+
+
+@jobs.task('attendance.rebuild_rollups')
+def rebuild_rollups_task(job):
+    """Rebuild the attendance rollups and bitsets."""
+    rollup.rebuild()
+    bitsets.rebuild()
+    return None
@@ -0,0 +1,387 @@
+"""
+Tests for the attendance API and the structures kept in step with its writes.
+"""
+
+import base64
+import datetime
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from employees import purge
+from employees.models import Employee
+from hrms_lite import jobs
+from hrms_lite.models import IndexChange, Job
+from hrms_lite.pagination import encode_cursor
+from . import async_views, bitsets, rollup
+from .models import Attendance
+from .serializers import ATTENDANCE_LIST_FIELDS
+
+
+def create_employees(count, department='Engineering'):
+    return [
+        Employee.objects.create(
+            employee_id=f'EMP{number:03d}', full_name=f'Employee {number}',
+            email=f'employee{number}@example.com', department=department
+        )
+        for number in range(count)
+    ]
+
+
+class AttendancePaginationTests(TestCase):
+    """Keyset pagination of GET /api/attendance/ (user-001)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        employees = create_employees(3)
+        start = datetime.date(2024, 1, 1)
+        Attendance.objects.bulk_create(
+            Attendance(employee=employee, date=start + datetime.timedelta(days=day), status='present')
+            for employee in employees for day in range(5)
+        )
+
+    def get(self, **params):
+        return self.client.get('/api/attendance/', params)
+
+    def assertInvalidPagination(self, response):
+        self.assertEqual(response.status_code, 400)
+        body = response.json()
+        self.assertFalse(body['success'])
+        self.assertEqual(body['error']['message'], 'Invalid pagination parameters')
+
+    def test_pages_cover_every_record_once_in_order(self):
+        seen, cursor = [], None
+        while True:
+            body = self.get(page_size=4, **({'cursor': cursor} if cursor else {})).json()
+            self.assertLessEqual(body['count'], 4)
+            seen.extend((row['date'], row['id']) for row in body['data'])
+            cursor = body['next']
+            if cursor is None:
+                break
+        expected = list(Attendance.objects.order_by('-date', '-created_at', 'id').values_list('date', 'id'))
+        self.assertEqual(seen, [(date.isoformat(), pk) for date, pk in expected])
+
+    def test_unpaginated_list_returns_everything(self):
+        body = self.get().json()
+        self.assertEqual(body['count'], 15)
+        self.assertNotIn('next', body)
+
+    def test_total_only_when_requested(self):
+        self.assertNotIn('total', self.get(page_size=5).json())
+        self.assertEqual(self.get(page_size=5, total='exact').json()['total'], 15)
+        self.assertEqual(self.get(page_size=5, total='exact', status='absent').json()['total'], 0)
+
+    def test_filters_apply_to_pages(self):
+        body = self.get(page_size=10, date='2024-01-03').json()
+        self.assertEqual(body['count'], 3)
+        self.assertIsNone(body['next'])
+
+    def test_malformed_cursors_are_rejected(self):
+        def raw(text):
+            return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+        for cursor in [
+            'not-a-cursor!',
+            raw('{"a": 1}'),
+            encode_cursor(['2024-01-01', 1]),
+            encode_cursor(['x', 'y', 1]),
+            encode_cursor(['2024-01-01', 'y', 1]),
+            encode_cursor(['2024-01-01', '2024-01-01T00:00:00+00:00', 'z']),
+            encode_cursor(['2024-01-01', '2024-01-01T00:00:00+00:00', None]),
+            encode_cursor([20240101, '2024-01-01T00:00:00+00:00', 1]),
+            encode_cursor([['2024-01-01'], '2024-01-01T00:00:00+00:00', 1]),
+        ]:
+            with self.subTest(cursor=cursor):
+                self.assertInvalidPagination(self.get(cursor=cursor))
+
+    def test_async_view_rejects_malformed_cursor(self):
+        request = RequestFactory().get('/api/attendance/', {'cursor': encode_cursor(['x', 'y', 1])})
+        response = async_to_sync(async_views.attendance_list_create)(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('total', json.loads(async_to_sync(async_views.attendance_list_create)(
+            RequestFactory().get('/api/attendance/', {'page_size': 2})
+        ).content))
+
+    def test_invalid_page_size(self):
+        for page_size in ('0', '-1', 'ten'):
+            with self.subTest(page_size=page_size):
+                self.assertInvalidPagination(self.get(page_size=page_size))
+
+    def test_page_size_is_capped(self):
+        body = self.get(page_size=100000).json()
+        self.assertEqual(body['count'], 15)
+
+
+class AttendanceBulkTests(TestCase):
+    """POST /api/attendance/bulk/: set-based validation and upsert (user-003)."""
+
+    def setUp(self):
+        self.employees = create_employees(3)
+
+    def bulk(self, records, date='2024-05-06', overwrite=False):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/attendance/bulk/', {
+                'date': date, 'overwrite': overwrite, 'records': records
+            }, content_type='application/json')
+
+    def records(self, status='present'):
+        return [{'employee_id': employee.pk, 'status': status} for employee in self.employees]
+
+    def test_marks_every_employee(self):
+        response = self.bulk(self.records())
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['data'], {'date': '2024-05-06', 'created': 3, 'updated': 0})
+        self.assertEqual(Attendance.objects.filter(date='2024-05-06', status='present').count(), 3)
+        self.assertEqual(rollup.verify(), [])
+
+    def test_existing_records_are_rejected_without_overwrite(self):
+        Attendance.objects.create(employee=self.employees[1], date=datetime.date(2024, 5, 6), status='absent')
+        response = self.bulk(self.records())
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['error']['details']['records']
+        self.assertEqual(list(errors), ['1'])
+        self.assertIn('already exists', errors['1']['non_field_errors'][0])
+        self.assertEqual(Attendance.objects.filter(date='2024-05-06').count(), 1)
+
+    def test_overwrite_updates_existing_records(self):
+        Attendance.objects.create(employee=self.employees[1], date=datetime.date(2024, 5, 6), status='present')
+        response = self.bulk(self.records('absent'), overwrite=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['data']['created'], 2)
+        self.assertEqual(response.json()['data']['updated'], 1)
+        self.assertEqual(Attendance.objects.filter(date='2024-05-06', status='absent').count(), 3)
+        self.assertEqual(rollup.verify(), [])
+
+    def test_unknown_and_repeated_employees_write_nothing(self):
+        records = self.records() + [
+            {'employee_id': self.employees[0].pk, 'status': 'absent'},
+            {'employee_id': 999999, 'status': 'present'},
+        ]
+        response = self.bulk(records)
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['error']['details']['records']
+        self.assertEqual(sorted(errors), ['3', '4'])
+        self.assertIn('more than once', errors['3']['employee_id'][0])
+        self.assertIn('not found', errors['4']['employee_id'][0])
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_invalid_status_and_empty_records(self):
+        self.assertEqual(self.bulk([{'employee_id': self.employees[0].pk, 'status': 'late'}]).status_code, 400)
+        self.assertEqual(self.bulk([]).status_code, 400)
+
+
+class AttendanceFieldsetTests(TestCase):
+    """Sparse fieldsets and the compact list shape (user-019)."""
+
+    def setUp(self):
+        self.employee = create_employees(1)[0]
+        self.record = Attendance.objects.create(employee=self.employee, date=datetime.date(2024, 5, 6), status='present')
+        Attendance.objects.create(employee=self.employee, date=datetime.date(2024, 5, 7), status='absent')
+
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_fields_narrow_the_rows_and_the_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            body = self.get('/api/attendance/?fields=status,date')
+        self.assertEqual(body['data'], [{'date': '2024-05-07', 'status': 'absent'},
+                                        {'date': '2024-05-06', 'status': 'present'}])
+        self.assertFalse([query for query in queries if 'JOIN' in query['sql']])
+
+        body = self.get('/api/attendance/?fields=employee_code,status&page_size=1')
+        self.assertEqual(body['data'], [{'employee_code': 'EMP000', 'status': 'absent'}])
+
+    def test_default_fields_are_unchanged(self):
+        full = self.get('/api/attendance/')['data'][0]
+        self.assertEqual(list(full), list(ATTENDANCE_LIST_FIELDS))
+
+    def test_compact_format(self):
+        body = self.get('/api/attendance/?fields=id,status&format=compact')
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(body['data'], {'id': [self.record.pk + 1, self.record.pk], 'status': ['absent', 'present']})
+        self.assertEqual(self.get('/api/attendance/?date=2023-01-01&format=compact')['data']['id'], [])
+
+    def test_detail_fields(self):
+        body = self.get(f'/api/attendance/{self.record.pk}/?fields=date,employee_name')
+        self.assertEqual(body['data'], {'employee_name': 'Employee 0', 'date': '2024-05-06'})
+        body = self.get(f'/api/employees/{self.employee.pk}/?fields=email')
+        self.assertEqual(body['data'], {'email': 'employee0@example.com'})
+
+    def test_invalid_parameters(self):
+        for path, param in [
+            ('/api/attendance/?fields=status,salary', 'fields'),
+            ('/api/attendance/?fields=,', 'fields'),
+            ('/api/attendance/?format=xml', 'format'),
+            ('/api/employees/?fields=salary', 'fields'),
+            (f'/api/attendance/{self.record.pk}/?fields=salary', 'fields'),
+        ]:
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 400, path)
+            self.assertIn(param, response.json()['error']['details'])
+
+
+@override_settings(JOBS_EMBEDDED_WORKER=False)
+class RollupRebuildEndpointTests(TestCase):
+    """POST /api/attendance/rollups/rebuild/ (user-023)."""
+
+    path = '/api/attendance/rollups/rebuild/'
+
+    def test_staff_only(self):
+        self.assertEqual(self.client.post(self.path).status_code, 403)
+        self.client.force_login(User.objects.create_user('clerk'))
+        self.assertEqual(self.client.post(self.path).status_code, 403)
+        self.assertFalse(Job.objects.exists())
+
+    def test_pending_rebuild_is_reused(self):
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        first = self.client.post(self.path)
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(first.json()['message'], 'Rollup rebuild queued')
+        second = self.client.post(self.path).json()
+        self.assertEqual(second['message'], 'Rollup rebuild already queued')
+        self.assertEqual(second['data']['id'], first.json()['data']['id'])
+
+        job = jobs.claim('test:1')
+        jobs.execute(job, 'test:1')
+        self.assertEqual(self.client.post(self.path).json()['message'], 'Rollup rebuild queued')
+        self.assertEqual(Job.objects.count(), 2)
+
+
+def bitmaps_of(years):
+    """{(employee_id, year): (present, marked)} of the years with any records."""
+    return {
+        (employee_id, year): tuple(bitmaps)
+        for employee_id, employee_years in years.items()
+        for year, bitmaps in employee_years.items() if bitmaps[1]
+    }
+
+
+@override_settings(JOBS_EMBEDDED_WORKER=False, ATTENDANCE_BITSETS=True, ATTENDANCE_BITSETS_PERSIST=False)
+class AttendanceRollupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employees = [
+            Employee.objects.create(
+                employee_id=f'EMP{number:03d}', full_name=f'Employee {number}',
+                email=f'employee{number}@example.com', department='Engineering'
+            )
+            for number in range(3)
+        ]
+        # Stands in for another worker process: it learns about writes only
+        # through the version and change log shared in the database
+        self.other_worker = bitsets.AttendanceBitsets()
+        self.other_worker.sync()
+        bitsets.warm()
+
+    def write(self, method, path, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(path, data, format='json')
+        self.assertLess(response.status_code, 300, response.content)
+        return response
+
+    def mark(self, employee, date, status='present'):
+        return self.write('post', '/api/attendance/', {
+            'employee_id': employee.pk, 'date': date, 'status': status
+        }).json()['data']
+
+    def assertConsistent(self):
+        self.assertEqual(rollup.verify(), [])
+        self.assertEqual(bitsets.verify(), [])
+        # Nothing in this process's cache reaches another process
+        cache.clear()
+        # Applying the logged changes is enough; no rebuild
+        with mock.patch.object(self.other_worker, 'load', side_effect=AssertionError('rebuilt')):
+            self.assertTrue(self.other_worker.catch_up())
+        self.assertEqual(bitmaps_of(self.other_worker.years), bitmaps_of(bitsets._build_from_records()))
+
+    def test_create(self):
+        self.mark(self.employees[0], '2024-03-01')
+        self.mark(self.employees[0], '2024-03-02', 'absent')
+        self.mark(self.employees[1], '2024-03-01')
+        self.assertConsistent()
+
+    def test_update_status_and_date(self):
+        record = self.mark(self.employees[0], '2024-03-01')
+        self.assertConsistent()
+        self.write('put', f"/api/attendance/{record['id']}/", {
+            'employee_id': self.employees[0].pk, 'date': '2024-04-15', 'status': 'absent'
+        })
+        self.assertConsistent()
+        self.assertEqual(bitsets.employee_totals(self.employees[0].pk), (0, 1))
+
+    def test_delete(self):
+        record = self.mark(self.employees[0], '2024-03-01')
+        self.mark(self.employees[0], '2024-03-02')
+        self.write('delete', f"/api/attendance/{record['id']}/")
+        self.assertConsistent()
+        self.assertEqual(bitsets.employee_totals(self.employees[0].pk), (1, 0))
+
+    def test_bulk_mark(self):
+        self.mark(self.employees[0], '2024-03-01', 'absent')
+        self.write('post', '/api/attendance/bulk/', {
+            'date': '2024-03-01', 'overwrite': True,
+            'records': [{'employee_id': employee.pk, 'status': 'present'} for employee in self.employees],
+        })
+        self.assertEqual(Attendance.objects.filter(date='2024-03-01', status='present').count(), 3)
+        self.assertConsistent()
+
+    def test_employee_purge(self):
+        removed, kept = self.employees[:2]
+        for day in range(1, 4):
+            self.mark(removed, f'2024-03-0{day}')
+        self.mark(kept, '2024-03-01', 'absent')
+
+        self.write('delete', f'/api/employees/{removed.pk}/')
+        self.assertFalse(Attendance.objects.filter(employee_id=removed.pk).exists())
+        self.assertConsistent()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(purge.purge_pending(batch_size=2), 1)
+        self.assertFalse(Attendance.all_objects.filter(employee_id=removed.pk).exists())
+        self.assertConsistent()
+        self.assertEqual(bitsets.employee_totals(kept.pk), (0, 1))
+
+    def test_day_queries_match_without_bitsets(self):
+        self.mark(self.employees[0], '2024-03-01')
+        self.mark(self.employees[1], '2024-03-01', 'absent')
+        self.mark(self.employees[0], '2024-03-02')
+        ids = ','.join(str(employee.pk) for employee in self.employees[:2])
+        paths = ['/api/attendance/days/2024-03-01/', f'/api/attendance/days/?employee_ids={ids}&year=2024']
+
+        with_bitsets = [self.client.get(path).json() for path in paths]
+        with override_settings(ATTENDANCE_BITSETS=False):
+            without_bitsets = [self.client.get(path).json() for path in paths]
+        self.assertEqual(with_bitsets, without_bitsets)
+        self.assertEqual(with_bitsets[0]['data']['absent_employee_ids'], [self.employees[1].pk])
+
+    def test_stale_bitsets_fall_back_to_the_rollups(self):
+        self.mark(self.employees[0], '2024-03-01')
+        self.mark(self.employees[1], '2024-03-01', 'absent')
+        expected = self.client.get('/api/attendance/summary/').json()
+        cache.clear()
+
+        # A worker whose bitsets were never built, or were invalidated by a rebuild
+        with mock.patch.object(bitsets._engine, 'version', None), \
+                mock.patch.object(bitsets._engine, 'building', False), \
+                mock.patch.object(bitsets.AttendanceBitsets, '_build_in_background') as build:
+            self.assertEqual(self.client.get('/api/attendance/summary/').json(), expected)
+            self.assertFalse(bitsets.available())
+        build.assert_called_once()
+
+    def test_worker_rebuilds_when_the_log_does_not_reach(self):
+        self.mark(self.employees[0], '2024-03-01')
+        IndexChange.objects.filter(index=bitsets.AttendanceBitsets.version_key).delete()
+        with mock.patch.object(bitsets.AttendanceBitsets, '_build_in_background') as build:
+            self.assertFalse(self.other_worker.catch_up())
+        build.assert_called_once()
+        self.other_worker.sync()
+        self.assertEqual(bitmaps_of(self.other_worker.years), bitmaps_of(bitsets._build_from_records()))
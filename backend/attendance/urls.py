@@ -1,9 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Under ASGI, reads are served by the async views (see settings.ASYNC_READS)
+reads = async_views if settings.ASYNC_READS else views
 
 urlpatterns = [
-    path('', views.attendance_list_create, name='attendance-list-create'),
-    path('summary/', views.attendance_summary, name='attendance-summary'),
+    path('', reads.attendance_list_create, name='attendance-list-create'),
+    path('bulk/', views.attendance_bulk, name='attendance-bulk'),
+    path('export/', views.attendance_export, name='attendance-export'),
+    path('analytics/', views.attendance_analytics, name='attendance-analytics'),
+    path('summary/', reads.attendance_summary, name='attendance-summary'),
+    path('matrix/', views.attendance_matrix, name='attendance-matrix'),
+    path('days/', views.attendance_days, name='attendance-days'),
+    path('days/<str:date>/', views.attendance_day, name='attendance-day'),
+    path('rollups/rebuild/', views.attendance_rollups_rebuild, name='attendance-rollups-rebuild'),
+    path('events/', async_views.attendance_events, name='attendance-events'),
     path('<int:pk>/', views.attendance_detail, name='attendance-detail'),
-    path('employee/<int:employee_pk>/', views.attendance_by_employee, name='attendance-by-employee'),
+    path('employee/<int:employee_pk>/', reads.attendance_by_employee, name='attendance-by-employee'),
 ]
@@ -1,41 +1,141 @@
+import datetime
+
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db import IntegrityError
+from django.db.models import Count, F, FilteredRelation, Q
+from django.utils import timezone
+from . import analytics, bitsets, live
+from .filters import filter_attendance
 from .models import Attendance
-from .serializers import AttendanceSerializer, AttendanceListSerializer, AttendanceSummarySerializer
+from .serializers import (
+    AttendanceSerializer, AttendanceListSerializer, AttendanceSummarySerializer, AttendanceBulkSerializer,
+    ATTENDANCE_FIELDS, ATTENDANCE_LIST_FIELDS, attendance_list_data
+)
 from employees.models import Employee
+from hrms_lite import jobs
+from hrms_lite.cache import cached_response
+from hrms_lite.conditional import queryset_condition, version_condition
+from hrms_lite.fieldsets import FieldsetError, parse_fields, parse_fieldset
+from hrms_lite.job_views import job_accepted
+from hrms_lite.pagination import PaginationError, paginate_keyset, get_total
+from hrms_lite.renderers import fast_json_response
+from hrms_lite.streaming import EXPORT_FORMATS, export_response, invalid_format_details
+
+
+# Keyset ordering for paginated attendance lists; `id` breaks ties between
+# records created in the same instant.
+ATTENDANCE_KEYSET_ORDERING = ['-date', '-created_at', 'id']
+ATTENDANCE_KEYSET_COLUMNS = ['date', 'created_at', 'id']
+
+
+def attendance_cursor_values(columns):
+    """
+    A function mapping a `values_list(*columns)` row to its ordering values,
+    as stored in a pagination cursor.
+    """
+    date_index, created_index, id_index = (columns.index(column) for column in ATTENDANCE_KEYSET_COLUMNS)
+
+    def cursor_values(row):
+        return [row[date_index].isoformat(), row[created_index].isoformat(), row[id_index]]
+
+    return cursor_values
+
+
+# Attendance payloads embed employee fields, so an employee edit must change
+# the validators too
+ATTENDANCE_TIMESTAMPS = ('updated_at', 'employee__updated_at')
+
+
+def attendance_timestamps(request):
+    """
+    ATTENDANCE_TIMESTAMPS, or just the record's own when `fields` selects no
+    employee fields, so the validator query skips the join as well.
+    """
+    try:
+        names = parse_fields(request.GET, ATTENDANCE_FIELDS)
+    except FieldsetError:
+        return ATTENDANCE_TIMESTAMPS
+    if names is not None and not any(ATTENDANCE_FIELDS[name][0].startswith('employee__') for name in names):
+        return ATTENDANCE_TIMESTAMPS[:1]
+    return ATTENDANCE_TIMESTAMPS
+
+
+def attendance_list_fieldset(query_params):
+    """The requested fields and shape of an attendance list; raises FieldsetError."""
+    return parse_fieldset(query_params, ATTENDANCE_FIELDS, ATTENDANCE_LIST_FIELDS, attendance_list_data)
+
+
+def attendance_detail_queryset(request, pk):
+    return Attendance.objects.filter(pk=pk)
 
 
+def attendance_by_employee_queryset(request, employee_pk):
+    attendance = Attendance.objects.filter(employee_id=employee_pk)
+    if request.GET.get('start_date'):
+        attendance = attendance.filter(date__gte=request.GET['start_date'])
+    if request.GET.get('end_date'):
+        attendance = attendance.filter(date__lte=request.GET['end_date'])
+    return attendance
+
+
+@version_condition('attendance', 'employees')
 @api_view(['GET', 'POST'])
 def attendance_list_create(request):
     """
     GET: List all attendance records with optional filters
+         (`date`, `start_date`, `end_date`, `employee_id`, `status`).
+         Pass `page_size` and/or `cursor` to page through the records;
+         `total=exact|estimate` adds a total count to paginated responses.
+         `fields` narrows the fields, `format=compact` returns columns.
     POST: Create a new attendance record
     """
     if request.method == 'GET':
-        attendance = Attendance.objects.select_related('employee').all()
-        
-        # Filter by date (bonus feature)
-        date_filter = request.query_params.get('date')
-        if date_filter:
-            attendance = attendance.filter(date=date_filter)
-        
-        # Filter by employee
-        employee_id = request.query_params.get('employee_id')
-        if employee_id:
-            attendance = attendance.filter(employee_id=employee_id)
-        
-        # Filter by status
-        status_filter = request.query_params.get('status')
-        if status_filter:
-            attendance = attendance.filter(status=status_filter)
+        try:
+            fieldset = attendance_list_fieldset(request.query_params)
+        except FieldsetError as exc:
+            return Response({
+                'success': False,
+                'error': {
+                    'status_code': 400,
+                    'message': 'Validation failed',
+                    'details': {exc.param: [str(exc)]}
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = AttendanceListSerializer(attendance, many=True)
-        return Response({
+        attendance = filter_attendance(Attendance.objects.all(), request.query_params)
+
+        if 'cursor' in request.query_params or 'page_size' in request.query_params:
+            columns = fieldset.columns_with(ATTENDANCE_KEYSET_COLUMNS)
+            try:
+                page, next_cursor = paginate_keyset(
+                    attendance.values_list(*columns), request.query_params,
+                    ATTENDANCE_KEYSET_ORDERING, attendance_cursor_values(columns)
+                )
+            except PaginationError as exc:
+                return Response({
+                    'success': False,
+                    'error': {
+                        'status_code': 400,
+                        'message': 'Invalid pagination parameters',
+                        'details': {'pagination': [str(exc)]}
+                    }
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            body = {'success': True, 'count': len(page)}
+            total = get_total(attendance, request.query_params)
+            if total is not None:
+                body['total'] = total
+            body.update(next=next_cursor, data=fieldset.data(page))
+            return fast_json_response(request, body)
+
+        rows = list(attendance.values_list(*fieldset.columns))
+        return fast_json_response(request, {
             'success': True,
-            'count': attendance.count(),
-            'data': serializer.data
+            'count': len(rows),
+            'data': fieldset.data(rows)
         })
 
     elif request.method == 'POST':
@@ -58,15 +158,118 @@ def attendance_list_create(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+def attendance_bulk(request):
+    """
+    POST: Mark attendance for many employees on a single date.
+          Body: {"date": "...", "records": [{"employee_id": 1, "status": "present"}, ...],
+                 "overwrite": false}
+    """
+    serializer = AttendanceBulkSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': serializer.errors
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        result = serializer.save()
+    except IntegrityError:
+        # Another request marked one of these employees since validation ran
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 409,
+                'message': 'Conflict - Resource already exists',
+                'details': {'non_field_errors': [
+                    'Attendance for one or more employees was marked concurrently. Please retry.'
+                ]}
+            }
+        }, status=status.HTTP_409_CONFLICT)
+
+    # bulk_create sends no signals
+    live.record_marked(
+        result['date'], [item['employee_id'] for item in serializer.validated_data['records']],
+        serializer.validated_data['existing']
+    )
+    return Response({
+        'success': True,
+        'message': f"Attendance marked for {result['created'] + result['updated']} employees",
+        'data': {
+            'date': result['date'].isoformat(),
+            'created': result['created'],
+            'updated': result['updated']
+        }
+    }, status=status.HTTP_201_CREATED)
+
+
+ATTENDANCE_EXPORT_FIELDS = [
+    'id', 'employee_code', 'employee_name', 'employee_department',
+    'date', 'status', 'created_at', 'updated_at'
+]
+
+
+@api_view(['GET'])
+def attendance_export(request):
+    """
+    GET: Stream attendance records as CSV (default) or NDJSON (`format=ndjson`).
+         Accepts the same filters as the attendance list.
+    """
+    export_format = request.query_params.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Invalid export format',
+                'details': invalid_format_details(export_format)
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    attendance = filter_attendance(Attendance.objects.all(), request.query_params)
+    # Rows are read while streaming, after the request's routing state is
+    # gone, so resolve the database (primary or replica) now
+    attendance = attendance.using(attendance.db)
+    rows = attendance.order_by('date', 'id').values_list(
+        'id', 'employee__employee_id', 'employee__full_name', 'employee__department',
+        'date', 'status', 'created_at', 'updated_at'
+    ).iterator(chunk_size=2000)
+
+    return export_response(export_format, 'attendance', ATTENDANCE_EXPORT_FIELDS, rows)
+
+
+@queryset_condition(attendance_detail_queryset, attendance_timestamps)
+@cached_response('attendance', 'employees')
 @api_view(['GET', 'PUT', 'DELETE'])
 def attendance_detail(request, pk):
     """
-    GET: Retrieve a single attendance record
+    GET: Retrieve a single attendance record; `fields` narrows the fields
     PUT: Update an attendance record
     DELETE: Delete an attendance record
     """
+    fieldset = None
+    if request.method == 'GET' and 'fields' in request.query_params:
+        try:
+            fieldset = parse_fieldset(request.query_params, ATTENDANCE_FIELDS, list_format=False)
+        except FieldsetError as exc:
+            return Response({
+                'success': False,
+                'error': {
+                    'status_code': 400,
+                    'message': 'Validation failed',
+                    'details': {exc.param: [str(exc)]}
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+
     try:
-        attendance = Attendance.objects.select_related('employee').get(pk=pk)
+        if fieldset is not None:
+            row = Attendance.objects.values_list(*fieldset.columns).get(pk=pk)
+        else:
+            attendance = Attendance.objects.select_related('employee').get(pk=pk)
     except Attendance.DoesNotExist:
         return Response({
             'success': False,
@@ -77,6 +280,12 @@ def attendance_detail(request, pk):
             }
         }, status=status.HTTP_404_NOT_FOUND)
 
+    if fieldset is not None:
+        return Response({
+            'success': True,
+            'data': fieldset.item(row)
+        })
+
     if request.method == 'GET':
         serializer = AttendanceSerializer(attendance)
         return Response({
@@ -111,6 +320,22 @@ def attendance_detail(request, pk):
         }, status=status.HTTP_200_OK)
 
 
+def attendance_by_employee_totals(employee_pk, start_date=None, end_date=None):
+    """
+    (present, absent) for one employee from the bitsets, or None when they
+    are off or not current, or a date bound is malformed.
+    """
+    if not bitsets.available():
+        return None
+    try:
+        start = datetime.date.fromisoformat(start_date) if start_date else None
+        end = datetime.date.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        return None
+    return bitsets.employee_totals(employee_pk, start, end)
+
+
+@version_condition('attendance', 'employees')
 @api_view(['GET'])
 def attendance_by_employee(request, employee_pk):
     """
@@ -142,8 +367,10 @@ def attendance_by_employee(request, employee_pk):
     serializer = AttendanceListSerializer(attendance, many=True)
     
     # Calculate summary (bonus feature)
-    total_present = attendance.filter(status='present').count()
-    total_absent = attendance.filter(status='absent').count()
+    totals = attendance_by_employee_totals(employee.pk, start_date, end_date)
+    if totals is None:
+        totals = (attendance.filter(status='present').count(), attendance.filter(status='absent').count())
+    total_present, total_absent = totals
     
     return Response({
         'success': True,
@@ -156,39 +383,361 @@ def attendance_by_employee(request, employee_pk):
         'summary': {
             'total_present': total_present,
             'total_absent': total_absent,
-            'total_records': attendance.count()
+            'total_records': total_present + total_absent
         },
         'data': serializer.data
     })
 
 
-@api_view(['GET'])
-def attendance_summary(request):
+def attendance_summary_queryset(month_date=None, rollups=True):
     """
-    GET: Get attendance summary for all employees (bonus feature)
+    Per-employee totals read from the precomputed rollups, for one month when
+    `month_date` (the first of a month) is given. With rollups=False, only the
+    employees; their totals come from `attendance_summary_totals`.
     """
-    employees = Employee.objects.annotate(
-        total_present=Count('attendance_records', filter=Q(attendance_records__status='present')),
-        total_absent=Count('attendance_records', filter=Q(attendance_records__status='absent')),
-        total_records=Count('attendance_records')
+    if not rollups:
+        return Employee.objects.values('id', 'employee_id', 'full_name', 'department')
+    if month_date is not None:
+        return Employee.objects.annotate(
+            totals=FilteredRelation(
+                'monthly_attendance_totals',
+                condition=Q(monthly_attendance_totals__month=month_date)
+            )
+        ).values(
+            'id', 'employee_id', 'full_name', 'department',
+            total_present=F('totals__total_present'), total_absent=F('totals__total_absent')
+        )
+    # One LEFT JOIN row per employee; employees with no records have no totals row
+    return Employee.objects.values(
+        'id', 'employee_id', 'full_name', 'department',
+        total_present=F('attendance_totals__total_present'),
+        total_absent=F('attendance_totals__total_absent')
     )
-    
+
+
+def attendance_summary_totals(month_date=None):
+    """{employee pk: (present, absent)} from the bitsets, or None when they are off or not current."""
+    if not bitsets.available():
+        return None
+    if month_date is None:
+        return bitsets.totals()
+    month_end = analytics.next_bucket_start('month', month_date) - datetime.timedelta(days=1)
+    return bitsets.totals(month_date, month_end)
+
+
+def attendance_summary_data(employees, totals=None):
+    """Serialize rows of `attendance_summary_queryset`, taking the totals from `totals` if given."""
     summary_data = []
     for emp in employees:
+        if totals is not None:
+            total_present, total_absent = totals.get(emp['id'], (0, 0))
+        else:
+            total_present = emp['total_present'] or 0
+            total_absent = emp['total_absent'] or 0
         summary_data.append({
-            'employee_id': emp.id,
-            'employee_code': emp.employee_id,
-            'employee_name': emp.full_name,
-            'department': emp.department,
-            'total_present': emp.total_present,
-            'total_absent': emp.total_absent,
-            'total_records': emp.total_records
+            'employee_id': emp['id'],
+            'employee_code': emp['employee_id'],
+            'employee_name': emp['full_name'],
+            'department': emp['department'],
+            'total_present': total_present,
+            'total_absent': total_absent,
+            'total_records': total_present + total_absent
         })
-    
-    serializer = AttendanceSummarySerializer(summary_data, many=True)
-    
+    return AttendanceSummarySerializer(summary_data, many=True).data
+
+
+def parse_summary_month(request):
+    """Return the first day of the `month=YYYY-MM` parameter, or None; ValueError if malformed."""
+    month = request.GET.get('month')
+    if not month:
+        return None
+    return datetime.datetime.strptime(month, '%Y-%m').date()
+
+
+@cached_response('attendance', 'employees')
+@api_view(['GET'])
+def attendance_summary(request):
+    """
+    GET: Get attendance summary for all employees (bonus feature)
+    Reads the attendance bitsets (or the precomputed rollups); pass
+    `month=YYYY-MM` for one month's totals.
+    """
+    try:
+        month_date = parse_summary_month(request)
+    except ValueError:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': {'month': ['Month must be in YYYY-MM format.']}
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    totals = attendance_summary_totals(month_date)
+    data = attendance_summary_data(attendance_summary_queryset(month_date, rollups=totals is None), totals)
     return Response({
         'success': True,
-        'count': len(summary_data),
-        'data': serializer.data
+        'count': len(data),
+        'data': data
+    })
+
+
+# One character per day in the attendance matrix
+MATRIX_CODES = {'present': 'P', 'absent': 'A', None: '-'}
+MATRIX_EMPLOYEE_COLUMNS = ('id', 'employee_id', 'full_name', 'department')
+
+
+def attendance_matrix_data(month_date, department=None):
+    """
+    The employees x days grid of one month, column-wise: employee fields as
+    parallel arrays, the month's dates, and one status string per employee.
+    """
+    month_end = analytics.next_bucket_start('month', month_date) - datetime.timedelta(days=1)
+    dates = [month_date + datetime.timedelta(days=day) for day in range((month_end - month_date).days + 1)]
+    employees = Employee.objects.order_by('employee_id')
+    if department:
+        employees = employees.filter(department=department)
+
+    if bitsets.available():
+        rows = list(employees.values_list(*MATRIX_EMPLOYEE_COLUMNS))
+        statuses = bitsets.status_codes(
+            [row[0] for row in rows], month_date, month_end,
+            MATRIX_CODES['present'] + MATRIX_CODES['absent'] + MATRIX_CODES[None]
+        )
+    else:
+        # One LEFT JOIN row per employee and record of the month
+        records = employees.annotate(
+            month_records=FilteredRelation(
+                'attendance_records',
+                condition=Q(attendance_records__date__gte=month_date, attendance_records__date__lte=month_end)
+            )
+        ).values_list(
+            *MATRIX_EMPLOYEE_COLUMNS, 'month_records__date', 'month_records__status'
+        ).order_by('employee_id', 'month_records__date')
+        rows, grid = [], []
+        for row in records:
+            if not rows or rows[-1][0] != row[0]:
+                rows.append(row[:len(MATRIX_EMPLOYEE_COLUMNS)])
+                grid.append([MATRIX_CODES[None]] * len(dates))
+            date, record_status = row[len(MATRIX_EMPLOYEE_COLUMNS):]
+            if date is not None:
+                grid[-1][(date - month_date).days] = MATRIX_CODES[record_status]
+        statuses = [''.join(codes) for codes in grid]
+
+    return {
+        'month': f'{month_date:%Y-%m}',
+        'department': department or None,
+        'codes': {code: record_status or 'not marked' for record_status, code in MATRIX_CODES.items()},
+        'dates': [date.isoformat() for date in dates],
+        'employees': {
+            column: [row[index] for row in rows] for index, column in enumerate(MATRIX_EMPLOYEE_COLUMNS)
+        },
+        'statuses': statuses
+    }
+
+
+@cached_response('attendance', 'employees')
+@api_view(['GET'])
+def attendance_matrix(request):
+    """
+    GET: Attendance of every employee for one month (`month=YYYY-MM`, default
+         the current month; optional `department`) as a compact grid. Entry i
+         of `statuses` is employee i's month, one character per date.
+    """
+    try:
+        month_date = parse_summary_month(request) or timezone.localdate().replace(day=1)
+    except ValueError:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': {'month': ['Month must be in YYYY-MM format.']}
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    data = attendance_matrix_data(month_date, request.query_params.get('department'))
+    return fast_json_response(request, {
+        'success': True,
+        'count': len(data['statuses']),
+        'data': data
+    })
+
+
+DAY_STATUSES = ['present', 'absent']
+DAY_MATCHES = ['all', 'any']
+MAX_DAY_EMPLOYEES = 1000
+
+
+def attendance_days_data(employee_ids, year, day_status, every):
+    """
+    Dates in `year` on which every (or any) of `employee_ids` was marked
+    `day_status`: one AND/OR over their bitsets, or a grouped query.
+    """
+    if bitsets.available():
+        return bitsets.combine(employee_ids, year, every=every, status=day_status)
+    records = Attendance.objects.filter(employee_id__in=employee_ids, date__year=year, status=day_status)
+    if every:
+        records = records.order_by().values('date').annotate(employees=Count('employee_id')).filter(
+            employees=len(employee_ids)
+        )
+    return sorted(set(records.values_list('date', flat=True)))
+
+
+def attendance_day_data(date):
+    """Present and absent counts on `date`, and the employees marked absent."""
+    if bitsets.available():
+        present, absent = bitsets.day_counts(date)
+        absent_ids = sorted(bitsets.absent_on(date))
+    else:
+        records = Attendance.objects.filter(date=date)
+        counts = records.aggregate(
+            present=Count('id', filter=Q(status='present')), absent=Count('id', filter=Q(status='absent'))
+        )
+        present, absent = counts['present'], counts['absent']
+        absent_ids = sorted(records.filter(status='absent').values_list('employee_id', flat=True))
+    return {
+        'date': date.isoformat(),
+        'present': present,
+        'absent': absent,
+        'total': present + absent,
+        'absent_employee_ids': absent_ids
+    }
+
+
+@api_view(['GET'])
+def attendance_days(request):
+    """
+    GET: Dates in `year` (default the current year) on which all (`match=all`,
+         the default) or any (`match=any`) of the employees in `employee_ids`
+         (comma-separated IDs) were marked `status` (present|absent)
+    """
+    params = request.query_params
+    errors = {}
+    try:
+        employee_ids = sorted({int(pk) for pk in params.get('employee_ids', '').split(',') if pk.strip()})
+    except ValueError:
+        employee_ids = None
+        errors['employee_ids'] = ['Employee IDs must be comma-separated integers.']
+    if employee_ids is not None and not 1 <= len(employee_ids) <= MAX_DAY_EMPLOYEES:
+        errors['employee_ids'] = [f'Give between 1 and {MAX_DAY_EMPLOYEES} employee IDs.']
+    try:
+        year = int(params.get('year', timezone.localdate().year))
+        datetime.date(year, 1, 1)
+    except ValueError:
+        errors['year'] = ['Year must be a valid year.']
+    day_status = params.get('status', 'present')
+    if day_status not in DAY_STATUSES:
+        errors['status'] = [f"Status must be one of: {', '.join(DAY_STATUSES)}."]
+    match = params.get('match', 'all')
+    if match not in DAY_MATCHES:
+        errors['match'] = [f"Match must be one of: {', '.join(DAY_MATCHES)}."]
+    if errors:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': errors
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    dates = attendance_days_data(employee_ids, year, day_status, every=match == 'all')
+    return Response({
+        'success': True,
+        'year': year,
+        'count': len(dates),
+        'data': [date.isoformat() for date in dates]
+    })
+
+
+@api_view(['GET'])
+def attendance_day(request, date):
+    """
+    GET: Present/absent counts on one date (YYYY-MM-DD) and the IDs of the
+         employees marked absent
+    """
+    try:
+        date = datetime.date.fromisoformat(date)
+    except ValueError:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': {'date': ['Date must be in YYYY-MM-DD format.']}
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'success': True,
+        'data': attendance_day_data(date)
     })
+
+
+@api_view(['GET'])
+def attendance_analytics(request):
+    """
+    GET: Present/absent counts per department, bucketed by `bucket` (day|week|month).
+         Optional `start_date`, `end_date` (widened to whole buckets) and `department`.
+    """
+    bucket = request.query_params.get('bucket', 'day')
+    errors = {}
+    if bucket not in analytics.BUCKETS:
+        errors['bucket'] = [f"Bucket must be one of: {', '.join(analytics.BUCKETS)}."]
+        bucket = 'day'
+
+    today = timezone.localdate()
+    start_date, end_date = analytics.default_range(bucket, today)
+    for param in ('start_date', 'end_date'):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+        try:
+            parsed = datetime.date.fromisoformat(value)
+        except ValueError:
+            errors[param] = ['Date must be in YYYY-MM-DD format.']
+            continue
+        if param == 'start_date':
+            start_date = parsed
+        else:
+            end_date = parsed
+
+    if not errors and start_date > end_date:
+        errors['start_date'] = ['start_date must not be after end_date.']
+    if not errors and (end_date - start_date).days > analytics.MAX_BUCKETS * {'day': 1, 'week': 7, 'month': 31}[bucket]:
+        errors['end_date'] = [f'Date range spans more than {analytics.MAX_BUCKETS} buckets.']
+    if errors:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': errors
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    data = analytics.department_trends(
+        bucket, start_date, end_date, request.query_params.get('department'), today=today
+    )
+    return Response({
+        'success': True,
+        'bucket': bucket,
+        'start_date': analytics.bucket_start(bucket, start_date).isoformat(),
+        'end_date': end_date.isoformat(),
+        'count': len(data),
+        'data': data
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def attendance_rollups_rebuild(request):
+    """
+    POST: Queue a rebuild of the attendance totals and bitsets behind the
+          summary (staff only); answers 202 with the job (see
+          /api/jobs/{id}/), or with the rebuild already queued or running
+    """
+    job, created = jobs.enqueue_once('attendance.rebuild_rollups')
+    return job_accepted(job, 'Rollup rebuild queued' if created else 'Rollup rebuild already queued')
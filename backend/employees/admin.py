@@ -1,4 +1,5 @@
 from django.contrib import admin
+from . import search
 from .models import Employee
 
 
@@ -8,3 +9,9 @@ class EmployeeAdmin(admin.ModelAdmin):
     list_filter = ('department', 'created_at')
     search_fields = ('employee_id', 'full_name', 'email')
     ordering = ('-created_at',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # On PostgreSQL the trigram indexes serve the default icontains search
+        if not search_term.strip() or search.backend() != 'memory':
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=search.search_ids(search_term)), False
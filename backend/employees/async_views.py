@@ -0,0 +1,98 @@
+"""
+Async versions of the employee read endpoints, for ASGI deployments.
+
+JSON GETs are answered with the async ORM and produce the same bytes as the
+views in `views`; every other request is delegated to those views.
+"""
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from .models import Employee
+from .serializers import EmployeeSerializer, EMPLOYEE_FIELDS
+from . import views
+from hrms_lite.async_views import async_read_view, json_response
+from hrms_lite.cache import cached_response
+from hrms_lite.conditional import queryset_condition, version_condition
+from hrms_lite.fieldsets import FieldsetError, parse_fieldset
+
+
+@version_condition('employees')
+@cached_response('employees')
+@async_read_view(views.employee_list_create)
+async def employee_list_create(request):
+    """
+    GET: List all employees, or search them with `q`; `fields` and
+         `format=compact` as in `views.employee_list_create`
+    POST: Create a new employee (delegated)
+    """
+    try:
+        fieldset = views.employee_list_fieldset(request.GET)
+    except FieldsetError as exc:
+        return json_response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': {exc.param: [str(exc)]}
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.GET.get('q', '').strip():
+        body, status_code = await sync_to_async(views.employee_search_response)(request.GET, fieldset)
+        return json_response(body, status=status_code)
+
+    rows = [row async for row in Employee.objects.values_list(*fieldset.columns)]
+    return json_response({
+        'success': True,
+        'count': len(rows),
+        'data': fieldset.data(rows)
+    })
+
+
+@queryset_condition(views.employee_detail_queryset)
+@cached_response('employees')
+@async_read_view(views.employee_detail)
+async def employee_detail(request, pk):
+    """
+    GET: Retrieve a single employee; `fields` narrows the fields
+    PUT, DELETE: delegated
+    """
+    fieldset = None
+    if 'fields' in request.GET:
+        try:
+            fieldset = parse_fieldset(request.GET, EMPLOYEE_FIELDS, list_format=False)
+        except FieldsetError as exc:
+            return json_response({
+                'success': False,
+                'error': {
+                    'status_code': 400,
+                    'message': 'Validation failed',
+                    'details': {exc.param: [str(exc)]}
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        if fieldset is not None:
+            row = await Employee.objects.values_list(*fieldset.columns).aget(pk=pk)
+        else:
+            employee = await Employee.objects.aget(pk=pk)
+    except Employee.DoesNotExist:
+        return json_response({
+            'success': False,
+            'error': {
+                'status_code': 404,
+                'message': f'Employee with ID {pk} not found',
+                'details': {}
+            }
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if fieldset is not None:
+        return json_response({
+            'success': True,
+            'data': fieldset.item(row)
+        })
+
+    return json_response({
+        'success': True,
+        'data': EmployeeSerializer(employee).data
+    })
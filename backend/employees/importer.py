@@ -0,0 +1,186 @@
+"""
+Bulk employee import.
+
+Rows are read as a stream and processed in chunks. Uniqueness of
+`employee_id` and (lowercased) `email` is checked against the database with
+one IN (...) query per field per chunk, and against earlier rows of the same
+import with in-memory sets. Valid rows are inserted with `bulk_create`.
+"""
+
+import csv
+import io
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from hrms_lite.cache import bump_version_on_commit
+from . import search
+from .models import Employee
+
+
+IMPORT_FIELDS = ['employee_id', 'full_name', 'email', 'department']
+IMPORT_FORMATS = ['csv', 'ndjson', 'json']
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class ImportFormatError(ValueError):
+    """Raised when the import file cannot be parsed."""
+
+
+def detect_format(filename, default='csv'):
+    """Guess the import format from a file name's extension."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension in ('jsonl', 'ndjson'):
+        return 'ndjson'
+    if extension in IMPORT_FORMATS:
+        return extension
+    return default
+
+
+def iter_rows(binary_file, import_format):
+    """Yield one dict per employee from a binary file-like object."""
+    if import_format == 'json':
+        try:
+            data = json.load(io.TextIOWrapper(binary_file, encoding='utf-8-sig'))
+        except ValueError as exc:
+            raise ImportFormatError(f'Invalid JSON: {exc}')
+        if isinstance(data, dict):
+            data = data.get('employees')
+        if not isinstance(data, list):
+            raise ImportFormatError('JSON imports must be a list of employee objects.')
+        yield from data
+        return
+
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    if import_format == 'ndjson':
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise ImportFormatError(f'Invalid JSON on line {line_number}: {exc}')
+        return
+
+    reader = csv.DictReader(text)
+    missing = set(IMPORT_FIELDS) - set(reader.fieldnames or [])
+    if missing:
+        raise ImportFormatError(f"CSV is missing columns: {', '.join(sorted(missing))}.")
+    yield from reader
+
+
+def clean_row(row):
+    """
+    Normalize one row the same way `EmployeeSerializer` does.
+
+    Returns (data, errors); duplicate checks are left to the caller.
+    """
+    if not isinstance(row, dict):
+        return None, {'non_field_errors': ['Expected an object with employee fields.']}
+
+    data = {}
+    errors = {}
+    labels = {
+        'employee_id': 'Employee ID',
+        'full_name': 'Full name',
+        'email': 'Email',
+        'department': 'Department',
+    }
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        value = value.strip() if isinstance(value, str) else ''
+        max_length = Employee._meta.get_field(field).max_length
+        if not value:
+            errors[field] = [f'{labels[field]} is required and cannot be empty.']
+        elif len(value) > max_length:
+            errors[field] = [f'Ensure this field has no more than {max_length} characters.']
+        data[field] = value
+
+    if 'email' not in errors:
+        data['email'] = data['email'].lower()
+        try:
+            validate_email(data['email'])
+        except ValidationError:
+            errors['email'] = ['Enter a valid email address.']
+
+    return data, errors
+
+
+def _existing(field, values):
+    return set(Employee.all_objects.filter(**{f'{field}__in': values}).values_list(field, flat=True))
+
+
+def import_employees(rows, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Import employees from an iterable of dicts.
+
+    Returns a report with `total`, `created`, `failed` and an `errors` list of
+    {row, employee_id, errors} entries (rows are numbered from 1).
+    """
+    report = {'total': 0, 'created': 0, 'failed': 0, 'errors': []}
+    seen_ids = set()
+    seen_emails = set()
+    chunk = []
+
+    def fail(row_number, employee_id, errors):
+        report['failed'] += 1
+        report['errors'].append({'row': row_number, 'employee_id': employee_id, 'errors': errors})
+
+    def flush():
+        if not chunk:
+            return
+        taken_ids = _existing('employee_id', [data['employee_id'] for _, data in chunk])
+        taken_emails = _existing('email', [data['email'] for _, data in chunk])
+
+        employees = []
+        for row_number, data in chunk:
+            errors = {}
+            if data['employee_id'] in taken_ids:
+                errors['employee_id'] = [f"An employee with ID '{data['employee_id']}' already exists."]
+            if data['email'] in taken_emails:
+                errors['email'] = [f"An employee with email '{data['email']}' already exists."]
+            if errors:
+                fail(row_number, data['employee_id'], errors)
+            else:
+                employees.append((row_number, Employee(**data)))
+
+        if employees and not dry_run:
+            try:
+                with transaction.atomic():
+                    created = Employee.objects.bulk_create([employee for _, employee in employees])
+                    # bulk_create skips model signals
+                    bump_version_on_commit('employees')
+                    search.record_bulk_change([employee.pk for employee in created])
+            except IntegrityError:
+                # Lost a race with a concurrent create; report the chunk as failed
+                for row_number, employee in employees:
+                    fail(row_number, employee.employee_id, {'non_field_errors': [
+                        'Conflicts with an employee created during the import.'
+                    ]})
+                employees = []
+        if not dry_run:
+            report['created'] += len(employees)
+        chunk.clear()
+
+    for row_number, row in enumerate(rows, start=1):
+        report['total'] += 1
+        data, errors = clean_row(row)
+        if data is not None:
+            if 'employee_id' not in errors and data['employee_id'] in seen_ids:
+                errors['employee_id'] = [f"Employee ID '{data['employee_id']}' appears more than once in the import."]
+            if 'email' not in errors and data['email'] in seen_emails:
+                errors['email'] = [f"Email '{data['email']}' appears more than once in the import."]
+        if errors:
+            fail(row_number, data.get('employee_id') if data else None, errors)
+            continue
+
+        seen_ids.add(data['employee_id'])
+        seen_emails.add(data['email'])
+        chunk.append((row_number, data))
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+
+    return report
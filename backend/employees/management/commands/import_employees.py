@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.importer import (
+    DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, ImportFormatError, detect_format, import_employees, iter_rows
+)
+
+
+class Command(BaseCommand):
+    help = 'Bulk import employees from a CSV, NDJSON or JSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='File format (default: from extension)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate without inserting')
+        parser.add_argument('--report', help='Write the full JSON report to this path')
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or detect_format(options['path'])
+        try:
+            with open(options['path'], 'rb') as import_file:
+                report = import_employees(
+                    iter_rows(import_file, import_format),
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run']
+                )
+        except (OSError, ImportFormatError) as exc:
+            raise CommandError(str(exc))
+
+        if options['report']:
+            with open(options['report'], 'w') as report_file:
+                json.dump(report, report_file, indent=2)
+
+        for error in report['errors'][:20]:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        if len(report['errors']) > 20:
+            self.stderr.write(f"... and {len(report['errors']) - 20} more errors")
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['total'] - report['failed']} of {report['total']} employees "
+            f"({report['failed']} failed)."
+        ))
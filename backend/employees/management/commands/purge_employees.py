@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from employees import purge
+
+
+class Command(BaseCommand):
+    help = (
+        'Finish purging the attendance history of removed employees, e.g. after '
+        'a restart interrupted a background purge.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.EMPLOYEE_PURGE_BATCH_SIZE,
+            help='Rows deleted per transaction (default: EMPLOYEE_PURGE_BATCH_SIZE)'
+        )
+
+    def handle(self, *args, **options):
+        finished = purge.purge_pending(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {finished} removed employees.'))
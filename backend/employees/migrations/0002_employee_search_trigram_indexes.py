@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+SEARCH_COLUMNS = ['employee_id', 'full_name', 'email']
+
+
+def index_name(column):
+    return f'employees_{column}_trgm'
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            # Servers built without contrib; such deployments set
+            # EMPLOYEE_SEARCH=memory
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        # UPPER(column) is what `icontains` and the search ranking compare
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name(column)} ON employees '
+            f'USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name(column)}')
+
+
+class Migration(migrations.Migration):
+    """
+    pg_trgm GIN indexes behind `GET /api/employees/?q=` on PostgreSQL. Other
+    backends search an in-memory index instead (see employees/search.py).
+    """
+
+    dependencies = [
+        ('employees', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
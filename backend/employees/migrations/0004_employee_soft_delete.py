@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeePurge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employee_pk', models.BigIntegerField(unique=True)),
+                ('employee_code', models.CharField(max_length=50)),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('records_total', models.IntegerField(default=0, help_text='Related rows when the employee was removed')),
+                ('records_deleted', models.IntegerField(default=0)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Employee Purge',
+                'verbose_name_plural': 'Employee Purges',
+                'db_table': 'employee_purges',
+            },
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, help_text='When the employee was removed', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='employees_removed_idx'),
+        ),
+    ]
@@ -1,10 +1,23 @@
+
 from django.db import models
 from django.core.validators import EmailValidator
 
 
+class ActiveEmployeeManager(models.Manager):
+    """Employees that have not been removed (see `employees.purge`)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Employee(models.Model):
     """
     Employee model representing an employee in the HRMS system.
+
+    Deleting an employee through the API only sets `deleted_at`, which
+    hides it from `objects`; its attendance history is purged in the
+    background and the row deleted last. `all_objects` includes removed
+    employees.
     """
     employee_id = models.CharField(
         max_length=50,
@@ -27,12 +40,50 @@ class Employee(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, help_text="When the employee was removed")
+
+    objects = ActiveEmployeeManager()
+    all_objects = models.Manager()
 
     class Meta:
         db_table = 'employees'
         ordering = ['-created_at']
         verbose_name = 'Employee'
         verbose_name_plural = 'Employees'
+        indexes = [
+            # Change stream read by delta sync
+            models.Index(fields=['updated_at', 'id'], name='employees_updated_idx'),
+            # Removed employees awaiting their purge
+            models.Index(fields=['deleted_at'], name='employees_removed_idx',
+                         condition=models.Q(deleted_at__isnull=False)),
+        ]
 
     def __str__(self):
         return f"{self.employee_id} - {self.full_name}"
+
+
+class EmployeePurge(models.Model):
+    """
+    Progress of deleting a removed employee's history, in batches, and
+    then the employee itself. Kept after the employee is gone.
+    """
+    employee_pk = models.BigIntegerField(unique=True)
+    employee_code = models.CharField(max_length=50)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    records_total = models.IntegerField(default=0, help_text="Related rows when the employee was removed")
+    records_deleted = models.IntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'employee_purges'
+        verbose_name = 'Employee Purge'
+        verbose_name_plural = 'Employee Purges'
+
+    def __str__(self):
+        return f"{self.employee_code} - {self.records_deleted}/{self.records_total}"
+
+    @property
+    def status(self):
+        if self.finished_at is not None:
+            return 'done'
+        return 'running' if self.records_deleted else 'pending'
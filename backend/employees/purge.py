@@ -0,0 +1,100 @@
+"""
+Employee deletion: hide at once, purge in the background.
+
+`remove` marks the employee removed (`deleted_at`), which hides it from
+`Employee.objects` and its attendance from `Attendance.objects`, sends
+`employee_removed` so derived data (rollups, bitsets, search, sync) stops
+counting it, and records an `EmployeePurge`. The DELETE request returns
+without touching the attendance history.
+
+The purge then deletes the rows that cascade from the employee in batches
+of EMPLOYEE_PURGE_BATCH_SIZE, each a plain `DELETE ... WHERE id IN (...)`
+in its own short transaction, without loading rows or sending per-row
+signals, and finally deletes the employee. It runs as the `employees.purge`
+background job (see `hrms_lite.jobs`), which a lost worker's successor
+resumes where it stopped; `manage.py purge_employees` runs any unfinished
+purge directly.
+"""
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from hrms_lite import jobs
+from .models import Employee, EmployeePurge
+from .signals import employee_removed, records_purged
+
+
+def cascades():
+    """(model, foreign key name) of the rows deleted along with an employee."""
+    return [
+        (relation.related_model, relation.field.name)
+        for relation in Employee._meta.related_objects
+        if relation.on_delete is models.CASCADE
+    ]
+
+
+def remove(employee):
+    """Hide `employee` and queue the purge of its data; returns the EmployeePurge."""
+    with transaction.atomic():
+        Employee.all_objects.filter(pk=employee.pk).update(deleted_at=timezone.now())
+        employee_removed.send(sender=Employee, instance=employee)
+        purge = EmployeePurge.objects.create(
+            employee_pk=employee.pk,
+            employee_code=employee.employee_id,
+            records_total=sum(
+                model._base_manager.filter(**{field: employee.pk}).count() for model, field in cascades()
+            ),
+        )
+        jobs.enqueue('employees.purge', employee_pk=employee.pk)
+    return purge
+
+
+def purge_batch(purge, batch_size):
+    """Delete up to `batch_size` rows of one cascade; False once none are left."""
+    quote = connection.ops.quote_name
+    for model, field in cascades():
+        pks = list(
+            model._base_manager.filter(**{field: purge.employee_pk}).values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            continue
+        column = model._meta.get_field(field).column
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote(column)} = %s '
+                f'AND {quote(model._meta.pk.column)} IN ({", ".join(["%s"] * len(pks))})',
+                [purge.employee_pk, *pks]
+            )
+            deleted = cursor.rowcount
+            records_purged.send(sender=model, employee_pk=purge.employee_pk, pks=pks)
+            EmployeePurge.objects.filter(pk=purge.pk).update(records_deleted=F('records_deleted') + deleted)
+        return True
+    return False
+
+
+def finish(purge):
+    """Delete the employee, now that nothing cascades from it."""
+    with transaction.atomic():
+        employee = Employee.all_objects.filter(pk=purge.employee_pk).first()
+        if employee is not None:
+            employee.delete()
+        EmployeePurge.objects.filter(pk=purge.pk).update(finished_at=timezone.now())
+
+
+def run(purge, batch_size=None):
+    """Purge in batches until done; resumes where an interrupted run stopped."""
+    batch_size = batch_size or settings.EMPLOYEE_PURGE_BATCH_SIZE
+    while purge_batch(purge, batch_size):
+        pass
+    finish(purge)
+
+
+def purge_pending(batch_size=None):
+    """Run every unfinished purge to completion; returns how many finished."""
+    finished = 0
+    for purge in EmployeePurge.objects.filter(finished_at__isnull=True).order_by('requested_at'):
+        run(purge, batch_size)
+        finished += 1
+    return finished
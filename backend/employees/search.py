@@ -0,0 +1,303 @@
+"""
+Ranked employee search behind `GET /api/employees/?q=`.
+
+Matches are ranked in tiers: an exact employee ID, email, name or name word
+first, then prefixes of those, then substrings, then fuzzy (trigram) matches
+that tolerate typos. At most MAX_RESULTS matches are returned.
+
+Two backends, chosen by EMPLOYEE_SEARCH:
+
+- ``trigram`` (default on PostgreSQL): one query, served by the pg_trgm GIN
+  indexes added in migration 0002.
+- ``memory`` (default elsewhere): each worker keeps a sorted array of
+  lowercased tokens, searched for prefixes with `bisect`, and trigram
+  inverted indexes for substrings and typos. It is refreshed on `Employee`
+  writes through `hrms_lite.memory_index`.
+
+Both backends only apply fuzzy matching to names; employee IDs and emails
+match by prefix or substring.
+"""
+
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+
+from hrms_lite.memory_index import WorkerIndex
+from .models import Employee
+
+
+MAX_RESULTS = 1000
+
+# Share of the query's trigrams a fuzzy match must contain; the default of
+# pg_trgm.word_similarity_threshold
+WORD_SIMILARITY = 0.6
+
+# Queries shorter than this only match prefixes
+MIN_TRIGRAM_QUERY = 3
+
+EXACT, PREFIX, SUBSTRING, FUZZY = range(4)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def backend():
+    return getattr(settings, 'EMPLOYEE_SEARCH', 'memory')
+
+
+def normalize(query):
+    return ' '.join(query.lower().split())
+
+
+def trigrams(text):
+    """pg_trgm-style trigrams: each word padded with two spaces before and one after."""
+    result = set()
+    for word in _WORD_RE.findall(text):
+        padded = f'  {word} '
+        result.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return result
+
+
+def fields(employee_id, full_name, email):
+    """The lowercased searchable values of an employee."""
+    return employee_id.lower(), full_name.lower(), email.lower()
+
+
+class EmployeeSearchIndex(WorkerIndex):
+    """
+    The search index of one worker; use `search`.
+
+    Substring and fuzzy matching work on distinct field values rather than
+    employees, so a name shared by many employees is compared once.
+    """
+
+    version_key = 'employee-search:version'
+
+    def __init__(self):
+        super().__init__()
+        self.documents = {}                 # pk -> (employee_id, full_name, email)
+        self.tokens = []                    # sorted (token, pk)
+        self.values = defaultdict(set)      # field value -> pks
+        self.inner = defaultdict(set)       # unpadded trigram -> field values containing it
+        self.named = defaultdict(set)       # full name -> pks
+        self.names = defaultdict(set)       # pg_trgm trigram -> full names
+        self.sorted_names = None
+
+    def build(self):
+        self.documents, self.tokens = {}, []
+        self.values, self.inner = defaultdict(set), defaultdict(set)
+        self.named, self.names = defaultdict(set), defaultdict(set)
+        self.sorted_names = None
+        rows = Employee.objects.order_by().values_list('pk', 'employee_id', 'full_name', 'email')
+        for pk, *row in rows.iterator(chunk_size=5000):
+            self.add(pk, fields(*row), keep_sorted=False)
+        self.tokens.sort()
+
+    def refresh(self, pks):
+        for pk in pks:
+            self.remove(pk)
+        rows = Employee.objects.filter(pk__in=list(pks)).values_list('pk', 'employee_id', 'full_name', 'email')
+        for pk, *row in rows:
+            self.add(pk, fields(*row))
+
+    @staticmethod
+    def document_tokens(document):
+        employee_id, name, email = document
+        return {employee_id, name, email, *name.split()}
+
+    def add(self, pk, document, keep_sorted=True):
+        self.documents[pk] = document
+        for token in self.document_tokens(document):
+            if keep_sorted:
+                insort(self.tokens, (token, pk))
+            else:
+                self.tokens.append((token, pk))
+        for value in document:
+            pks = self.values[value]
+            if not pks:
+                for index in range(len(value) - 2):
+                    self.inner[value[index:index + 3]].add(value)
+            pks.add(pk)
+        pks = self.named[document[1]]
+        if not pks:
+            self.sorted_names = None
+            for trigram in trigrams(document[1]):
+                self.names[trigram].add(document[1])
+        pks.add(pk)
+
+    def remove(self, pk):
+        document = self.documents.pop(pk, None)
+        if document is None:
+            return
+        for token in self.document_tokens(document):
+            index = bisect_left(self.tokens, (token, pk))
+            if index < len(self.tokens) and self.tokens[index] == (token, pk):
+                del self.tokens[index]
+        pks = self.named[document[1]]
+        pks.discard(pk)
+        if not pks:
+            del self.named[document[1]]
+            self.sorted_names = None
+            for trigram in trigrams(document[1]):
+                self.names[trigram].discard(document[1])
+        for value in document:
+            pks = self.values[value]
+            pks.discard(pk)
+            if not pks:
+                del self.values[value]
+                for index in range(len(value) - 2):
+                    self.inner[value[index:index + 3]].discard(value)
+
+    def ordered_names(self):
+        if self.sorted_names is None:
+            self.sorted_names = sorted(self.named)
+        return self.sorted_names
+
+    def by_name(self, pks, limit):
+        """The first `limit` of `pks` ordered by (name, pk)."""
+        if len(pks) <= 4 * limit:
+            return sorted(pks, key=lambda pk: (self.documents[pk][1], pk))[:limit]
+        result = []
+        for name in self.ordered_names():
+            result.extend(sorted(self.named[name] & pks))
+            if len(result) >= limit:
+                break
+        return result[:limit]
+
+    def scan_by_name(self, query, exclude, limit):
+        """The first `limit` employees, by (name, pk), with a field containing `query`."""
+        result = []
+        for name in self.ordered_names():
+            for pk in sorted(self.named[name]):
+                if pk not in exclude and any(query in value for value in self.documents[pk]):
+                    result.append(pk)
+                    if len(result) >= limit:
+                        return result
+        return result
+
+    def search(self, query):
+        """Matching pks, best first."""
+        ranked, seen = [], set()
+        # Exact tokens sort first within the prefix range
+        index = bisect_left(self.tokens, (query,))
+        while index < len(self.tokens) and self.tokens[index][0].startswith(query):
+            pk = self.tokens[index][1]
+            if pk not in seen:
+                seen.add(pk)
+                ranked.append(pk)
+                if len(ranked) >= MAX_RESULTS:
+                    return ranked
+            index += 1
+        if len(query) < MIN_TRIGRAM_QUERY:
+            return ranked
+
+        # A value containing the query contains each of its trigrams
+        postings = sorted((self.inner.get(query[index:index + 3], set()) for index in range(len(query) - 2)), key=len)
+        limit = MAX_RESULTS - len(ranked)
+        if len(postings[0]) ** 2 > limit * len(self.documents):
+            # Unselective (say, the shared email domain): walking employees
+            # in rank order reaches `limit` matches sooner
+            ranked.extend(self.scan_by_name(query, seen, limit))
+        else:
+            substring = set()
+            for value in postings[0].intersection(*postings[1:]):
+                if query in value:
+                    substring.update(self.values[value])
+            ranked.extend(self.by_name(substring - seen, limit))
+        if len(ranked) >= MAX_RESULTS:
+            return ranked
+        seen.update(ranked)
+
+        # Typos: names sharing enough of the query's trigrams
+        query_trigrams = trigrams(query)
+        needed = math.ceil(WORD_SIMILARITY * len(query_trigrams))
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.names.get(trigram, ()))
+        fuzzy = [
+            (-count, name, pk)
+            for name, count in shared.items() if count >= needed
+            for pk in self.named[name] if pk not in seen
+        ]
+        ranked.extend(pk for _, _, pk in sorted(fuzzy))
+        return ranked[:MAX_RESULTS]
+
+
+_index = EmployeeSearchIndex()
+
+
+def search_ids(query):
+    """Ranked pks of the employees matching `query`, from the in-memory index."""
+    _index.sync()
+    with _index.lock:
+        return _index.search(normalize(query))
+
+
+def search_queryset(query):
+    """Employees matching `query`, ranked, in one query against the pg_trgm indexes."""
+    query = normalize(query)
+    word_start = r'(^|\W)' + re.escape(query)
+    prefix = Q(employee_id__istartswith=query) | Q(email__istartswith=query) | Q(full_name__iregex=word_start)
+    substring = Q(employee_id__icontains=query) | Q(email__icontains=query) | Q(full_name__icontains=query)
+    if len(query) >= MIN_TRIGRAM_QUERY:
+        # Every branch can use an UPPER(column) gin_trgm_ops index; prefixes
+        # are substrings, so they need no branch of their own
+        matches = substring | Q(upper_name__trigram_word_similar=query.upper())
+    else:
+        matches = prefix
+    return Employee.objects.annotate(
+        upper_name=Upper('full_name'),
+    ).filter(matches).annotate(
+        tier=Case(
+            When(Q(employee_id__iexact=query) | Q(email__iexact=query) | Q(full_name__iexact=query)
+                 | Q(full_name__iregex=word_start + r'(\W|$)'), then=Value(EXACT)),
+            When(prefix, then=Value(PREFIX)),
+            When(substring, then=Value(SUBSTRING)),
+            default=Value(FUZZY),
+            output_field=IntegerField()
+        ),
+        similarity=Greatest(
+            TrigramWordSimilarity(query, 'full_name'),
+            TrigramWordSimilarity(query, 'employee_id'),
+            TrigramWordSimilarity(query, 'email')
+        )
+    ).order_by('tier', '-similarity', 'full_name', 'id')
+
+
+def search_page(query, offset, limit, columns):
+    """
+    Rows (as `columns` tuples) of ranked matches [offset, offset + limit),
+    and whether more follow.
+    """
+    end = min(offset + limit, MAX_RESULTS)
+    if offset >= end:
+        return [], False
+    if backend() == 'trigram':
+        rows = list(search_queryset(query).values_list(*columns)[offset:end + 1])
+        return rows[:end - offset], len(rows) > end - offset and end < MAX_RESULTS
+
+    ranked = search_ids(query)
+    page = ranked[offset:end]
+    rows = {row[0]: row for row in Employee.objects.filter(pk__in=page).values_list('pk', *columns)}
+    return [rows[pk][1:] for pk in page if pk in rows], len(ranked) > end
+
+
+def record_change(pk):
+    """Refresh an employee in the in-memory index once the transaction commits."""
+    if backend() == 'memory':
+        _index.publish_on_commit({pk})
+
+
+def record_bulk_change(pks=None):
+    """Refresh many employees (None = all) once the transaction commits."""
+    if backend() == 'memory':
+        pks = set(pks) if pks is not None else None
+        if pks is not None and None in pks:
+            # The backend didn't return the pks of bulk-created rows
+            pks = None
+        _index.publish_on_commit(pks)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Employee
+from hrms_lite.renderers import datetime_formatter
+from .models import Employee, EmployeePurge
 
 
 class EmployeeSerializer(serializers.ModelSerializer):
@@ -19,10 +20,10 @@ class EmployeeSerializer(serializers.ModelSerializer):
         
         # Check for duplicate on create
         if self.instance is None:
-            if Employee.objects.filter(employee_id=value).exists():
+            if Employee.all_objects.filter(employee_id=value).exists():
                 raise serializers.ValidationError(f"An employee with ID '{value}' already exists.")
         # Check for duplicate on update (excluding current instance)
-        elif Employee.objects.filter(employee_id=value).exclude(pk=self.instance.pk).exists():
+        elif Employee.all_objects.filter(employee_id=value).exclude(pk=self.instance.pk).exists():
             raise serializers.ValidationError(f"An employee with ID '{value}' already exists.")
         
         return value.strip()
@@ -42,10 +43,10 @@ class EmployeeSerializer(serializers.ModelSerializer):
         
         # Check for duplicate on create
         if self.instance is None:
-            if Employee.objects.filter(email=value).exists():
+            if Employee.all_objects.filter(email=value).exists():
                 raise serializers.ValidationError(f"An employee with email '{value}' already exists.")
         # Check for duplicate on update (excluding current instance)
-        elif Employee.objects.filter(email=value).exclude(pk=self.instance.pk).exists():
+        elif Employee.all_objects.filter(email=value).exclude(pk=self.instance.pk).exists():
             raise serializers.ValidationError(f"An employee with email '{value}' already exists.")
         
         return value
@@ -65,3 +66,54 @@ class EmployeeListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['id', 'employee_id', 'full_name', 'email', 'department', 'created_at']
+
+
+class EmployeePurgeSerializer(serializers.ModelSerializer):
+    """
+    Progress of purging a deleted employee's history.
+    """
+    employee_id = serializers.IntegerField(source='employee_pk', read_only=True)
+    status = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = EmployeePurge
+        fields = ['employee_id', 'employee_code', 'status', 'records_total', 'records_deleted',
+                  'requested_at', 'finished_at']
+        read_only_fields = fields
+
+
+# Columns fetched for the fast list path, in EmployeeListSerializer field order
+EMPLOYEE_LIST_COLUMNS = ['id', 'employee_id', 'full_name', 'email', 'department', 'created_at']
+
+EMPLOYEE_LIST_FIELDS = EmployeeListSerializer.Meta.fields
+
+# Fields selectable with `?fields=` (see hrms_lite.fieldsets), in
+# EmployeeSerializer order: name -> (column, kind)
+EMPLOYEE_FIELDS = {
+    'id': ('id', None),
+    'employee_id': ('employee_id', None),
+    'full_name': ('full_name', None),
+    'email': ('email', None),
+    'department': ('department', None),
+    'created_at': ('created_at', 'datetime'),
+    'updated_at': ('updated_at', 'datetime'),
+}
+
+
+def employee_list_data(rows):
+    """
+    Build EmployeeListSerializer output from EMPLOYEE_LIST_COLUMNS tuples
+    without per-row serializer overhead.
+    """
+    format_datetime = datetime_formatter()
+    return [
+        {
+            'id': row[0],
+            'employee_id': row[1],
+            'full_name': row[2],
+            'email': row[3],
+            'department': row[4],
+            'created_at': format_datetime(row[5]),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,38 @@
+"""
+Employee signals, and handlers invalidating cached employee reads and
+refreshing the search index.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from hrms_lite.cache import bump_version_on_commit
+from . import search
+from .models import Employee
+
+
+# Sent with `instance` when an employee is removed (hidden, see
+# `employees.purge`); related data must stop counting it
+employee_removed = Signal()
+
+# Sent by the purge of a removed employee with `employee_pk` and `pks`, the
+# rows of `sender` it just deleted without per-row signals
+records_purged = Signal()
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, raw=False, **kwargs):
+    bump_version_on_commit('employees')
+    search.record_change(instance.pk)
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    bump_version_on_commit('employees')
+    search.record_change(instance.pk)
+
+
+@receiver(employee_removed)
+def employee_removed_handler(sender, instance, **kwargs):
+    bump_version_on_commit('employees')
+    search.record_change(instance.pk)
@@ -0,0 +1,31 @@
+"""
+Background jobs of the employees app (see `hrms_lite.jobs`).
+"""
+
+from hrms_lite import jobs
+from . import purge
+from .importer import import_employees, iter_rows
+from .models import EmployeePurge
+
+
+# An import is not repeated: its first attempt may have created employees
+@jobs.task('employees.import', max_attempts=1)
+def import_task(job, format, file):
+    """Import the job file `file`, read as a stream; the result is the import report."""
+    try:
+        with jobs.open_file(file) as stream:
+            return import_employees(iter_rows(stream, format))
+    finally:
+        jobs.delete_file(file)
+
+
+@jobs.task('employees.purge')
+def purge_task(job, employee_pk):
+    """Purge a removed employee's history (see `employees.purge`)."""
+    employee_purge = EmployeePurge.objects.filter(employee_pk=employee_pk).first()
+    if employee_purge is None:
+        return None
+    if employee_purge.finished_at is None:
+        purge.run(employee_purge)
+        employee_purge.refresh_from_db()
+    return {'records_deleted': employee_purge.records_deleted}
@@ -0,0 +1,241 @@
+"""
+Tests for the employees API.
+"""
+
+import datetime
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from attendance.models import Attendance
+from hrms_lite import jobs
+from hrms_lite.models import Job
+from . import purge
+from .importer import ImportFormatError, detect_format, import_employees, iter_rows
+from .models import Employee, EmployeePurge
+
+
+CSV = (
+    b'employee_id,full_name,email,department\n'
+    b'EMP001,Ada Lovelace,ada@example.com,Engineering\n'
+    b'EMP002,Grace Hopper,grace@example.com,Engineering\n'
+)
+
+
+def employee_row(number, **fields):
+    return {
+        'employee_id': f'EMP{number:03d}', 'full_name': f'Employee {number}',
+        'email': f'employee{number}@example.com', 'department': 'Engineering', **fields
+    }
+
+
+class EmployeeImportTests(TestCase):
+    """Streaming bulk import with set-based duplicate detection (user-004)."""
+
+    def test_rows_are_read_as_a_stream(self):
+        lines = [b'employee_id,full_name,email,department\n'] + [
+            f'EMP{number:05d},Employee {number},e{number}@example.com,Sales\n'.encode() for number in range(50000)
+        ]
+        stream = io.BytesIO(b''.join(lines))
+        rows = iter_rows(stream, 'csv')
+        self.assertEqual(next(rows)['employee_id'], 'EMP00000')
+        self.assertLess(stream.tell(), len(stream.getvalue()) // 10)
+
+    def test_formats(self):
+        ndjson = b'\n'.join(json.dumps(employee_row(number)).encode() for number in range(2)) + b'\n\n'
+        self.assertEqual([row['employee_id'] for row in iter_rows(io.BytesIO(ndjson), 'ndjson')],
+                         ['EMP000', 'EMP001'])
+        wrapped = json.dumps({'employees': [employee_row(5)]}).encode()
+        self.assertEqual(list(iter_rows(io.BytesIO(wrapped), 'json')), [employee_row(5)])
+        self.assertEqual(detect_format('people.JSONL'), 'ndjson')
+        self.assertEqual(detect_format('people.txt'), 'csv')
+
+    def test_malformed_files(self):
+        for content, import_format in [
+            (b'employee_id,email\nEMP001,a@example.com\n', 'csv'),
+            (b'{"employee_id": "EMP001"}\nnot json\n', 'ndjson'),
+            (b'{"employee_id": "EMP001"}', 'json'),
+        ]:
+            with self.subTest(import_format=import_format), self.assertRaises(ImportFormatError):
+                list(iter_rows(io.BytesIO(content), import_format))
+
+    def test_duplicates_within_the_file_and_the_database(self):
+        Employee.objects.create(**employee_row(1))
+        report = import_employees([
+            employee_row(1, email='new@example.com'),
+            employee_row(2, email='EMPLOYEE1@example.com'),
+            employee_row(3),
+            employee_row(3, email='other@example.com'),
+            employee_row(4, email='employee3@example.com'),
+            employee_row(5, email='not-an-email', full_name=' '),
+        ], chunk_size=2)
+        self.assertEqual((report['total'], report['created'], report['failed']), (6, 1, 5))
+        errors = {error['row']: error['errors'] for error in report['errors']}
+        self.assertIn('already exists', errors[1]['employee_id'][0])
+        self.assertIn('already exists', errors[2]['email'][0])
+        self.assertIn('more than once', errors[4]['employee_id'][0])
+        self.assertIn('more than once', errors[5]['email'][0])
+        self.assertEqual(set(errors[6]), {'email', 'full_name'})
+        self.assertEqual(
+            sorted(Employee.objects.values_list('employee_id', flat=True)), ['EMP001', 'EMP003']
+        )
+
+    def test_dry_run_writes_nothing(self):
+        report = import_employees([employee_row(1), employee_row(2)], dry_run=True)
+        self.assertEqual((report['created'], report['failed']), (0, 0))
+        self.assertFalse(Employee.objects.exists())
+
+    def test_endpoint(self):
+        response = self.client.post('/api/employees/import/', {'file': SimpleUploadedFile('people.csv', CSV)})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['data']['created'], 2)
+
+        response = self.client.post('/api/employees/import/', {'file': SimpleUploadedFile('people.csv', CSV)})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error']['details']['failed'], 2)
+
+        response = self.client.post(
+            '/api/employees/import/', {'file': SimpleUploadedFile('people.xml', b'<x/>')}, QUERY_STRING='format=xml'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error']['message'], 'Invalid import file')
+
+
+@override_settings(JOBS_EMBEDDED_WORKER=False)
+class EmployeeImportJobTests(TestCase):
+    """`POST /api/employees/import/?background=true` (user-023)."""
+
+    def setUp(self):
+        files_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, files_dir, ignore_errors=True)
+        settings_override = override_settings(JOBS_FILES_DIR=files_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def run_jobs(self):
+        while (job := jobs.claim('test:1')) is not None:
+            jobs.execute(job, 'test:1')
+
+    def test_upload_is_queued_as_a_file(self):
+        response = self.client.post(
+            '/api/employees/import/?background=true', {'file': SimpleUploadedFile('people.csv', CSV)}
+        )
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(pk=response.json()['data']['id'])
+        self.assertIsNone(job.payload)
+        with jobs.open_file(job.args['file']) as file:
+            self.assertEqual(file.read(), CSV)
+        self.assertFalse(Employee.objects.exists())
+
+        self.run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual((job.result['created'], job.result['failed']), (2, 0))
+        self.assertEqual(Employee.objects.count(), 2)
+        self.assertEqual(os.listdir(jobs.files_dir()), [])
+
+    def test_json_body_is_queued_as_a_file(self):
+        response = self.client.post('/api/employees/import/?background=true', [
+            {'employee_id': 'EMP001', 'full_name': 'Ada Lovelace', 'email': 'ada@example.com',
+             'department': 'Engineering'},
+            {'employee_id': 'EMP001', 'full_name': 'Duplicate', 'email': 'dup@example.com',
+             'department': 'Engineering'},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(pk=response.json()['data']['id'])
+        self.assertEqual(job.args['format'], 'json')
+        self.run_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result['created'], job.result['failed']), (Job.SUCCEEDED, 1, 1))
+
+    def test_missing_file_fails_the_job(self):
+        job = jobs.enqueue('employees.import', format='csv', file='missing.upload')
+        with self.assertLogs('hrms_lite.jobs', 'ERROR'):
+            self.run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+
+@override_settings(JOBS_EMBEDDED_WORKER=False, RESPONSE_CACHE={'ENABLED': False})
+class EmployeePurgeTests(TestCase):
+    """Deletion that hides at once and purges in batches (user-022)."""
+
+    def setUp(self):
+        self.removed, self.kept = [
+            Employee.objects.create(**employee_row(number)) for number in range(2)
+        ]
+        for day in range(1, 6):
+            Attendance.objects.create(employee=self.removed, date=datetime.date(2024, 3, day), status='present')
+        Attendance.objects.create(employee=self.kept, date=datetime.date(2024, 3, 1), status='absent')
+
+    def delete(self):
+        response = self.client.delete(f'/api/employees/{self.removed.pk}/')
+        self.assertEqual(response.status_code, 202, response.content)
+        return response.json()['data']
+
+    def test_delete_hides_the_employee_and_records(self):
+        data = self.delete()
+        self.assertEqual((data['status'], data['records_total'], data['records_deleted']), ('pending', 5, 0))
+        self.assertEqual(Attendance.all_objects.filter(employee=self.removed).count(), 5)
+
+        self.assertEqual(self.client.get(f'/api/employees/{self.removed.pk}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/attendance/employee/{self.removed.pk}/').status_code, 404)
+        self.assertEqual([row['employee_id'] for row in self.client.get('/api/employees/').json()['data']], ['EMP001'])
+        attendance = self.client.get('/api/attendance/').json()
+        self.assertEqual([row['employee_code'] for row in attendance['data']], ['EMP001'])
+        self.assertEqual(self.client.get('/api/attendance/summary/').json()['count'], 1)
+        self.assertEqual(self.client.delete(f'/api/employees/{self.removed.pk}/').status_code, 404)
+
+    def test_same_query_in_every_context(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(Attendance.objects.values_list('pk'))
+        self.assertEqual(len(queries), 1)
+
+        async def in_event_loop():
+            # Only compiled, not run
+            return str(Attendance.objects.values_list('pk').query)
+
+        self.assertEqual(async_to_sync(in_event_loop)(), str(Attendance.objects.values_list('pk').query))
+
+    def test_purge_in_batches(self):
+        self.delete()
+        employee_purge = EmployeePurge.objects.get(employee_pk=self.removed.pk)
+        self.assertTrue(purge.purge_batch(employee_purge, batch_size=2))
+        progress = self.client.get(f'/api/employees/{self.removed.pk}/purge/').json()['data']
+        self.assertEqual((progress['status'], progress['records_deleted']), ('running', 2))
+
+        self.assertEqual(purge.purge_pending(batch_size=2), 1)
+        progress = self.client.get(f'/api/employees/{self.removed.pk}/purge/').json()['data']
+        self.assertEqual((progress['status'], progress['records_deleted']), ('done', 5))
+        self.assertFalse(Employee.all_objects.filter(pk=self.removed.pk).exists())
+        self.assertFalse(Attendance.all_objects.filter(employee_id=self.removed.pk).exists())
+        self.assertEqual(Attendance.objects.count(), 1)
+        self.assertEqual(purge.purge_pending(), 0)
+
+    def test_purge_job(self):
+        self.delete()
+        job = Job.objects.get(name='employees.purge')
+        jobs.execute(jobs.claim('test:1'), 'test:1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (Job.SUCCEEDED, {'records_deleted': 5}))
+
+    def test_employee_id_is_taken_until_purged(self):
+        self.delete()
+        response = self.client.post('/api/employees/', employee_row(0), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('employee_id', response.json()['error']['details'])
+
+        purge.purge_pending()
+        response = self.client.post('/api/employees/', employee_row(0), content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_unknown_purge(self):
+        self.assertEqual(self.client.get('/api/employees/999999/purge/').status_code, 404)
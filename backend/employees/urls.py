@@ -1,7 +1,14 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Under ASGI, reads are served by the async views (see settings.ASYNC_READS)
+reads = async_views if settings.ASYNC_READS else views
 
 urlpatterns = [
-    path('', views.employee_list_create, name='employee-list-create'),
-    path('<int:pk>/', views.employee_detail, name='employee-detail'),
+    path('', reads.employee_list_create, name='employee-list-create'),
+    path('import/', views.employee_import, name='employee-import'),
+    path('export/', views.employee_export, name='employee-export'),
+    path('<int:pk>/', reads.employee_detail, name='employee-detail'),
+    path('<int:pk>/purge/', views.employee_purge, name='employee-purge'),
 ]
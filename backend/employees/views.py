@@ -1,24 +1,97 @@
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from .models import Employee
-from .serializers import EmployeeSerializer, EmployeeListSerializer
+from .models import Employee, EmployeePurge
+from .importer import ImportFormatError, IMPORT_FORMATS, detect_format, import_employees, iter_rows
+from .serializers import (
+    EmployeeSerializer, EmployeePurgeSerializer, EMPLOYEE_FIELDS, EMPLOYEE_LIST_FIELDS, employee_list_data
+)
+from . import purge, search
+from hrms_lite import jobs
+from hrms_lite.cache import cached_response
+from hrms_lite.conditional import queryset_condition, version_condition
+from hrms_lite.fieldsets import FieldsetError, parse_fieldset
+from hrms_lite.job_views import job_accepted
+from hrms_lite.pagination import PaginationError, decode_cursor, encode_cursor, get_page_size
+from hrms_lite.renderers import fast_json_response, render_json
+from hrms_lite.streaming import EXPORT_FORMATS, export_response, invalid_format_details
 
 
+def employee_detail_queryset(request, pk):
+    return Employee.objects.filter(pk=pk)
+
+
+def employee_list_fieldset(query_params):
+    """The requested fields and shape of an employee list; raises FieldsetError."""
+    return parse_fieldset(query_params, EMPLOYEE_FIELDS, EMPLOYEE_LIST_FIELDS, employee_list_data)
+
+
+def employee_search_response(query_params, fieldset):
+    """
+    Body and status of a `?q=` search: one page of ranked matches. Pages are
+    addressed by an opaque cursor holding the offset into the ranking.
+    """
+    try:
+        page_size = get_page_size(query_params, default=20, maximum=100)
+        cursor = query_params.get('cursor')
+        offset = decode_cursor(cursor, 1)[0] if cursor else 0
+        if not isinstance(offset, int) or offset < 0:
+            raise PaginationError('Invalid cursor.')
+    except PaginationError as exc:
+        return {
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Invalid pagination parameters',
+                'details': {'pagination': [str(exc)]}
+            }
+        }, status.HTTP_400_BAD_REQUEST
+
+    rows, has_more = search.search_page(query_params['q'], offset, page_size, fieldset.columns)
+    return {
+        'success': True,
+        'count': len(rows),
+        'next': encode_cursor([offset + page_size]) if has_more else None,
+        'data': fieldset.data(rows)
+    }, status.HTTP_200_OK
+
+
+@version_condition('employees')
+@cached_response('employees')
 @api_view(['GET', 'POST'])
 def employee_list_create(request):
     """
-    GET: List all employees
+    GET: List all employees, or with `q` search them by employee ID, name
+         or email; matches are ranked and paginated (`page_size`, `cursor`).
+         `fields` narrows the fields, `format=compact` returns columns.
     POST: Create a new employee
     """
     if request.method == 'GET':
-        employees = Employee.objects.all()
-        serializer = EmployeeListSerializer(employees, many=True)
-        return Response({
+        try:
+            fieldset = employee_list_fieldset(request.query_params)
+        except FieldsetError as exc:
+            return Response({
+                'success': False,
+                'error': {
+                    'status_code': 400,
+                    'message': 'Validation failed',
+                    'details': {exc.param: [str(exc)]}
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get('q', '').strip():
+            body, status_code = employee_search_response(request.query_params, fieldset)
+            if status_code != status.HTTP_200_OK:
+                return Response(body, status=status_code)
+            return fast_json_response(request, body)
+
+        rows = list(Employee.objects.values_list(*fieldset.columns))
+        return fast_json_response(request, {
             'success': True,
-            'count': employees.count(),
-            'data': serializer.data
+            'count': len(rows),
+            'data': fieldset.data(rows)
         })
 
     elif request.method == 'POST':
@@ -41,15 +114,123 @@ def employee_list_create(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@parser_classes([JSONParser, MultiPartParser])
+def employee_import(request):
+    """
+    POST: Bulk import employees.
+          Either upload a CSV/NDJSON/JSON `file` (multipart) or send a JSON
+          list of employee objects. Returns a per-row report, or with
+          `background=true` answers 202 with a job whose result is the report.
+    """
+    upload = request.FILES.get('file')
+    background = request.query_params.get('background', '').lower() in ('true', '1', 'yes')
+    try:
+        if upload is not None:
+            import_format = request.query_params.get('format') or detect_format(upload.name)
+            if import_format not in IMPORT_FORMATS:
+                raise ImportFormatError(f"Unsupported import format '{import_format}'.")
+            if background:
+                # Streamed to disk in chunks, like the import itself
+                job = jobs.enqueue('employees.import', format=import_format, file=jobs.store_file(upload.chunks()))
+                return job_accepted(job, 'Import queued')
+            report = import_employees(iter_rows(upload, import_format))
+        else:
+            rows = request.data.get('employees') if isinstance(request.data, dict) else request.data
+            if not isinstance(rows, list):
+                raise ImportFormatError("Send a 'file' upload or a JSON list of employees.")
+            if background:
+                job = jobs.enqueue('employees.import', format='json', file=jobs.store_file([render_json(rows)]))
+                return job_accepted(job, 'Import queued')
+            report = import_employees(rows)
+    except ImportFormatError as exc:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Invalid import file',
+                'details': {'file': [str(exc)]}
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if report['created'] == 0 and report['failed']:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': report
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'success': True,
+        'message': f"Imported {report['created']} of {report['total']} employees",
+        'data': report
+    }, status=status.HTTP_201_CREATED)
+
+
+EMPLOYEE_EXPORT_FIELDS = ['id', 'employee_id', 'full_name', 'email', 'department', 'created_at', 'updated_at']
+
+
+@api_view(['GET'])
+def employee_export(request):
+    """
+    GET: Stream all employees as CSV (default) or NDJSON (`format=ndjson`).
+         Optionally filtered by `department`.
+    """
+    export_format = request.query_params.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Invalid export format',
+                'details': invalid_format_details(export_format)
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    employees = Employee.objects.all()
+    department = request.query_params.get('department')
+    if department:
+        employees = employees.filter(department=department)
+    # Rows are read while streaming, after the request's routing state is
+    # gone, so resolve the database (primary or replica) now
+    employees = employees.using(employees.db)
+    rows = employees.order_by('id').values_list(*EMPLOYEE_EXPORT_FIELDS).iterator(chunk_size=2000)
+
+    return export_response(export_format, 'employees', EMPLOYEE_EXPORT_FIELDS, rows)
+
+
+@queryset_condition(employee_detail_queryset)
+@cached_response('employees')
 @api_view(['GET', 'PUT', 'DELETE'])
 def employee_detail(request, pk):
     """
-    GET: Retrieve a single employee
+    GET: Retrieve a single employee; `fields` narrows the fields
     PUT: Update an employee
-    DELETE: Delete an employee
+    DELETE: Delete an employee; answers 202 with the progress of purging
+            its attendance history (see `purge/`)
     """
+    fieldset = None
+    if request.method == 'GET' and 'fields' in request.query_params:
+        try:
+            fieldset = parse_fieldset(request.query_params, EMPLOYEE_FIELDS, list_format=False)
+        except FieldsetError as exc:
+            return Response({
+                'success': False,
+                'error': {
+                    'status_code': 400,
+                    'message': 'Validation failed',
+                    'details': {exc.param: [str(exc)]}
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+
     try:
-        employee = Employee.objects.get(pk=pk)
+        if fieldset is not None:
+            row = Employee.objects.values_list(*fieldset.columns).get(pk=pk)
+        else:
+            employee = Employee.objects.get(pk=pk)
     except Employee.DoesNotExist:
         return Response({
             'success': False,
@@ -60,6 +241,12 @@ def employee_detail(request, pk):
             }
         }, status=status.HTTP_404_NOT_FOUND)
 
+    if fieldset is not None:
+        return Response({
+            'success': True,
+            'data': fieldset.item(row)
+        })
+
     if request.method == 'GET':
         serializer = EmployeeSerializer(employee)
         return Response({
@@ -87,9 +274,33 @@ def employee_detail(request, pk):
         }, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
-        employee_id = employee.employee_id
-        employee.delete()
+        # Hidden now; the attendance history is purged in the background
+        employee_purge = purge.remove(employee)
         return Response({
             'success': True,
-            'message': f'Employee {employee_id} deleted successfully'
-        }, status=status.HTTP_200_OK)
+            'message': f'Employee {employee.employee_id} deleted successfully',
+            'data': EmployeePurgeSerializer(employee_purge).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+def employee_purge(request, pk):
+    """
+    GET: Progress of purging a deleted employee's attendance history
+    """
+    try:
+        employee_purge = EmployeePurge.objects.get(employee_pk=pk)
+    except EmployeePurge.DoesNotExist:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 404,
+                'message': f'No deletion of employee with ID {pk} found',
+                'details': {}
+            }
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'success': True,
+        'data': EmployeePurgeSerializer(employee_purge).data
+    })
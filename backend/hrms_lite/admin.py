@@ -0,0 +1,30 @@
+from django.contrib import admin
+from .models import Job, SlowQuery, SlowQuerySource
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    ordering = ('-created_at',)
+    exclude = ('payload',)
+
+
+class SlowQuerySourceInline(admin.TabularInline):
+    model = SlowQuerySource
+    extra = 0
+    can_delete = False
+    readonly_fields = ('view', 'call_site', 'calls', 'total_ms')
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('fingerprint', 'calls', 'total_ms', 'max_ms', 'last_seen')
+    search_fields = ('sql',)
+    ordering = ('-total_ms',)
+    readonly_fields = ('fingerprint', 'sql', 'calls', 'total_ms', 'max_ms', 'plan', 'explained_at',
+                       'first_seen', 'last_seen')
+    inlines = [SlowQuerySourceInline]
+
+    def has_add_permission(self, request):
+        return False
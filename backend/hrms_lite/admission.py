@@ -0,0 +1,452 @@
+"""
+Admission control: per-client rate limits and concurrency caps.
+
+`AdmissionControlMiddleware` decides before a request reaches its view:
+
+- Token buckets: every client has one bucket across all endpoints
+  (`CLIENT_RATE`, `CLIENT_BURST`) and one per URL name listed in
+  `ENDPOINT_RATES`. A request takes a token from each; if any is empty it
+  gets `429 Too Many Requests` with `Retry-After` set to when a token will
+  be back. Rejected requests take no tokens.
+- Concurrency caps: at most `CONCURRENCY_LIMITS[url name]` requests of an
+  expensive endpoint run at once across all workers; the next one gets
+  `503 Service Unavailable` with `Retry-After: SHED_RETRY_AFTER` straight
+  away rather than queueing behind them. A streaming response holds its
+  slot until the body is sent.
+
+Both are rejected before any database work, so a client hammering the
+summary or the unpaginated lists can't tie up every worker while the
+interactive UI waits. Only requests whose method is in `METHODS` (the
+reads, by default) are checked; writes always go through. Clients are told
+apart by address, honouring REST_FRAMEWORK's NUM_PROXIES like DRF
+throttles.
+
+The buckets and slots live in a store shared by the workers:
+
+- ``sqlite`` (default): a small SQLite file (`STORE_PATH`, in the temp
+  directory by default) shared by every worker process on the box.
+- ``local``: per process, for a single worker.
+- the dotted path of a `LocalStore` subclass, e.g. for a networked store.
+
+A slot left by a crashed worker frees itself after
+`CONCURRENCY_LEASE_SECONDS`. If the store fails, requests are let through.
+Off unless `ENABLED`. Configure everything in
+`settings.REST_FRAMEWORK['ADMISSION_CONTROL']`; decisions are counted per
+URL name in `/api/metrics/` and `/api/admission/stats/`.
+"""
+
+import logging
+import math
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+from .renderers import render_json
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'METHODS': ['GET', 'HEAD'],
+    'STORE': 'sqlite',
+    'STORE_PATH': '',
+    'CLIENT_RATE': None,
+    'CLIENT_BURST': None,
+    'ENDPOINT_RATES': {},
+    'CONCURRENCY_LIMITS': {},
+    'CONCURRENCY_LEASE_SECONDS': 120,
+    'SHED_RETRY_AFTER': 1,
+    'EXEMPT': [],
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Bucket rows idle this long are full again (for any burst under an hour's
+# worth of tokens) and are deleted
+IDLE_BUCKET_SECONDS = 3600
+PRUNE_INTERVAL_SECONDS = 60
+
+
+def get_setting(name):
+    return getattr(settings, 'REST_FRAMEWORK', {}).get('ADMISSION_CONTROL', {}).get(name, DEFAULTS[name])
+
+
+def parse_rate(rate):
+    """Tokens per second of a DRF-style rate such as '20/s' or '600/min'."""
+    count, period = rate.split('/')
+    return int(count) / PERIODS[period[0]]
+
+
+def bucket(key, rate, burst=None):
+    """A (key, tokens per second, capacity) bucket; the capacity defaults to one second's worth."""
+    per_second = parse_rate(rate)
+    return key, per_second, burst or max(1, math.ceil(per_second))
+
+
+def refill(state, rate, burst, now):
+    """Tokens in a bucket last left at `state` (tokens, time), or None for a new one."""
+    if state is None:
+        return burst
+    tokens, updated = state
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class LocalStore:
+    """Buckets and slots of this process only."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}    # key -> (tokens, time)
+        self.slots = {}      # key -> {token: expires}
+        self.next_prune = 0.0
+
+    def take(self, buckets):
+        """
+        Take a token from each (key, rate, burst) bucket, or from none if one
+        is empty: returns (index of the empty bucket or None, seconds to wait).
+        """
+        now = time.time()
+        with self.lock:
+            self.prune(now)
+            tokens = [refill(self.buckets.get(key), rate, burst, now) for key, rate, burst in buckets]
+            for index, ((_, rate, _), available) in enumerate(zip(buckets, tokens)):
+                if available < 1:
+                    return index, (1 - available) / rate
+            for (key, _, _), available in zip(buckets, tokens):
+                self.buckets[key] = (available - 1, now)
+        return None, 0.0
+
+    def acquire(self, key, limit, lease):
+        """A token for one of `limit` slots under `key`, or None when all are taken."""
+        now = time.time()
+        with self.lock:
+            slots = self.slots.setdefault(key, {})
+            for token, expires in list(slots.items()):
+                if expires < now:
+                    del slots[token]
+            if len(slots) >= limit:
+                return None
+            token = secrets.token_hex(8)
+            slots[token] = now + lease
+        return token
+
+    def release(self, key, token):
+        with self.lock:
+            self.slots.get(key, {}).pop(token, None)
+
+    def prune(self, now):
+        if now < self.next_prune:
+            return
+        self.next_prune = now + PRUNE_INTERVAL_SECONDS
+        for key, (_, updated) in list(self.buckets.items()):
+            if updated < now - IDLE_BUCKET_SECONDS:
+                del self.buckets[key]
+
+
+class SQLiteStore(LocalStore):
+    """
+    Buckets and slots in a SQLite file, shared by the worker processes of
+    one box. Each operation is one short `BEGIN IMMEDIATE` transaction.
+    """
+
+    busy_timeout = 0.5
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or os.path.join(tempfile.gettempdir(), 'hrms-admission.sqlite3')
+        self.local = threading.local()
+
+    def connect(self):
+        # One connection per thread, and new ones after a fork
+        db = getattr(self.local, 'db', None)
+        if db is None or self.local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            # Losing the last writes on a power cut only forgets some rate limiting
+            db.execute('PRAGMA synchronous=OFF')
+            db.execute('CREATE TABLE IF NOT EXISTS buckets '
+                       '(key TEXT PRIMARY KEY, tokens REAL, updated REAL) WITHOUT ROWID')
+            db.execute('CREATE TABLE IF NOT EXISTS slots (token TEXT PRIMARY KEY, key TEXT, expires REAL)')
+            db.execute('CREATE INDEX IF NOT EXISTS slots_key ON slots (key, expires)')
+            self.local.db, self.local.pid = db, os.getpid()
+        return db
+
+    @contextmanager
+    def transaction(self):
+        db = self.connect()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def take(self, buckets):
+        now = time.time()
+        with self.transaction() as db:
+            self.prune_table(db, now)
+            tokens = []
+            for key, rate, burst in buckets:
+                state = db.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                tokens.append(refill(state, rate, burst, now))
+            for index, ((_, rate, _), available) in enumerate(zip(buckets, tokens)):
+                if available < 1:
+                    return index, (1 - available) / rate
+            db.executemany(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                [(key, available - 1, now) for (key, _, _), available in zip(buckets, tokens)]
+            )
+        return None, 0.0
+
+    def acquire(self, key, limit, lease):
+        now = time.time()
+        with self.transaction() as db:
+            db.execute('DELETE FROM slots WHERE key = ? AND expires < ?', (key, now))
+            taken, = db.execute('SELECT COUNT(*) FROM slots WHERE key = ?', (key,)).fetchone()
+            if taken >= limit:
+                return None
+            token = secrets.token_hex(8)
+            db.execute('INSERT INTO slots (token, key, expires) VALUES (?, ?, ?)', (token, key, now + lease))
+        return token
+
+    def release(self, key, token):
+        self.connect().execute('DELETE FROM slots WHERE token = ?', (token,))
+
+    def prune_table(self, db, now):
+        if now < self.next_prune:
+            return
+        self.next_prune = now + PRUNE_INTERVAL_SECONDS
+        db.execute('DELETE FROM buckets WHERE updated < ?', (now - IDLE_BUCKET_SECONDS,))
+
+
+STORES = {'local': LocalStore, 'sqlite': SQLiteStore}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                name = get_setting('STORE')
+                if name == 'sqlite':
+                    _store = SQLiteStore(get_setting('STORE_PATH') or None)
+                else:
+                    _store = (STORES.get(name) or import_string(name))()
+    return _store
+
+
+@receiver(setting_changed)
+def reset_store(setting, **kwargs):
+    global _store
+    if setting == 'REST_FRAMEWORK':
+        _store = None
+
+
+class AdmissionStats:
+    """Thread-safe decision counters per view."""
+
+    DECISIONS = ('allowed', 'throttled', 'shed', 'error')
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, view_name, decision):
+        with self._lock:
+            key = (view_name, decision)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def snapshot(self):
+        snapshot = {}
+        for (view_name, decision), count in self.counters().items():
+            snapshot.setdefault(view_name, dict.fromkeys(self.DECISIONS, 0))[decision] = count
+        return snapshot
+
+
+stats = AdmissionStats()
+
+
+def client_ident(request):
+    """
+    The client's address, as DRF throttles identify it: REMOTE_ADDR, or the
+    entry NUM_PROXIES from the end of X-Forwarded-For.
+    """
+    return BaseThrottle().get_ident(request)
+
+
+def rejection(status_code, message, retry_after):
+    response = HttpResponse(render_json({
+        'success': False,
+        'error': {
+            'status_code': status_code,
+            'message': message,
+            'details': {}
+        }
+    }), content_type='application/json', status=status_code)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def release_after(content, release):
+    try:
+        yield from content
+    finally:
+        release()
+
+
+async def arelease_after(content, release):
+    try:
+        async for chunk in content:
+            yield chunk
+    finally:
+        await sync_to_async(release, thread_sensitive=False)()
+
+
+class Admission:
+    """The outcome for one request: a rejection, or a slot to give back."""
+
+    def __init__(self, response=None, slot=None):
+        self.response = response
+        self.slot = slot
+
+    def release(self):
+        if self.slot is not None:
+            key, token = self.slot
+            self.slot = None
+            try:
+                get_store().release(key, token)
+            except Exception:
+                logger.warning('Could not release admission slot %s', key, exc_info=True)
+
+    def finish(self, response):
+        if self.slot is None:
+            return response
+        if response.streaming:
+            wrap = arelease_after if response.is_async else release_after
+            response.streaming_content = wrap(response.streaming_content, self.release)
+        else:
+            self.release()
+        return response
+
+
+def admit(request):
+    """Decide whether `request` may proceed; see the module docstring."""
+    if not get_setting('ENABLED') or request.method not in get_setting('METHODS'):
+        return Admission()
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        match = None
+    else:
+        # So a rejected request is still attributed to its view (metrics)
+        request.resolver_match = match
+    view = match.url_name if match is not None and match.url_name else 'unmatched'
+    if view in get_setting('EXEMPT'):
+        return Admission()
+
+    client = client_ident(request)
+    buckets = []
+    if get_setting('CLIENT_RATE'):
+        buckets.append(bucket(f'client:{client}', get_setting('CLIENT_RATE'), get_setting('CLIENT_BURST')))
+    endpoint_rate = get_setting('ENDPOINT_RATES').get(view)
+    if endpoint_rate:
+        rate, burst = endpoint_rate if isinstance(endpoint_rate, (list, tuple)) else (endpoint_rate, None)
+        buckets.append(bucket(f'endpoint:{view}:{client}', rate, burst))
+    limit = get_setting('CONCURRENCY_LIMITS').get(view)
+
+    try:
+        store = get_store()
+        if buckets:
+            empty, wait = store.take(buckets)
+            if empty is not None:
+                stats.record(view, 'throttled')
+                return Admission(rejection(
+                    429, f'Request was throttled. Expected available in {math.ceil(wait)} seconds.',
+                    math.ceil(wait)
+                ))
+        slot = None
+        if limit:
+            key = f'concurrency:{view}'
+            token = store.acquire(key, limit, get_setting('CONCURRENCY_LEASE_SECONDS'))
+            if token is None:
+                stats.record(view, 'shed')
+                retry_after = get_setting('SHED_RETRY_AFTER')
+                return Admission(rejection(
+                    503, f'Server is busy. Retry in {retry_after} seconds.', retry_after
+                ))
+            slot = (key, token)
+    except Exception:
+        # Never turn a store problem into an outage
+        logger.warning('Admission control store failed; letting the request through', exc_info=True)
+        stats.record(view, 'error')
+        return Admission()
+    stats.record(view, 'allowed')
+    return Admission(slot=slot)
+
+
+class AdmissionControlMiddleware:
+    """
+    Apply rate limits and concurrency caps before the view runs.
+
+    Both sync and async capable. Under ASGI the store is called in a worker
+    thread rather than the event loop, since SQLite blocks while another
+    worker holds its lock; not the thread sync views run in either, so a
+    shed request isn't queued behind the ones it is shed for.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        admission = admit(request)
+        if admission.response is not None:
+            return admission.response
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            admission.release()
+            raise
+        return admission.finish(response)
+
+    async def __acall__(self, request):
+        admission = await sync_to_async(admit, thread_sensitive=False)(request)
+        if admission.response is not None:
+            return admission.response
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            await sync_to_async(admission.release, thread_sensitive=False)()
+            raise
+        if response.streaming:
+            return admission.finish(response)
+        await sync_to_async(admission.release, thread_sensitive=False)()
+        return response
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class HrmsLiteConfig(AppConfig):
+    name = 'hrms_lite'
+    verbose_name = 'HRMS Lite'
+
+    def ready(self):
+        # Register the background job tasks of every app (see hrms_lite.jobs)
+        autodiscover_modules('tasks')
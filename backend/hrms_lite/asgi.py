@@ -7,5 +7,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hrms_lite.settings')
+# Route JSON reads to the async views unless explicitly disabled
+os.environ.setdefault('ASYNC_READS', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,60 @@
+"""
+Helpers for the async (ASGI) read path.
+
+Each app's `async_views` module serves JSON GET requests with the async ORM,
+so a worker can keep many slow requests in flight while it waits on the
+database or the client. Everything else — writes, and content types other
+than JSON such as the browsable API — goes to the regular DRF view,
+which runs in a thread.
+
+The async views are enabled with the `ASYNC_READS` setting (on by default
+under `hrms_lite.asgi`).
+"""
+
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .renderers import render_json
+
+
+def negotiates_json(request):
+    """True when DRF content negotiation would answer `request` with JSON."""
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    try:
+        renderer, _ = DefaultContentNegotiation().select_renderer(Request(request), renderers)
+    except NotAcceptable:
+        return False
+    return renderer.format == 'json'
+
+
+def json_response(data, status=200):
+    """Render `data` exactly as DRF's JSONRenderer would."""
+    return HttpResponse(render_json(data), status=status, content_type='application/json')
+
+
+def async_read_view(sync_view):
+    """
+    Decorate a coroutine that handles JSON GET requests; every other request
+    is passed to `sync_view`, the DRF view for the same URL.
+    """
+    delegate = sync_to_async(sync_view)
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not negotiates_json(request):
+                return await delegate(request, *args, **kwargs)
+            return await handler(request, *args, **kwargs)
+
+        # DRF views are CSRF exempt (authentication enforces CSRF instead);
+        # delegated writes must be too
+        view.csrf_exempt = True
+        return view
+
+    return decorator
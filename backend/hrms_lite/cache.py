@@ -0,0 +1,224 @@
+"""
+Versioned response cache for the HRMS Lite read endpoints.
+
+Every cached response is keyed by the request plus the current version of
+each model it depends on. The versions are shared counters in the database
+(`hrms_lite.versions`). Every committed write advances them (see the
+`signals` modules of the apps), so a write in any worker stops every worker
+from serving the old entries. Stale entries are never served; they stop
+being looked up and age out of the backend.
+
+Two storage backends are available through `settings.RESPONSE_CACHE`:
+
+- ``lru``: a per-process LRU capped at ``MAX_ENTRIES`` responses (default)
+- ``django``: the Django cache alias ``CACHE_ALIAS``, shared across workers
+"""
+
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from . import versions
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'BACKEND': 'lru',
+    'MAX_ENTRIES': 256,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+_VERSION_NAME = 'response-cache:{}'
+
+
+def get_setting(name):
+    return getattr(settings, 'RESPONSE_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class LRUBackend:
+    """In-process least-recently-used store with a maximum entry count and TTL."""
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend:
+    """Store entries in a Django cache alias so workers share them."""
+
+    def __init__(self, alias, timeout):
+        self.alias = alias
+        self.timeout = timeout
+
+    def get(self, key):
+        return caches[self.alias].get(key)
+
+    def set(self, key, value):
+        caches[self.alias].set(key, value, self.timeout)
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if get_setting('BACKEND') == 'django':
+                    _backend = DjangoCacheBackend(get_setting('CACHE_ALIAS'), get_setting('TIMEOUT'))
+                else:
+                    _backend = LRUBackend(get_setting('MAX_ENTRIES'), get_setting('TIMEOUT'))
+    return _backend
+
+
+def reset_backend():
+    """Drop the configured backend so it is rebuilt from settings on next use."""
+    global _backend
+    _backend = None
+
+
+def get_versions(labels):
+    """Return the current version of each label."""
+    return versions.get_many([_VERSION_NAME.format(label) for label in labels])
+
+
+def bump_version(label):
+    """Invalidate every cached response that depends on `label`, in every worker."""
+    return versions.bump(_VERSION_NAME.format(label))
+
+
+def bump_version_on_commit(label):
+    """Bump `label` once the current transaction (if any) commits."""
+    versions.bump_on_commit(_VERSION_NAME.format(label))
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters per view."""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, view_name, hit):
+        with self._lock:
+            counts = self._counts.setdefault(view_name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {name: {'hits': hits, 'misses': misses} for name, (hits, misses) in self._counts.items()}
+
+
+stats = CacheStats()
+
+
+def _lookup(view_name, labels, request):
+    """Return (cache key, cached response or None) for a GET request."""
+    current = get_versions(labels)
+    raw_key = '|'.join([
+        view_name, request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), *map(str, current)
+    ])
+    key = 'response-cache:' + hashlib.sha1(raw_key.encode('utf-8')).hexdigest()
+
+    entry = get_backend().get(key)
+    if entry is None:
+        stats.record(view_name, hit=False)
+        return key, None
+
+    stats.record(view_name, hit=True)
+    content, headers = entry
+    response = HttpResponse(content)
+    for header, value in headers:
+        response[header] = value
+    response['X-Cache'] = 'HIT'
+    return key, response
+
+
+def _store(key, response):
+    """Cache a successful, fully rendered response under `key`."""
+    if response.status_code == 200 and not response.streaming:
+        if callable(getattr(response, 'render', None)) and not response.is_rendered:
+            response.render()
+        headers = [(h, v) for h, v in response.items() if h.lower() != 'content-length']
+        get_backend().set(key, (response.content, headers))
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_response(*labels):
+    """
+    Cache successful GET responses of a view, keyed by the request and the
+    versions of `labels`. Adds an `X-Cache: HIT|MISS` header.
+
+    Coroutine views are supported; their cache reads and writes run in a
+    worker thread, since the versions are read from the database.
+    """
+    def decorator(view):
+        # DRF's api_view exposes the decorated function's name on `cls`
+        view_name = getattr(view, 'cls', view).__name__
+
+        if asyncio.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method != 'GET' or not get_setting('ENABLED'):
+                    return await view(request, *args, **kwargs)
+
+                key, cached = await sync_to_async(_lookup)(view_name, labels, request)
+                if cached is not None:
+                    return cached
+                response = await view(request, *args, **kwargs)
+                return await sync_to_async(_store)(key, response)
+
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or not get_setting('ENABLED'):
+                return view(request, *args, **kwargs)
+
+            key, cached = _lookup(view_name, labels, request)
+            if cached is not None:
+                return cached
+            return _store(key, view(request, *args, **kwargs))
+
+        return wrapper
+    return decorator
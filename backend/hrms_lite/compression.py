@@ -0,0 +1,97 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+`CompressionMiddleware` compresses complete (non-streaming) responses of at
+least RESPONSE_COMPRESSION_MIN_SIZE bytes whose type is JSON or text. It
+uses brotli when the client accepts it and the `brotli` package is
+installed, otherwise gzip. Streaming responses (exports) and event streams
+are passed through untouched.
+
+Both run at moderate levels: bodies are compressed on every request,
+including response cache hits, so speed matters more than the last few
+percent of ratio.
+"""
+
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+EXCLUDED_TYPES = ('text/event-stream',)
+
+_CODING_RE = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header; malformed entries are skipped."""
+    accepted = {}
+    for part in header.split(','):
+        match = _CODING_RE.match(part)
+        if not match:
+            continue
+        try:
+            accepted[match.group(1).lower()] = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+    return accepted
+
+
+def choose_encoding(header):
+    """'br', 'gzip' or None for an Accept-Encoding header, preferring brotli on ties."""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get('*', 0)
+    candidates = [('br', accepted.get('br', wildcard))] if brotli is not None else []
+    candidates.append(('gzip', accepted.get('gzip', wildcard)))
+    encoding, quality = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if quality > 0 else None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress large JSON/text responses with brotli or gzip."""
+
+    def process_response(self, request, response):
+        if not getattr(settings, 'RESPONSE_COMPRESSION', True):
+            return response
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES) or content_type.startswith(EXCLUDED_TYPES):
+            return response
+
+        # The body depends on Accept-Encoding even when it goes out as is
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024):
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The compressed bytes differ from the identity ones
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
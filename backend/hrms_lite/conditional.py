@@ -0,0 +1,185 @@
+"""
+Conditional GET support (ETag / Last-Modified).
+
+List views (`version_condition`) take their ETag from the shared versions of
+the tables they read (see `hrms_lite.cache`), which every committed write
+advances: one primary-key lookup, whatever the size of the list, rather
+than an aggregate over the filtered rows. Lists get no Last-Modified, as a
+version says that something changed but not when.
+
+Single-row views (`queryset_condition`) get an ETag and Last-Modified from
+one aggregate over the row — row count plus the newest `updated_at`.
+
+Either way the validators are computed before the view runs any
+serialization, and Django's `condition` decorator answers If-None-Match /
+If-Modified-Since with 304 Not Modified. Async views get the same behaviour
+with the queries run through the async ORM or a worker thread.
+"""
+
+import asyncio
+import datetime
+import functools
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from .cache import get_versions
+
+
+def _aggregates(timestamp_fields):
+    return {
+        'row_count': Count('pk'),
+        **{f'latest_{index}': Max(field) for index, field in enumerate(timestamp_fields)}
+    }
+
+
+def _build_validators(request, key, timestamp_fields, aggregates):
+    """Turn the aggregate row into (etag, last_modified)."""
+    timestamps = [aggregates[f'latest_{index}'] for index in range(len(timestamp_fields))]
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    if not aggregates['row_count']:
+        return None, None
+    last_modified = max(timestamps) if timestamps else None
+    raw = '|'.join([
+        key, request.get_full_path(), request.META.get('HTTP_ACCEPT', ''),
+        str(aggregates['row_count']), *(timestamp.isoformat() for timestamp in timestamps)
+    ])
+    return 'W/"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest(), last_modified
+
+
+def _validators(request, key, get_queryset, timestamp_fields, args, kwargs):
+    """Compute (etag, last_modified) once per request."""
+    memo = request.__dict__.setdefault('_conditional_validators', {})
+    if key in memo:
+        return memo[key]
+
+    validators = (None, None)
+    if request.method in ('GET', 'HEAD'):
+        if callable(timestamp_fields):
+            timestamp_fields = timestamp_fields(request)
+        queryset = get_queryset(request, *args, **kwargs)
+        aggregates = queryset.order_by().aggregate(**_aggregates(timestamp_fields))
+        validators = _build_validators(request, key, timestamp_fields, aggregates)
+
+    memo[key] = validators
+    return validators
+
+
+async def _avalidators(request, key, get_queryset, timestamp_fields, args, kwargs):
+    """Async variant of `_validators`, sharing its per-request memo."""
+    memo = request.__dict__.setdefault('_conditional_validators', {})
+    if key in memo:
+        return memo[key]
+
+    validators = (None, None)
+    if request.method in ('GET', 'HEAD'):
+        if callable(timestamp_fields):
+            timestamp_fields = timestamp_fields(request)
+        queryset = get_queryset(request, *args, **kwargs)
+        aggregates = await queryset.order_by().aaggregate(**_aggregates(timestamp_fields))
+        validators = _build_validators(request, key, timestamp_fields, aggregates)
+
+    memo[key] = validators
+    return validators
+
+
+def _version_etag(request, key, labels):
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    raw = '|'.join([
+        key, request.get_full_path(), request.META.get('HTTP_ACCEPT', ''),
+        *(str(version) for version in get_versions(labels))
+    ])
+    return 'W/"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _async_condition(get_validators, view):
+    """
+    What `condition` does, for a coroutine view (Django 4.2's is sync only).
+    `get_validators(request, args, kwargs)` returns (etag, last_modified).
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        etag, last_modified = await get_validators(request, args, kwargs)
+        etag = quote_etag(etag) if etag is not None else None
+        if last_modified is not None:
+            if not timezone.is_aware(last_modified):
+                last_modified = timezone.make_aware(last_modified, datetime.timezone.utc)
+            last_modified = int(last_modified.timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+
+        if request.method in ('GET', 'HEAD'):
+            if last_modified and not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(last_modified)
+            if etag:
+                response.headers.setdefault('ETag', etag)
+        return response
+
+    return wrapper
+
+
+def queryset_condition(get_queryset, timestamp_fields=('updated_at',)):
+    """
+    Decorate a single-row view so GET/HEAD responses carry ETag and
+    Last-Modified validators derived from `get_queryset(request, *args,
+    **kwargs)`.
+
+    `timestamp_fields` are the fields whose maximum marks a change, e.g. the
+    row's own `updated_at` and that of a joined employee, or a function of
+    the request returning them. Empty querysets produce no validators, so
+    404s are never answered with 304. Lists use `version_condition`: rows
+    can leave them without a newer timestamp, and the aggregate would cost
+    as much as the list.
+    """
+    key = f'{get_queryset.__module__}.{get_queryset.__qualname__}'
+
+    def etag_func(request, *args, **kwargs):
+        return _validators(request, key, get_queryset, timestamp_fields, args, kwargs)[0]
+
+    def last_modified_func(request, *args, **kwargs):
+        return _validators(request, key, get_queryset, timestamp_fields, args, kwargs)[1]
+
+    async def get_validators(request, args, kwargs):
+        return await _avalidators(request, key, get_queryset, timestamp_fields, args, kwargs)
+
+    sync_decorator = condition(etag_func=etag_func, last_modified_func=last_modified_func)
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            return _async_condition(get_validators, view)
+        return sync_decorator(view)
+
+    return decorator
+
+
+def version_condition(*labels):
+    """
+    Decorate a list view so GET/HEAD responses carry an ETag derived from
+    the request and the versions of `labels`, the tables the list reads.
+    """
+
+    def decorator(view):
+        # The name alone, so a view and its async version agree; DRF's
+        # api_view exposes the decorated function's name on `cls`
+        key = getattr(view, 'cls', view).__name__
+
+        if asyncio.iscoroutinefunction(view):
+            async def get_validators(request, args, kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return None, None
+                return await sync_to_async(_version_etag)(request, key, labels), None
+
+            return _async_condition(get_validators, view)
+
+        return condition(etag_func=lambda request, *args, **kwargs: _version_etag(request, key, labels))(view)
+
+    return decorator
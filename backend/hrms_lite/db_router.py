@@ -0,0 +1,135 @@
+"""
+Read-replica routing for the HRMS Lite API.
+
+When a `replica` database is configured (see `DB_REPLICA_*` in settings),
+`ReplicaMiddleware` marks GET and HEAD requests as replica readers and
+`ReplicaRouter` sends their reads there. Everything else stays on the
+primary (`default`):
+
+- writes, and every read after the first write of the same request;
+- reads inside a transaction on the primary;
+- reads outside a request (management commands, shell);
+- all requests for `DB_REPLICA_PIN_SECONDS` after any write, so clients
+  (and the response cache) do not pick up rows the replica has not
+  replayed yet.
+
+The last-write timestamp is kept in the default cache, which must be shared
+by all workers for the pin to work across them.
+"""
+
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA_DB_ALIAS = 'replica'
+
+_LAST_WRITE_KEY = 'db-router:last-write'
+
+
+class RouteState:
+    """Routing decision for the current request."""
+
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+# A mutable state object, so changes made in a sync view running in a
+# thread (sync_to_async copies the context) are seen by the middleware
+_state = ContextVar('hrms_db_route', default=None)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def _pin_seconds():
+    return getattr(settings, 'DB_REPLICA_PIN_SECONDS', 0)
+
+
+def recent_write():
+    """True if any worker wrote within the last DB_REPLICA_PIN_SECONDS."""
+    pin_seconds = _pin_seconds()
+    return pin_seconds > 0 and time.time() - cache.get(_LAST_WRITE_KEY, 0) < pin_seconds
+
+
+def record_write():
+    pin_seconds = _pin_seconds()
+    if pin_seconds > 0:
+        cache.set(_LAST_WRITE_KEY, time.time(), pin_seconds)
+
+
+class ReplicaRouter:
+    """Route reads of replica-reading requests to the replica."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and not state.wrote:
+            state.wrote = True
+            if replica_configured():
+                record_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        return db != REPLICA_DB_ALIAS
+
+
+class ReplicaMiddleware:
+    """Set up the routing state for each request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def start(self, request):
+        use_replica = (
+            request.method in ('GET', 'HEAD') and replica_configured() and not recent_write()
+        )
+        return _state.set(RouteState(use_replica))
+
+    def finish(self, token):
+        state = _state.get()
+        _state.reset(token)
+        # Restart the pin once the request's transactions have committed
+        if state.wrote and replica_configured():
+            record_write()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.start(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self.finish(token)
+
+    async def __acall__(self, request):
+        token = self.start(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            self.finish(token)
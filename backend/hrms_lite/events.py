@@ -0,0 +1,268 @@
+"""
+Live events broadcast to server-sent event streams (ASGI deployments).
+
+Write paths call `publish(type, data)` once they commit. Each worker keeps
+the last LIVE_EVENTS_BACKLOG events in a ring buffer, and every stream
+subscribed to it awaits one shared future that is resolved when events
+arrive. An idle subscriber is therefore a suspended coroutine and a
+keep-alive timer; delivering an event costs one wake-up per subscriber,
+not one queue per subscriber.
+
+Event ids increase by one per event. A client that reconnects with
+`Last-Event-ID` is sent the events it missed from the ring buffer, or a
+`reset` event when they are no longer there (it should then refetch).
+
+How events reach other workers is pluggable (LIVE_EVENTS_FANOUT):
+
+- ``local`` (default): only subscribers of the worker that wrote.
+- ``cache``: through the default cache, which every worker polls for new
+  events, so it must be shared by all workers, as for the response cache.
+- the dotted path of a `LocalFanout` subclass.
+
+Django 4.2 does not notice clients disconnecting from a streaming response,
+so each stream ends after MAX_STREAM_SECONDS; `EventSource` reconnects
+automatically.
+"""
+
+import asyncio
+import collections
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from .renderers import render_json
+
+
+KEEPALIVE_SECONDS = 15
+MAX_STREAM_SECONDS = 300
+# Client reconnection delay advertised with `retry:`
+RETRY_MILLISECONDS = 2000
+
+
+def enabled():
+    return getattr(settings, 'LIVE_EVENTS', True)
+
+
+def frame(event_id, event_type, payload):
+    """One SSE message; `payload` is a line of JSON."""
+    return b'id: %d\nevent: %s\ndata: %s\n\n' % (event_id, event_type.encode(), payload)
+
+
+class Broker:
+    """The events of one worker and the streams waiting for them."""
+
+    def __init__(self, backlog):
+        self.events = collections.deque(maxlen=backlog)     # (id, frame)
+        # Start at a random point so ids from a previous process don't match
+        self.head = random.getrandbits(48)
+        self.lock = threading.Lock()
+        self.loop = None
+        self.waiter = None
+        self.fanout = None
+
+    def get_fanout(self):
+        if self.fanout is None:
+            name = getattr(settings, 'LIVE_EVENTS_FANOUT', 'local')
+            fanout_class = FANOUTS.get(name) or import_string(name)
+            self.fanout = fanout_class(self)
+        return self.fanout
+
+    def attach(self):
+        """Bind to the running event loop; called by each new stream."""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop, self.waiter = loop, None
+            self.get_fanout().start()
+
+    def deliver(self, events):
+        """
+        Add (id, type, payload) events in id order, an id of None taking the
+        next one; callable from any thread.
+        """
+        with self.lock:
+            for event_id, event_type, payload in events:
+                if event_id is None:
+                    event_id = self.head + 1
+                if event_id > self.head:
+                    self.events.append((event_id, frame(event_id, event_type, payload)))
+                    self.head = event_id
+            loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.wake)
+
+    def restart_at(self, head):
+        """Drop the buffered events and continue from id `head`."""
+        with self.lock:
+            self.events.clear()
+            self.head = head
+
+    def wake(self):
+        waiter, self.waiter = self.waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def wait(self):
+        """A future resolved when events next arrive, shared by all streams."""
+        if self.waiter is None:
+            self.waiter = self.loop.create_future()
+        return self.waiter
+
+    def since(self, last_id):
+        """The (id, frame) events after `last_id`, or None if some are missing."""
+        with self.lock:
+            if last_id > self.head:
+                return None
+            newer = []
+            for event in reversed(self.events):
+                if event[0] <= last_id:
+                    return newer[::-1]
+                newer.append(event)
+            if last_id < self.head and (not self.events or self.events[0][0] > last_id + 1):
+                return None
+            return newer[::-1]
+
+    async def stream(self, last_event_id=None):
+        """The body of one SSE response, resuming after `last_event_id` if valid."""
+        self.attach()
+        yield b'retry: %d\n\n' % RETRY_MILLISECONDS
+        last_id = self.head
+        if last_event_id is not None:
+            try:
+                last_id = int(last_event_id)
+            except ValueError:
+                last_id = -1
+        deadline = time.monotonic() + MAX_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            events = self.since(last_id)
+            if events is None:
+                # The client missed events we no longer have
+                last_id = self.head
+                yield frame(last_id, 'reset', b'{}')
+                continue
+            if events:
+                last_id = events[-1][0]
+                yield b''.join(data for _, data in events)
+                continue
+            try:
+                await asyncio.wait_for(asyncio.shield(self.wait()), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b': keepalive\n\n'
+
+
+class LocalFanout:
+    """Deliver events to the subscribers of the worker that published them."""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def active(self):
+        """Whether anyone could receive an event published now."""
+        return self.broker.loop is not None
+
+    def start(self):
+        """Called on the worker's event loop when it gets its first stream."""
+
+    def publish(self, event_type, payload):
+        self.broker.deliver([(None, event_type, payload)])
+
+
+class CacheFanout(LocalFanout):
+    """
+    Share events through the default cache: publishing stores the event
+    under the next value of a shared sequence, and each worker with streams
+    polls the sequence and delivers the new events locally.
+    """
+
+    sequence_key = 'live-events:sequence'
+    poll_interval = 0.5
+    timeout = 60
+    # How long to wait for an event whose id was taken but which isn't stored yet
+    missing_grace = 5
+
+    def active(self):
+        return True
+
+    def current(self):
+        head = cache.get(self.sequence_key)
+        if head is None:
+            # Start at a random point, as `Broker` does
+            cache.add(self.sequence_key, random.getrandbits(48), None)
+            head = cache.get(self.sequence_key)
+        return head
+
+    def start(self):
+        # Once per worker: take the shared ids before the first stream reads them
+        self.broker.restart_at(self.current())
+        asyncio.get_running_loop().create_task(self.poll())
+
+    def event_key(self, event_id):
+        return f'live-events:{event_id}'
+
+    def publish(self, event_type, payload):
+        try:
+            event_id = cache.incr(self.sequence_key)
+        except ValueError:
+            self.current()
+            event_id = cache.incr(self.sequence_key)
+        cache.set(self.event_key(event_id), (event_type, payload), self.timeout)
+
+    async def poll(self):
+        broker, loop = self.broker, asyncio.get_running_loop()
+        seen, waiting_since = broker.head, None
+        while broker.loop is loop:
+            await asyncio.sleep(self.poll_interval)
+            head = await cache.aget(self.sequence_key)
+            if head is None or head == seen:
+                continue
+            if head < seen or head - seen > broker.events.maxlen:
+                # The cache lost the sequence, or too much was missed: follow
+                # it from here; resuming clients get a reset
+                seen = head
+                broker.restart_at(head)
+                continue
+
+            ids = range(seen + 1, head + 1)
+            stored = await cache.aget_many([self.event_key(event_id) for event_id in ids])
+            events = []
+            for event_id in ids:
+                event = stored.get(self.event_key(event_id))
+                if event is None:
+                    # Its id is taken, but the writer may not have stored it
+                    # yet; after the grace period it counts as lost
+                    waiting_since = waiting_since or time.monotonic()
+                    if time.monotonic() - waiting_since < self.missing_grace:
+                        break
+                else:
+                    events.append((event_id, *event))
+                seen = event_id
+            else:
+                waiting_since = None
+            if events:
+                broker.deliver(events)
+
+
+FANOUTS = {'local': LocalFanout, 'cache': CacheFanout}
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = Broker(getattr(settings, 'LIVE_EVENTS_BACKLOG', 1000))
+    return _broker
+
+
+def active():
+    """Whether events published now could reach a subscriber; skip building them if not."""
+    return enabled() and get_broker().get_fanout().active()
+
+
+def publish(event_type, data):
+    """Send `data` (JSON primitives) to every stream as a `event_type` event."""
+    if active():
+        get_broker().get_fanout().publish(event_type, render_json(data))
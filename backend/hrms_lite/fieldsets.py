@@ -0,0 +1,120 @@
+"""
+Sparse fieldsets (`?fields=`) and the compact list shape (`?format=compact`).
+
+A resource lists its selectable fields as {name: (column, kind)}: `column`
+is the `values_list()` lookup and `kind` is None, 'date' or 'datetime'.
+Only the columns of the requested fields are fetched, so a fieldset without
+related fields skips the join. Each value is formatted as the resource's
+serializer would; a fieldset response is the full one with the other keys
+left out.
+
+The compact shape turns a list of objects into one array per field:
+
+    {"id": [1, 2], "status": ["present", "absent"]}
+"""
+
+from .renderers import datetime_formatter, format_date
+
+
+LIST_FORMATS = ('json', 'compact')
+
+
+class FieldsetError(ValueError):
+    """Raised when `fields` or `format` is invalid; `param` names the query parameter."""
+
+    def __init__(self, param, message):
+        super().__init__(message)
+        self.param = param
+
+
+class Fieldset:
+    """The fields and shape a request asked for."""
+
+    def __init__(self, spec, names, compact=False, full_data=None):
+        self.spec = spec
+        self.names = names
+        self.compact = compact
+        # Faster builder for the default fields, used when nothing was narrowed
+        self.full_data = full_data
+        self.columns = [spec[name][0] for name in names]
+
+    def has_column(self, prefix):
+        """Whether any selected column starts with `prefix`, e.g. 'employee__'."""
+        return any(column.startswith(prefix) for column in self.columns)
+
+    def columns_with(self, extra):
+        """The selected columns followed by those of `extra` not among them."""
+        return self.columns + [column for column in extra if column not in self.columns]
+
+    def formatters(self):
+        kinds = {None: None, 'date': format_date, 'datetime': datetime_formatter()}
+        return [kinds[self.spec[name][1]] for name in self.names]
+
+    def data(self, rows):
+        """
+        Render `rows`, tuples starting with `columns`; any trailing values
+        (see `columns_with`) are ignored.
+        """
+        if self.compact:
+            return self.compact_data(rows)
+        if self.full_data is not None:
+            return self.full_data(rows)
+        names = self.names
+        formatters = self.formatters()
+        if not any(formatters):
+            return [dict(zip(names, row)) for row in rows]
+        return [
+            {name: format_value(value) if format_value else value
+             for name, format_value, value in zip(names, formatters, row)}
+            for row in rows
+        ]
+
+    def compact_data(self, rows):
+        columns = list(zip(*rows)) if rows else [()] * len(self.names)
+        return {
+            name: [format_value(value) for value in column] if format_value else list(column)
+            for name, format_value, column in zip(self.names, self.formatters(), columns)
+        }
+
+    def item(self, row):
+        """Render a single row (detail endpoints)."""
+        return Fieldset(self.spec, self.names).data([row])[0]
+
+
+def parse_fields(query_params, spec):
+    """The names in `fields`, in `spec` order, or None when the parameter is absent."""
+    raw = query_params.get('fields')
+    if raw is None:
+        return None
+    requested = {name.strip() for name in raw.split(',') if name.strip()}
+    if not requested:
+        raise FieldsetError('fields', 'Name at least one field.')
+    unknown = sorted(requested - set(spec))
+    if unknown:
+        raise FieldsetError(
+            'fields',
+            f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(spec)}."
+        )
+    return [name for name in spec if name in requested]
+
+
+def parse_fieldset(query_params, spec, default=None, full_data=None, list_format=True):
+    """
+    The Fieldset for a request. Without `fields` it holds `default` (all of
+    `spec` when None) and renders with `full_data` if given. `list_format`
+    accepts `format=json|compact`; detail endpoints pass False.
+    """
+    compact = False
+    if list_format:
+        requested_format = query_params.get('format', 'json')
+        if requested_format not in LIST_FORMATS:
+            raise FieldsetError(
+                'format',
+                f"Unsupported format '{requested_format}'. Choose one of: {', '.join(LIST_FORMATS)}."
+            )
+        compact = requested_format == 'compact'
+
+    names = parse_fields(query_params, spec)
+    if names is None:
+        return Fieldset(spec, list(default or spec), compact, full_data)
+    return Fieldset(spec, names, compact)
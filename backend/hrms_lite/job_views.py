@@ -0,0 +1,65 @@
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+def job_not_found(pk):
+    return Response({
+        'success': False,
+        'error': {
+            'status_code': 404,
+            'message': f'Job with ID {pk} not found',
+            'details': {}
+        }
+    }, status=status.HTTP_404_NOT_FOUND)
+
+
+def job_accepted(job, message):
+    """The 202 answer of a request that queued `job`."""
+    data = JobSerializer(job).data
+    return Response({
+        'success': True,
+        'message': message,
+        'data': data
+    }, status=status.HTTP_202_ACCEPTED, headers={'Location': data['url']})
+
+
+@api_view(['GET'])
+def job_detail(request, pk):
+    """
+    GET: Status of a background job
+    """
+    job = Job.objects.defer('payload', 'result').filter(pk=pk).first()
+    if job is None:
+        return job_not_found(pk)
+    return Response({
+        'success': True,
+        'data': JobSerializer(job).data
+    })
+
+
+@api_view(['GET'])
+def job_result(request, pk):
+    """
+    GET: Result of a succeeded background job; 409 until it succeeds
+    """
+    job = Job.objects.defer('payload').filter(pk=pk).first()
+    if job is None:
+        return job_not_found(pk)
+    if job.status != Job.SUCCEEDED:
+        failed = job.status == Job.FAILED
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 409,
+                'message': 'Job failed' if failed else 'Job has not finished',
+                'details': {'status': [job.status], **({'error': [job.error]} if failed else {})}
+            }
+        }, status=status.HTTP_409_CONFLICT)
+    return Response({
+        'success': True,
+        'data': job.result
+    })
@@ -0,0 +1,385 @@
+"""
+Background jobs stored in the database, for work too slow for a request.
+
+Apps register tasks in a `tasks` module (imported at startup):
+
+    @jobs.task('employees.import')
+    def import_task(job, format, file):
+        ...
+        return report              # JSON primitives, stored as the result
+
+and views call `jobs.enqueue('employees.import', format='csv', file=name)`,
+answering 202 with the job; clients follow `/api/jobs/{id}/`. Large input
+such as an upload is streamed to a file with `store_file`, and only its
+name is queued.
+
+Jobs are run by `manage.py run_workers` (a pool of threads, optionally in
+several processes). A worker claims a job with a conditional UPDATE, so any
+number of workers can share the table without locks, and holds it for
+JOBS_VISIBILITY_TIMEOUT seconds, renewed while the job runs. If the worker
+dies the lease expires and the job is claimed again. A task that raises is
+retried after JOBS_RETRY_DELAY seconds, doubling each time, until it has
+run `max_attempts` times; tasks must therefore tolerate running twice.
+
+Sites without a worker process can turn JOBS_EMBEDDED_WORKER on (it is off
+by default): enqueueing then also starts a thread in the web worker that
+runs the ready jobs. So that jobs lost by a web worker that died are still
+run, the thread also starts with the process's first request and wakes at
+least once per JOBS_VISIBILITY_TIMEOUT; it prunes old jobs like
+`run_workers` does.
+"""
+
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Min, Q
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+# Candidates read per claim; workers racing for the first one try the next
+CLAIM_CANDIDATES = 10
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+class Task:
+    def __init__(self, name, function, max_attempts):
+        self.name = name
+        self.function = function
+        self.max_attempts = max_attempts
+
+
+TASKS = {}
+
+
+def task(name, max_attempts=None):
+    """
+    Register `function(job, **args)` as task `name`. `max_attempts`
+    defaults to JOBS_MAX_ATTEMPTS; use 1 for work that must not repeat.
+    """
+    def register(function):
+        TASKS[name] = Task(name, function, max_attempts)
+        return function
+    return register
+
+
+def enqueue(name, payload=None, **args):
+    """Queue task `name` with keyword `args`; it runs once the transaction commits."""
+    if name not in TASKS:
+        raise LookupError(f"Unknown task '{name}'.")
+    job = Job.objects.create(
+        name=name,
+        args=args,
+        payload=payload,
+        max_attempts=TASKS[name].max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_EMBEDDED_WORKER:
+        transaction.on_commit(start_embedded_worker)
+    return job
+
+
+def enqueue_once(name, payload=None, **args):
+    """
+    `enqueue`, unless a job of task `name` is already queued or running:
+    returns (job, created) with that job instead.
+    """
+    with transaction.atomic():
+        job = Job.objects.filter(name=name, status__in=[Job.QUEUED, Job.RUNNING]).order_by('id').first()
+        if job is not None:
+            return job, False
+        return enqueue(name, payload, **args), True
+
+
+def lease_until(now):
+    return now + timedelta(seconds=settings.JOBS_VISIBILITY_TIMEOUT)
+
+
+def claimable(now):
+    """Queued jobs that are due, and running jobs whose worker was lost."""
+    return Q(status=Job.QUEUED, run_after__lte=now) | Q(
+        status=Job.RUNNING, locked_until__lt=now, attempts__lt=F('max_attempts')
+    )
+
+
+def fail_lost(now):
+    """Fail running jobs whose lease expired on their last attempt."""
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_until__lt=now, attempts__gte=F('max_attempts')
+    ).update(
+        status=Job.FAILED, finished_at=now, locked_until=None, payload=None,
+        error='The worker running the job stopped responding.'
+    )
+
+
+def claim(worker):
+    """Lease the next due job to `worker`; None when there is none."""
+    now = timezone.now()
+    fail_lost(now)
+    ready = claimable(now)
+    candidates = Job.objects.filter(ready).order_by('run_after', 'id').values_list('pk', flat=True)
+    for pk in candidates[:CLAIM_CANDIDATES]:
+        # Only one worker's UPDATE still matches `ready`
+        claimed = Job.objects.filter(ready, pk=pk).update(
+            status=Job.RUNNING, attempts=F('attempts') + 1, locked_until=lease_until(now),
+            worker=worker, started_at=now
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def leased(job, worker):
+    """The job, if this attempt still holds it (its lease may have been taken over)."""
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, worker=worker, attempts=job.attempts)
+
+
+def execute(job, worker):
+    """Run a claimed job and record how it went."""
+    registered = TASKS.get(job.name)
+    try:
+        if registered is None:
+            raise LookupError(f"Unknown task '{job.name}'.")
+        result = registered.function(job, **job.args)
+        leased(job, worker).update(
+            status=Job.SUCCEEDED, result=result, finished_at=timezone.now(), locked_until=None,
+            payload=None, error=''
+        )
+    except Exception as exc:
+        logger.exception('Job %s (%s) failed on attempt %d', job.pk, job.name, job.attempts)
+        now = timezone.now()
+        error = f'{type(exc).__name__}: {exc}'
+        if registered is not None and job.attempts < job.max_attempts:
+            delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            leased(job, worker).update(
+                status=Job.QUEUED, run_after=now + timedelta(seconds=delay), locked_until=None, error=error
+            )
+        else:
+            leased(job, worker).update(
+                status=Job.FAILED, finished_at=now, locked_until=None, payload=None, error=error
+            )
+
+
+def next_due():
+    """When the earliest waiting job (a retry, or an expiring lease) becomes claimable."""
+    due = Job.objects.filter(status=Job.QUEUED).aggregate(at=Min('run_after'))['at']
+    expiring = Job.objects.filter(
+        status=Job.RUNNING, attempts__lt=F('max_attempts')
+    ).aggregate(at=Min('locked_until'))['at']
+    return min((at for at in (due, expiring) if at is not None), default=None)
+
+
+def prune(now=None):
+    """
+    Delete jobs finished more than JOBS_RETENTION_DAYS ago, and job files as
+    old (left by jobs that never ran them to the end); returns how many jobs.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=settings.JOBS_RETENTION_DAYS)
+    deleted, _ = Job.objects.filter(finished_at__lt=cutoff).delete()
+    try:
+        entries = list(os.scandir(files_dir()))
+    except FileNotFoundError:
+        entries = []
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff.timestamp():
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+    return deleted
+
+
+def files_dir():
+    return settings.JOBS_FILES_DIR or os.path.join(tempfile.gettempdir(), 'hrms-job-files')
+
+
+def _file_path(name):
+    return os.path.join(files_dir(), os.path.basename(name))
+
+
+def store_file(chunks):
+    """
+    Write `chunks` of bytes (e.g. `upload.chunks()`) to a new file in
+    JOBS_FILES_DIR; returns its name, to queue as a task argument. The task
+    reads it with `open_file` and removes it with `delete_file`.
+    """
+    os.makedirs(files_dir(), exist_ok=True)
+    name = f'{uuid.uuid4().hex}.upload'
+    try:
+        with open(_file_path(name), 'xb') as file:
+            for chunk in chunks:
+                file.write(chunk)
+    except BaseException:
+        delete_file(name)
+        raise
+    return name
+
+
+def open_file(name):
+    """The job file `name`, opened for reading as bytes."""
+    return open(_file_path(name), 'rb')
+
+
+def delete_file(name):
+    try:
+        os.remove(_file_path(name))
+    except FileNotFoundError:
+        pass
+
+
+class Worker:
+    """
+    `threads` threads running jobs, while the calling thread renews their
+    leases. With `burst` the threads stop once no job is due.
+    """
+
+    def __init__(self, threads=1, burst=False):
+        self.threads = threads
+        self.burst = burst
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.running = set()
+
+    def stop(self):
+        """Let the running jobs finish, then return from `run`."""
+        self.stopping.set()
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self.work, name=f'job-worker-{number}', daemon=True)
+            for number in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        interval = settings.JOBS_VISIBILITY_TIMEOUT / 3
+        next_prune = time.monotonic()
+        try:
+            while True:
+                alive = [thread for thread in threads if thread.is_alive()]
+                if not alive:
+                    return
+                alive[0].join(interval)
+                self.renew()
+                if not self.burst and time.monotonic() >= next_prune:
+                    prune()
+                    next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+        finally:
+            connection.close()
+
+    def renew(self):
+        with self.lock:
+            running = list(self.running)
+        if running:
+            Job.objects.filter(pk__in=running, status=Job.RUNNING, worker=self.name).update(
+                locked_until=lease_until(timezone.now())
+            )
+
+    def work(self):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                job = claim(self.name)
+                if job is None:
+                    if self.burst:
+                        return
+                    self.stopping.wait(settings.JOBS_POLL_SECONDS)
+                    continue
+                with self.lock:
+                    self.running.add(job.pk)
+                try:
+                    execute(job, self.name)
+                finally:
+                    with self.lock:
+                        self.running.discard(job.pk)
+        finally:
+            connection.close()
+
+
+_lock = threading.Lock()
+_thread = None
+_wanted = False
+_timer = None
+_started = False
+_next_prune = 0.0
+
+
+def start_embedded_worker():
+    """Run the due jobs in a thread of this process, one thread at a time."""
+    global _thread, _wanted
+    with _lock:
+        _wanted = True
+        if _thread is None:
+            _thread = threading.Thread(target=_run_embedded, name='job-worker-embedded', daemon=True)
+            _thread.start()
+
+
+def _run_embedded():
+    global _thread, _wanted
+    try:
+        while True:
+            with _lock:
+                # Exit only if nobody enqueued since the last round started
+                if not _wanted:
+                    _thread = None
+                    break
+                _wanted = False
+            Worker(burst=True).run()
+        _prune_embedded()
+        _schedule_embedded(next_due())
+    except Exception:
+        logger.exception('Embedded job worker failed')
+        with _lock:
+            _thread = None
+    finally:
+        connection.close()
+
+
+def _prune_embedded():
+    global _next_prune
+    if time.monotonic() >= _next_prune:
+        prune()
+        _next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+
+
+def _schedule_embedded(at):
+    """
+    Wake the embedded worker when a retry or lease comes due, and within
+    JOBS_VISIBILITY_TIMEOUT anyway, for leases lost by other processes.
+    """
+    global _timer
+    latest = timezone.now() + timedelta(seconds=settings.JOBS_VISIBILITY_TIMEOUT)
+    at = latest if at is None else min(at, latest)
+    with _lock:
+        if _timer is not None:
+            _timer.cancel()
+        delay = max((at - timezone.now()).total_seconds(), 0) + 0.1
+        _timer = threading.Timer(delay, start_embedded_worker)
+        _timer.daemon = True
+        _timer.start()
+
+
+@receiver(request_started)
+def start_on_first_request(**kwargs):
+    """Start the embedded worker with the process, to claim jobs a dead one left."""
+    global _started
+    if _started or not settings.JOBS_EMBEDDED_WORKER:
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+    start_embedded_worker()
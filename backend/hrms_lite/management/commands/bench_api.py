@@ -0,0 +1,250 @@
+import datetime
+import json
+import platform
+import time
+import tracemalloc
+import urllib.request
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+
+from attendance import urls as attendance_urls
+from attendance.models import Attendance
+from employees import urls as employee_urls
+from employees.models import Employee
+from hrms_lite.cache import reset_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every employees/attendance endpoint and /api/health/ and report latency '
+        'percentiles, queries per request and peak memory. Results are written as JSON '
+        'and can be compared against a previous run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per endpoint')
+        parser.add_argument('--output', help='Write results to this JSON file')
+        parser.add_argument('--compare', help='Baseline JSON file from an earlier run')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Relative p95 slowdown that counts as a regression (default 0.2 = 20%%)')
+        parser.add_argument('--base-url', help='Benchmark a running server (e.g. http://127.0.0.1:8000) '
+                                               'instead of the in-process test client')
+        parser.add_argument('--no-response-cache', action='store_true', help='Disable the response cache')
+        parser.add_argument('--only', nargs='+', help='Only benchmark these URL names')
+
+    def handle(self, *args, **options):
+        employee = Employee.objects.order_by('pk').first()
+        attendance = Attendance.objects.order_by('pk').first()
+        if employee is None or attendance is None:
+            raise CommandError('No data to benchmark; run `manage.py seed_data` first.')
+
+        cases = self.build_cases(employee, attendance)
+        if options['only']:
+            cases = [case for case in cases if case['name'] in options['only']]
+
+        results = {}
+        cache_settings = {**getattr(settings, 'RESPONSE_CACHE', {})}
+        if options['no_response_cache']:
+            cache_settings['ENABLED'] = False
+        # Every request comes from one client; rate limits would measure themselves
+        rest_framework = {
+            **settings.REST_FRAMEWORK,
+            'ADMISSION_CONTROL': {**settings.REST_FRAMEWORK.get('ADMISSION_CONTROL', {}), 'ENABLED': False},
+        }
+        with override_settings(RESPONSE_CACHE=cache_settings, REST_FRAMEWORK=rest_framework):
+            reset_backend()
+            for case in cases:
+                results[case['label']] = self.run_case(case, options)
+                self.report(case['label'], results[case['label']])
+        reset_backend()
+
+        run = {
+            'meta': {
+                'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'target': options['base_url'] or 'test-client',
+                'employees': Employee.objects.count(),
+                'attendance': Attendance.objects.count(),
+                'iterations': options['iterations'],
+                'response_cache': not options['no_response_cache'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(run, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            self.compare(run, options['compare'], options['threshold'])
+
+    def build_cases(self, employee, attendance):
+        """One request description per URL name; unknown URL names are reported."""
+        builders = {
+            'employee-list-create': [{}],
+            'employee-detail': [{'kwargs': {'pk': employee.pk}}],
+            'employee-export': [{'query': {'format': 'csv'}}, {'query': {'format': 'ndjson'}}],
+            'employee-import': [{'method': 'post', 'body': self.import_payload}],
+            'attendance-list-create': [
+                {},
+                {'query': {'date': attendance.date.isoformat()}},
+                {'query': {'page_size': 100}},
+            ],
+            'attendance-bulk': [{'method': 'post', 'body': self.bulk_payload}],
+            'attendance-export': [{'query': {'format': 'csv'}}],
+            'attendance-analytics': [{'query': {'bucket': 'day'}}, {'query': {'bucket': 'month'}}],
+            'attendance-summary': [{}],
+            'attendance-detail': [{'kwargs': {'pk': attendance.pk}}],
+            'attendance-by-employee': [{'kwargs': {'employee_pk': employee.pk}}],
+        }
+
+        cases = [{'name': 'health-check', 'label': 'health-check', 'url': reverse('health-check'), 'method': 'get'}]
+        for module in (employee_urls, attendance_urls):
+            for pattern in module.urlpatterns:
+                if not isinstance(pattern, URLPattern):
+                    continue
+                if pattern.name not in builders:
+                    self.stderr.write(f'Skipping {pattern.name}: no benchmark request defined')
+                    continue
+                for spec in builders[pattern.name]:
+                    url = reverse(pattern.name, kwargs=spec.get('kwargs'))
+                    query = spec.get('query', {})
+                    label = pattern.name + ''.join(f' {key}={value}' for key, value in query.items())
+                    cases.append({
+                        'name': pattern.name,
+                        'label': label,
+                        'url': url,
+                        'query': query,
+                        'method': spec.get('method', 'get'),
+                        'body': spec.get('body'),
+                    })
+        return cases
+
+    def bulk_payload(self):
+        employee_ids = list(Employee.objects.values_list('pk', flat=True)[:500])
+        return {
+            'date': '2000-01-01',
+            'overwrite': True,
+            'records': [{'employee_id': pk, 'status': 'present'} for pk in employee_ids],
+        }
+
+    def import_payload(self):
+        stamp = time.time_ns()
+        return [
+            {'employee_id': f'BENCH-{stamp}-{i}', 'full_name': 'Bench Import',
+             'email': f'bench-{stamp}-{i}@bench.invalid', 'department': 'Bench'}
+            for i in range(100)
+        ]
+
+    def run_case(self, case, options):
+        timings = []
+        queries = []
+        for iteration in range(options['warmup'] + options['iterations']):
+            elapsed, query_count = self.request(case, options['base_url'])
+            if iteration >= options['warmup']:
+                timings.append(elapsed)
+                queries.append(query_count)
+
+        peak_memory = None
+        if not options['base_url']:
+            tracemalloc.start()
+            self.request(case, None)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'url': case['url'],
+            'method': case['method'].upper(),
+            'p50_ms': percentile(timings, 50) * 1000,
+            'p95_ms': percentile(timings, 95) * 1000,
+            'p99_ms': percentile(timings, 99) * 1000,
+            'mean_ms': sum(timings) / len(timings) * 1000,
+            'queries': None if queries[0] is None else max(queries),
+            'peak_memory_kb': None if peak_memory is None else peak_memory / 1024,
+        }
+
+    def request(self, case, base_url):
+        """Issue one request; returns (seconds, query count or None)."""
+        body = case['body']() if case.get('body') else None
+
+        if base_url:
+            url = base_url.rstrip('/') + case['url']
+            if case.get('query'):
+                url += '?' + urllib.parse.urlencode(case['query'])
+            data = json.dumps(body).encode('utf-8') if body is not None else None
+            request = urllib.request.Request(
+                url, data=data, method=case['method'].upper(), headers={'Content-Type': 'application/json'}
+            )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+            except urllib.error.HTTPError as exc:
+                raise CommandError(f"{case['label']}: HTTP {exc.code}")
+            return time.perf_counter() - started, None
+
+        client = Client(SERVER_NAME=settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost')
+        # Writes are rolled back so repeated runs see the same data
+        with transaction.atomic(), CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            if case['method'] == 'post':
+                response = client.post(case['url'], body, content_type='application/json')
+            else:
+                response = client.get(case['url'], case.get('query', {}))
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        if response.status_code >= 400:
+            raise CommandError(f"{case['label']}: HTTP {response.status_code}")
+        return elapsed, len(captured.captured_queries)
+
+    def report(self, label, result):
+        queries = '-' if result['queries'] is None else result['queries']
+        memory = '-' if result['peak_memory_kb'] is None else f"{result['peak_memory_kb']:.0f} KiB"
+        self.stdout.write(
+            f"{label:45} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+            f"p99 {result['p99_ms']:8.1f} ms  queries {queries:>4}  peak {memory}"
+        )
+
+    def compare(self, run, baseline_path, threshold):
+        try:
+            with open(baseline_path) as baseline_file:
+                baseline = json.load(baseline_file)['results']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f'Cannot read baseline {baseline_path}: {exc}')
+
+        regressions = []
+        for label, result in run['results'].items():
+            before = baseline.get(label)
+            if before is None:
+                continue
+            change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0
+            self.stdout.write(f'{label:45} p95 {before["p95_ms"]:8.1f} -> {result["p95_ms"]:8.1f} ms ({change:+.0%})')
+            if change > threshold:
+                regressions.append(f'{label}: p95 {change:+.0%}')
+            if None not in (result['queries'], before.get('queries')) and result['queries'] > before['queries']:
+                regressions.append(f"{label}: queries {before['queries']} -> {result['queries']}")
+
+        if regressions:
+            raise CommandError('Regressions detected:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(percent / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
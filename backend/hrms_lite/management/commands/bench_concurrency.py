@@ -0,0 +1,171 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from .bench_api import percentile
+
+
+# How each deployment mode is started; ASYNC_READS is pinned so the
+# comparison does not depend on the caller's environment.
+DEPLOYMENTS = {
+    'sync': (
+        ['hrms_lite.wsgi:application'],
+        {'ASYNC_READS': 'False'},
+    ),
+    'async': (
+        ['hrms_lite.asgi:application', '--worker-class', 'uvicorn_worker.UvicornWorker'],
+        {'ASYNC_READS': 'True'},
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure throughput and latency of regular clients while slow clients hold '
+        'connections open, against the sync (gunicorn) and async (gunicorn + uvicorn '
+        'workers) deployments or against already running servers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--serve', nargs='+', choices=sorted(DEPLOYMENTS), default=['sync', 'async'],
+                            help='Deployments to start with gunicorn and compare (default: both)')
+        parser.add_argument('--url', action='append', default=[],
+                            help='Benchmark a running server instead (repeatable), e.g. http://127.0.0.1:8000')
+        parser.add_argument('--path', default='/api/attendance/summary/', help='Request path')
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn workers per deployment')
+        parser.add_argument('--port', type=int, default=8765, help='Port for started servers')
+        parser.add_argument('--clients', type=int, default=10, help='Regular clients issuing back-to-back requests')
+        parser.add_argument('--slow-clients', type=int, default=50,
+                            help='Clients that trickle their request out over --slow-seconds')
+        parser.add_argument('--slow-seconds', type=float, default=2.0)
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run each benchmark')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+
+    def handle(self, *args, **options):
+        targets = [(url, url, None) for url in options['url']]
+        if not targets:
+            targets = [(mode, f"http://127.0.0.1:{options['port']}", mode) for mode in options['serve']]
+
+        results = []
+        for label, url, mode in targets:
+            server = self.start_server(mode, options) if mode else None
+            try:
+                self.stdout.write(f'Benchmarking {label} ({url}{options["path"]}) for {options["duration"]:.0f}s...')
+                result = asyncio.run(self.run(url, options))
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.wait(timeout=30)
+            results.append((label, result))
+
+        self.stdout.write('')
+        self.stdout.write(f'{"target":10} {"req/s":>8} {"ok":>6} {"errors":>7} {"p50 ms":>8} {"p95 ms":>8} '
+                          f'{"p99 ms":>8} {"slow ok":>8}')
+        for label, result in results:
+            latencies = result['latencies']
+            self.stdout.write(
+                f"{label:10} {len(latencies) / result['elapsed']:8.1f} {len(latencies):6} {result['errors']:7} "
+                f"{percentile(latencies, 50) * 1000:8.1f} {percentile(latencies, 95) * 1000:8.1f} "
+                f"{percentile(latencies, 99) * 1000:8.1f} {result['slow_completed']:8}"
+            )
+
+    def start_server(self, mode, options):
+        arguments, environment = DEPLOYMENTS[mode]
+        command = [
+            sys.executable, '-m', 'gunicorn', *arguments,
+            '--workers', str(options['workers']),
+            '--bind', f"127.0.0.1:{options['port']}",
+            '--log-level', 'warning',
+        ]
+        # All clients share one address; measure the server, not the rate limits
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR,
+                                  env={**os.environ, **environment, 'ADMISSION_CONTROL': 'False'})
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'{mode} server exited with status {server.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', options['port']), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'{mode} server did not start listening within 30 seconds')
+
+    async def run(self, url, options):
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+        raw = (
+            f"GET {options['path']} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            f"Accept: application/json\r\nConnection: close\r\n\r\n"
+        ).encode('ascii')
+
+        # Warm up every worker's connection and caches before measuring
+        await asyncio.gather(*(self.request(host, port, raw, 0, options['timeout']) for _ in range(options['workers'] * 2)),
+                             return_exceptions=True)
+
+        deadline = time.monotonic() + options['duration']
+        latencies = []
+        counters = {'errors': 0, 'slow_completed': 0}
+
+        async def regular_client():
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = await self.request(host, port, raw, 0, options['timeout'])
+                except (OSError, asyncio.TimeoutError, ValueError):
+                    counters['errors'] += 1
+                    continue
+                if status == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    counters['errors'] += 1
+
+        async def slow_client():
+            while time.monotonic() < deadline:
+                try:
+                    if await self.request(host, port, raw, options['slow_seconds'], options['timeout']) == 200:
+                        counters['slow_completed'] += 1
+                except (OSError, asyncio.TimeoutError, ValueError):
+                    pass
+
+        started = time.monotonic()
+        await asyncio.gather(
+            *(regular_client() for _ in range(options['clients'])),
+            *(slow_client() for _ in range(options['slow_clients'])),
+        )
+        latencies.sort()
+        return {'latencies': latencies, 'elapsed': time.monotonic() - started, **counters}
+
+    async def request(self, host, port, raw, trickle_seconds, timeout):
+        """Send one request, spreading it over `trickle_seconds`; return the status code."""
+        async def exchange():
+            reader, writer = await asyncio.open_connection(host, port)
+            try:
+                if trickle_seconds:
+                    steps = 10
+                    size = -(-len(raw) // steps)
+                    for offset in range(0, len(raw), size):
+                        writer.write(raw[offset:offset + size])
+                        await writer.drain()
+                        await asyncio.sleep(trickle_seconds / steps)
+                else:
+                    writer.write(raw)
+                    await writer.drain()
+                response = await reader.read()
+            finally:
+                writer.close()
+            status_line = response.split(b'\r\n', 1)[0].split(b' ')
+            if len(status_line) < 2:
+                raise ValueError('Empty response')
+            return int(status_line[1])
+
+        return await asyncio.wait_for(exchange(), timeout)
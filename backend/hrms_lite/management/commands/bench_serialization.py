@@ -0,0 +1,91 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from attendance.models import Attendance
+from attendance.serializers import AttendanceListSerializer, ATTENDANCE_LIST_COLUMNS, attendance_list_data
+from employees.models import Employee
+from employees.serializers import EmployeeListSerializer, EMPLOYEE_LIST_COLUMNS, employee_list_data
+from hrms_lite.renderers import orjson, render_json
+
+
+DAYS_PER_EMPLOYEE = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare DRF serializers with the fast values_list + JSON path used by the list '
+        'endpoints. Seeds throwaway rows inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                            help='Attendance row counts to benchmark (employees = rows / 10)')
+        parser.add_argument('--repeat', type=int, default=3, help='Best-of-N timing')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"JSON encoder: {'orjson' if orjson else 'json (stdlib)'}")
+        for rows in options['rows']:
+            with transaction.atomic():
+                self.seed(rows)
+                self.compare(
+                    f'employees  ({rows // DAYS_PER_EMPLOYEE} rows)',
+                    lambda: EmployeeListSerializer(Employee.objects.all(), many=True).data,
+                    lambda: employee_list_data(Employee.objects.values_list(*EMPLOYEE_LIST_COLUMNS)),
+                    options['repeat']
+                )
+                self.compare(
+                    f'attendance ({rows} rows)',
+                    lambda: AttendanceListSerializer(Attendance.objects.select_related('employee'), many=True).data,
+                    lambda: attendance_list_data(Attendance.objects.values_list(*ATTENDANCE_LIST_COLUMNS)),
+                    options['repeat']
+                )
+                transaction.set_rollback(True)
+
+    def seed(self, rows):
+        employee_count = max(rows // DAYS_PER_EMPLOYEE, 1)
+        prefix = f'BENCH-{time.time_ns()}'
+        employees = Employee.objects.bulk_create(
+            Employee(employee_id=f'{prefix}-{i}', full_name=f'Bench Employee {i}',
+                     email=f'{prefix.lower()}-{i}@bench.invalid', department=f'Department {i % 8}')
+            for i in range(employee_count)
+        )
+        start = datetime.date(2020, 1, 1)
+        Attendance.objects.bulk_create(
+            (Attendance(employee_id=employee.pk, date=start + datetime.timedelta(days=day),
+                        status='present' if (employee.pk + day) % 4 else 'absent')
+             for employee in employees for day in range(DAYS_PER_EMPLOYEE)),
+            batch_size=2000
+        )
+
+    def compare(self, label, drf_data, fast_data, repeat):
+        renderer = JSONRenderer()
+
+        def drf():
+            data = drf_data()
+            return renderer.render({'success': True, 'count': len(data), 'data': data})
+
+        def fast():
+            data = fast_data()
+            return render_json({'success': True, 'count': len(data), 'data': data})
+
+        drf_time, drf_body = self.best_of(drf, repeat)
+        fast_time, fast_body = self.best_of(fast, repeat)
+        if drf_body != fast_body:
+            raise CommandError(f'{label}: fast path output differs from DRF output')
+        self.stdout.write(
+            f'{label}: DRF {drf_time * 1000:8.1f} ms | fast {fast_time * 1000:8.1f} ms | '
+            f'{drf_time / fast_time:5.1f}x faster | {len(fast_body) / 1024:.0f} KiB identical'
+        )
+
+    def best_of(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, body
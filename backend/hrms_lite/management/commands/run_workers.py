@@ -0,0 +1,58 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from hrms_lite import jobs
+
+
+def run_worker(threads, burst):
+    """One worker process: stop gracefully on SIGTERM/SIGINT."""
+    worker = jobs.Worker(threads=threads, burst=burst)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: worker.stop())
+    worker.run()
+
+
+class Command(BaseCommand):
+    help = (
+        'Run background jobs (hrms_lite.jobs) until stopped. SIGTERM or Ctrl-C '
+        'lets the running jobs finish first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Jobs run at once per process')
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Worker processes, for CPU-bound jobs (POSIX only)')
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due')
+
+    def handle(self, *args, **options):
+        threads, processes, burst = options['threads'], options['processes'], options['burst']
+        if threads < 1 or processes < 1:
+            raise CommandError('--threads and --processes must be positive.')
+        self.stdout.write(f'Running jobs with {processes} process(es) of {threads} thread(s).')
+        if processes == 1:
+            run_worker(threads, burst)
+            return
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('--processes needs fork(); run one worker command per process instead.')
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [
+            context.Process(target=run_worker, args=(threads, burst), name=f'job-worker-{number}')
+            for number in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def stop(*args):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, stop)
+        for child in children:
+            child.join()
@@ -0,0 +1,134 @@
+import datetime
+import random
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from attendance import bitsets, live, rollup
+from attendance.models import Attendance, AttendanceBitmap, AttendanceTotals, MonthlyAttendanceTotals
+from employees import search
+from sync import tombstones
+from employees.models import Employee, EmployeePurge
+from hrms_lite.cache import bump_version
+
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Arjun', 'Diya', 'Ishaan', 'Kavya', 'Meera', 'Nikhil', 'Priya', 'Rahul',
+    'Riya', 'Rohan', 'Sanya', 'Tanvi', 'Vikram', 'Zara', 'Alex', 'Maria', 'John', 'Sara',
+]
+LAST_NAMES = [
+    'Sharma', 'Verma', 'Patel', 'Gupta', 'Iyer', 'Nair', 'Reddy', 'Singh', 'Das', 'Khan',
+    'Smith', 'Garcia', 'Chen', 'Mehta', 'Rao', 'Joshi',
+]
+DEPARTMENTS = [
+    'Engineering', 'Sales', 'Marketing', 'Finance', 'Operations', 'Human Resources',
+    'Support', 'Legal', 'Product', 'Design', 'Procurement', 'Security',
+]
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic employees and attendance history with bulk inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=1000)
+        parser.add_argument('--departments', type=int, default=8)
+        parser.add_argument('--days', type=int, default=365, help='Days of attendance history per employee')
+        parser.add_argument('--end-date', type=datetime.date.fromisoformat, default=None,
+                            help='Last day of history (default: today)')
+        parser.add_argument('--present-rate', type=float, default=0.9)
+        parser.add_argument('--weekdays-only', action='store_true', help='Skip Saturdays and Sundays')
+        parser.add_argument('--prefix', default='EMP', help='Prefix for generated employee IDs')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible data')
+        parser.add_argument('--clear', action='store_true', help='Delete all employees and attendance first')
+
+    def handle(self, *args, **options):
+        if options['departments'] < 1 or options['employees'] < 0 or options['days'] < 0:
+            raise CommandError('--departments must be positive; --employees and --days must not be negative.')
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            if options['clear']:
+                self.clear()
+
+            employees = self.create_employees(options, rng)
+            self.stdout.write(f'Created {len(employees)} employees ({time.perf_counter() - started:.1f}s)')
+
+            records = self.create_attendance(employees, options, rng)
+            self.stdout.write(f'Created {records} attendance records ({time.perf_counter() - started:.1f}s)')
+
+            # Bulk inserts skip the signals that maintain derived data
+            rollup.rebuild()
+            bitsets.rebuild()
+            search.record_bulk_change()
+            live.record_reset()
+
+        bump_version('employees')
+        bump_version('attendance')
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.perf_counter() - started:.1f}s.'))
+
+    def clear(self):
+        # Plain DELETEs: the ORM would load every row to send delete signals
+        with connection.cursor() as cursor:
+            for model in (Attendance, AttendanceTotals, MonthlyAttendanceTotals, AttendanceBitmap, Employee,
+                          EmployeePurge):
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+        # The deletes leave no tombstones, so sync clients must start over
+        tombstones.record_reset()
+
+    def create_employees(self, options, rng):
+        prefix = options['prefix']
+        departments = [
+            DEPARTMENTS[i] if i < len(DEPARTMENTS) else f'Department {i + 1}'
+            for i in range(options['departments'])
+        ]
+        existing = Employee.all_objects.filter(employee_id__startswith=prefix).count()
+        employees = []
+        for number in range(existing + 1, existing + options['employees'] + 1):
+            employee_id = f'{prefix}{number:06d}'
+            employees.append(Employee(
+                employee_id=employee_id,
+                full_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                email=f'{employee_id.lower()}@example.com',
+                department=rng.choice(departments),
+            ))
+        return Employee.objects.bulk_create(employees, batch_size=options['batch_size'])
+
+    def create_attendance(self, employees, options, rng):
+        end_date = options['end_date'] or timezone.localdate()
+        dates = [end_date - datetime.timedelta(days=offset) for offset in range(options['days'])]
+        if options['weekdays_only']:
+            dates = [date for date in dates if date.weekday() < 5]
+
+        # executemany with pre-adapted values skips bulk_create's per-object
+        # overhead, which dominates at millions of rows
+        ops = connection.ops
+        now = ops.adapt_datetimefield_value(timezone.now())
+        adapted_dates = [ops.adapt_datefield_value(date) for date in dates]
+        table = ops.quote_name(Attendance._meta.db_table)
+        sql = (
+            f'INSERT INTO {table} (employee_id, date, status, created_at, updated_at) '
+            'VALUES (%s, %s, %s, %s, %s)'
+        )
+
+        present_rate = options['present_rate']
+        batch = []
+        total = 0
+        with connection.cursor() as cursor:
+            for employee in employees:
+                for date in adapted_dates:
+                    status = 'present' if rng.random() < present_rate else 'absent'
+                    batch.append((employee.pk, date, status, now, now))
+                if len(batch) >= options['batch_size']:
+                    cursor.executemany(sql, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+                total += len(batch)
+        return total
@@ -0,0 +1,43 @@
+import textwrap
+
+from django.core.management.base import BaseCommand
+
+from hrms_lite import slow_queries
+
+
+class Command(BaseCommand):
+    help = (
+        'Report the worst queries in the slow-query log (SLOW_QUERY_LOG), with '
+        'the views and call sites that ran them and their plans.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--order', choices=list(slow_queries.ORDERINGS), default='total',
+                            help='Rank by total time (default), max time, calls or most recent')
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--no-plans', action='store_true', help='Leave out the EXPLAIN output')
+        parser.add_argument('--clear', action='store_true', help='Empty the log instead')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            cleared = slow_queries.clear()
+            self.stdout.write(self.style.SUCCESS(f'{cleared} slow queries cleared.'))
+            return
+
+        queries = list(slow_queries.top(options['order'], options['limit']))
+        if not queries:
+            self.stdout.write('No slow queries logged.')
+            return
+        for rank, query in enumerate(queries, 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'#{rank} {query.fingerprint[:12]}  {query.calls} calls, {query.total_ms:.0f} ms total, '
+                f'{query.total_ms / query.calls:.1f} ms mean, {query.max_ms:.1f} ms max'
+            ))
+            self.stdout.write(textwrap.indent(textwrap.fill(query.sql, 100), '    '))
+            for source in query.sources.all():
+                site = f' at {source.call_site}' if source.call_site else ''
+                self.stdout.write(f'  {source.view}{site}: {source.calls} calls, {source.total_ms:.0f} ms')
+            if query.plan and not options['no_plans']:
+                self.stdout.write('  plan:')
+                self.stdout.write(textwrap.indent(query.plan, '    '))
+            self.stdout.write('')
@@ -0,0 +1,176 @@
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from django.test import Client
+from django.utils import timezone
+
+from employees.models import Employee
+from .bench_api import percentile
+
+
+DEFAULT_ENGINES = ['django.db.backends.sqlite3', 'hrms_lite.sqlite3']
+
+
+class Command(BaseCommand):
+    help = (
+        'Start several processes that POST attendance to one fresh SQLite file at '
+        'the same time, alongside processes streaming the attendance export, once '
+        'per database engine, and report throughput and "database is locked" failures.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', nargs='+', default=DEFAULT_ENGINES, help='DB_ENGINE values to compare')
+        parser.add_argument('--processes', type=int, default=8, help='Concurrent writer processes')
+        parser.add_argument('--requests', type=int, default=200, help='POSTs per process')
+        parser.add_argument('--readers', type=int, default=2,
+                            help='Processes streaming the attendance export until the writers finish')
+        parser.add_argument('--history-days', type=int, default=30,
+                            help='Days of existing attendance to seed, so exports take a while')
+        parser.add_argument('--keep', action='store_true', help='Keep the scratch databases')
+        # Internal: run as one writer process
+        parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+        parser.add_argument('--reader', action='store_true', help=argparse.SUPPRESS)
+        parser.add_argument('--start-at', type=float, help=argparse.SUPPRESS)
+        parser.add_argument('--stop-file', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['reader']:
+            return self.read(options)
+        if options['worker'] is not None:
+            return self.work(options)
+
+        directory = tempfile.mkdtemp(prefix='hrms-stress-')
+        results = []
+        for engine in options['engines']:
+            path = os.path.join(directory, engine.replace('.', '_') + '.sqlite3')
+            environment = {
+                key: value for key, value in os.environ.items() if not key.startswith('DB_REPLICA_')
+            }
+            # Every client is one address; rate limits would measure themselves
+            environment.update({'DB_ENGINE': engine, 'DB_NAME': path, 'METRICS_DIR': '', 'ADMISSION_CONTROL': 'False'})
+
+            self.stdout.write(f'Preparing {engine}...')
+            self.manage(environment, 'migrate', '--verbosity', '0')
+            self.manage(environment, 'seed_data', '--days', str(options['history_days']), '--verbosity', '0',
+                        '--end-date', (timezone.localdate() - datetime.timedelta(days=1)).isoformat(),
+                        '--employees', str(options['processes'] * options['requests']))
+
+            start_at = time.time() + 3
+            stop_file = path + '.done'
+            readers = [
+                self.spawn(environment, '--reader', '--start-at', str(start_at), '--stop-file', stop_file)
+                for _ in range(options['readers'])
+            ]
+            writers = [
+                self.spawn(environment, '--worker', str(index), '--start-at', str(start_at),
+                           '--processes', str(options['processes']), '--requests', str(options['requests']))
+                for index in range(options['processes'])
+            ]
+            reports = [self.collect(writer, engine) for writer in writers]
+            open(stop_file, 'w').close()
+            read_reports = [self.collect(reader, engine) for reader in readers]
+
+            with sqlite3.connect(path) as database:
+                rows = database.execute('SELECT COUNT(*) FROM attendance').fetchone()[0]
+            results.append((engine, reports, read_reports, rows))
+
+        self.stdout.write('')
+        self.stdout.write(f'{"engine":28} {"created":>8} {"locked":>7} {"other":>6} {"req/s":>8} '
+                          f'{"p50 ms":>8} {"p99 ms":>8} {"reads/s":>8} {"r.locked":>8} {"rows":>7}')
+        for engine, reports, read_reports, rows in results:
+            latencies = sorted(latency for report in reports for latency in report['latencies'])
+            elapsed = max(report['finished'] for report in reports) - min(report['started'] for report in reports)
+            created = sum(report['created'] for report in reports)
+            reads = sum(report['created'] for report in read_reports)
+            self.stdout.write(
+                f"{engine:28} {created:8} {sum(report['locked'] for report in reports):7} "
+                f"{sum(report['other'] for report in reports):6} {created / elapsed:8.1f} "
+                f"{percentile(latencies, 50) * 1000:8.1f} {percentile(latencies, 99) * 1000:8.1f} "
+                f"{reads / elapsed:8.1f} {sum(report['locked'] for report in read_reports):8} {rows:7}"
+            )
+
+        if options['keep']:
+            self.stdout.write(f'Databases kept in {directory}')
+        else:
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+
+    def command(self, *arguments):
+        return [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), *arguments]
+
+    def spawn(self, environment, *arguments):
+        return subprocess.Popen(
+            self.command('stress_sqlite', *arguments),
+            cwd=settings.BASE_DIR, env=environment, stdout=subprocess.PIPE, text=True,
+        )
+
+    def collect(self, process, engine):
+        output, _ = process.communicate()
+        if process.returncode != 0:
+            raise CommandError(f'Stress process failed for {engine}')
+        return json.loads(output.strip().splitlines()[-1])
+
+    def manage(self, environment, *arguments):
+        subprocess.run(self.command(*arguments), cwd=settings.BASE_DIR, env=environment, check=True)
+
+    def client(self):
+        return Client(SERVER_NAME=settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost')
+
+    def work(self, options):
+        """Writer process: mark attendance for this process's share of employees."""
+        employee_ids = list(Employee.objects.order_by('pk').values_list('pk', flat=True))
+        employee_ids = employee_ids[options['worker']::options['processes']][:options['requests']]
+        today = timezone.localdate().isoformat()
+        self.run_requests(options, (
+            lambda client, employee_id=employee_id: client.post(
+                '/api/attendance/', {'employee_id': employee_id, 'date': today, 'status': 'present'},
+                content_type='application/json'
+            )
+            for employee_id in employee_ids
+        ), success=201)
+
+    def read(self, options):
+        """Reader process: stream the attendance export until the stop file appears."""
+        def export(client):
+            response = client.get('/api/attendance/export/')
+            # The read transaction stays open while the rows stream
+            for _ in response.streaming_content:
+                pass
+            return response
+
+        def requests():
+            while not os.path.exists(options['stop_file']):
+                yield export
+
+        self.run_requests(options, requests(), success=200)
+
+    def run_requests(self, options, requests, success):
+        client = self.client()
+        report = {'created': 0, 'locked': 0, 'other': 0, 'latencies': []}
+        time.sleep(max(options['start_at'] - time.time(), 0))
+        report['started'] = time.time()
+        for send in requests:
+            started = time.perf_counter()
+            try:
+                response = send(client)
+            except OperationalError as exc:
+                report['locked' if 'locked' in str(exc) else 'other'] += 1
+                continue
+            if response.status_code == success:
+                report['created'] += 1
+                report['latencies'].append(time.perf_counter() - started)
+            else:
+                report['other'] += 1
+        report['finished'] = time.time()
+        self.stdout.write(json.dumps(report))
@@ -0,0 +1,161 @@
+"""
+Per-worker in-memory indexes kept in step with database writes.
+
+A `WorkerIndex` is built from the database on first use. Write paths call
+`publish_on_commit` with the keys they touched: once the transaction commits,
+the version counter shared by all workers (`hrms_lite.versions`) advances,
+and the keys are logged under the new version in the `index_changes` table,
+in the same transaction. A worker whose version falls behind (because any
+worker wrote) reads the changes it missed and reloads just those entries.
+Only a worker that is new, or further behind than the log reaches
+(CHANGE_LOG_SIZE changes), or that reads a change with unknown keys, has to
+rebuild.
+
+`sync` does that rebuild in the calling thread. `catch_up` starts it in a
+background thread instead and reports the index as not current, so a
+request can answer from the database meanwhile.
+"""
+
+import logging
+import threading
+
+from django.db import connections, router, transaction
+
+from . import versions
+from .models import IndexChange
+
+
+logger = logging.getLogger(__name__)
+
+# Changes kept per index; a worker further behind rebuilds
+CHANGE_LOG_SIZE = 10000
+
+# Old changes are deleted on every PRUNE_EVERY-th version
+PRUNE_EVERY = 100
+
+
+class WorkerIndex:
+    """
+    Base class; subclasses set `version_key` and implement `refresh`, and
+    either `build` or, to support `catch_up`, `load` and `install`.
+    """
+
+    version_key = None
+
+    def __init__(self):
+        self.version = None
+        self.lock = threading.RLock()
+        self.building = False
+
+    def build(self):
+        """Load the whole index from the database."""
+        self.install(self.load())
+
+    def load(self):
+        """Read the whole index from the database, without touching this one."""
+        raise NotImplementedError
+
+    def install(self, state):
+        """Replace the index with what `load` returned; called with the lock held."""
+        raise NotImplementedError
+
+    def refresh(self, keys):
+        """Reload the entries for `keys` from the database."""
+        raise NotImplementedError
+
+    def dump_keys(self, keys):
+        """`keys` as a JSON-serializable list."""
+        return list(keys)
+
+    def load_keys(self, data):
+        """The keys of a `dump_keys` list."""
+        return set(data)
+
+    def current_version(self):
+        return versions.get(self.version_key)
+
+    def _apply_changes(self):
+        """
+        Bring the index to the current version through the change log;
+        called with the lock held. Returns the version, or None when the log
+        can't (a rebuild is needed).
+        """
+        version = self.current_version()
+        if self.version is None or self.version > version:
+            # New, or the counter was reset (e.g. by `flush`)
+            return None
+        if self.version == version:
+            return version
+        changes = list(IndexChange.objects.filter(
+            index=self.version_key, version__gt=self.version, version__lte=version
+        ).values_list('keys', flat=True))
+        if len(changes) != version - self.version or None in changes:
+            return None
+        keys = set()
+        for data in changes:
+            keys |= self.load_keys(data)
+        # Read back what is committed now rather than replaying the writes:
+        # it includes every logged change, in commit order
+        self.refresh(keys)
+        self.version = version
+        return version
+
+    def sync(self):
+        """Apply the changes made since the last build, or rebuild."""
+        if self.current_version() == self.version:
+            return
+        with self.lock:
+            if self._apply_changes() is not None:
+                return
+            # Read the version first: a write landing during the build
+            # changes it again and is applied on the next read
+            version = self.current_version()
+            self.build()
+            self.version = version
+
+    def catch_up(self):
+        """
+        Apply the changes made since the last build and return True, or, if
+        that isn't enough, start a rebuild in the background and return False.
+        """
+        if self.current_version() == self.version:
+            return True
+        with self.lock:
+            if self._apply_changes() is not None:
+                return True
+            if self.building:
+                return False
+            self.building = True
+        threading.Thread(target=self._build_in_background, name=f'{self.version_key} build', daemon=True).start()
+        return False
+
+    def _build_in_background(self):
+        try:
+            version = self.current_version()
+            state = self.load()
+            with self.lock:
+                self.install(state)
+                self.version = version
+        except Exception:
+            logger.exception('Building %s failed', self.version_key)
+        finally:
+            self.building = False
+            connections.close_all()
+
+    def publish(self, keys):
+        """Log committed `keys` (None = unknown, rebuild) under the next version."""
+        database = router.db_for_write(IndexChange)
+        with transaction.atomic(using=database):
+            # The bump locks the counter until commit, so versions become
+            # visible in order, each with its change
+            version = versions.bump(self.version_key)
+            IndexChange.objects.using(database).create(
+                index=self.version_key, version=version, keys=None if keys is None else self.dump_keys(keys)
+            )
+        if version % PRUNE_EVERY == 0:
+            IndexChange.objects.using(database).filter(
+                index=self.version_key, version__lte=version - CHANGE_LOG_SIZE
+            ).delete()
+
+    def publish_on_commit(self, keys):
+        transaction.on_commit(lambda: self.publish(keys))
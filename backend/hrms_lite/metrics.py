@@ -0,0 +1,312 @@
+"""
+Per-endpoint performance instrumentation for the HRMS Lite API.
+
+`MetricsMiddleware` records, per URL name, the request count (by method and
+status), a latency histogram, the number of SQL queries and the time spent in
+them. Every response gets a `Server-Timing` header, and `/api/metrics/`
+exposes the aggregates in the Prometheus text format.
+
+Under several worker processes, set `METRICS_DIR` to a directory shared by
+the workers: each process periodically writes its totals to its own file
+there, and `/api/metrics/` sums every file, the way prometheus_client's
+multiprocess mode does. Files of exited workers are kept so totals never go
+backwards.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from . import admission, cache
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL = 1.0
+
+_SEPARATOR = '\t'
+
+
+def _key(*parts):
+    return _SEPARATOR.join(str(part) for part in parts)
+
+
+class MetricsRegistry:
+    """Thread-safe in-process aggregates, mergeable across processes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}     # view, method, status -> count
+        self.latency = {}      # view -> [bucket counts..., +Inf count, sum]
+        self.sql_queries = {}  # view -> count
+        self.sql_seconds = {}  # view -> seconds
+
+    def record(self, view, method, status, duration, queries, sql_seconds):
+        with self._lock:
+            key = _key(view, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            histogram = self.latency.setdefault(view, [0] * (len(LATENCY_BUCKETS) + 2))
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    histogram[index] += 1
+            histogram[-2] += 1
+            histogram[-1] += duration
+
+            self.sql_queries[view] = self.sql_queries.get(view, 0) + queries
+            self.sql_seconds[view] = self.sql_seconds.get(view, 0.0) + sql_seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'latency': {view: list(values) for view, values in self.latency.items()},
+                'sql_queries': dict(self.sql_queries),
+                'sql_seconds': dict(self.sql_seconds),
+                'counters': collect_counters(),
+            }
+
+
+registry = MetricsRegistry()
+
+# Extra counters contributed by other modules: name -> (help, label names, callable)
+# where the callable returns {label values tuple: value} for this process.
+COUNTER_SOURCES = {}
+
+
+def register_counter(name, help_text, label_names, collect):
+    COUNTER_SOURCES[name] = (help_text, tuple(label_names), collect)
+
+
+def collect_counters():
+    return {
+        name: {_key(*labels): value for labels, value in collect().items()}
+        for name, (_, _, collect) in COUNTER_SOURCES.items()
+    }
+
+
+register_counter(
+    'hrms_response_cache_requests_total', 'Response cache lookups by view and result.', ('view', 'result'),
+    lambda: {
+        (view, result): counts[key]
+        for view, counts in cache.stats.snapshot().items()
+        for result, key in (('hit', 'hits'), ('miss', 'misses'))
+    }
+)
+
+register_counter(
+    'hrms_admission_requests_total',
+    'Admission control decisions by view: allowed, throttled (429), shed (503), error (store failed, allowed).',
+    ('view', 'decision'), admission.stats.counters
+)
+
+
+def merge_snapshots(snapshots):
+    """Sum a list of snapshots into one."""
+    merged = {'requests': {}, 'latency': {}, 'sql_queries': {}, 'sql_seconds': {}, 'counters': {}}
+    for snapshot in snapshots:
+        for section in ('requests', 'sql_queries', 'sql_seconds'):
+            for key, value in snapshot.get(section, {}).items():
+                merged[section][key] = merged[section].get(key, 0) + value
+        for view, values in snapshot.get('latency', {}).items():
+            current = merged['latency'].setdefault(view, [0] * len(values))
+            merged['latency'][view] = [a + b for a, b in zip(current, values)]
+        for name, values in snapshot.get('counters', {}).items():
+            counter = merged['counters'].setdefault(name, {})
+            for key, value in values.items():
+                counter[key] = counter.get(key, 0) + value
+    return merged
+
+
+class FileCollector:
+    """Persist this process's snapshot to `directory` and read everyone's back."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.filename = os.path.join(directory, f'hrms-metrics-{os.getpid()}-{time.time_ns()}.json')
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def maybe_flush(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL:
+            return
+        with self._lock:
+            self._last_flush = now
+            os.makedirs(self.directory, exist_ok=True)
+            handle, temporary = tempfile.mkstemp(dir=self.directory, prefix='.hrms-metrics-')
+            with os.fdopen(handle, 'w') as temporary_file:
+                json.dump(registry.snapshot(), temporary_file)
+            os.replace(temporary, self.filename)
+
+    def collect(self):
+        snapshots = [registry.snapshot()]
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.startswith('hrms-metrics-') or path == self.filename:
+                continue
+            try:
+                with open(path) as snapshot_file:
+                    snapshots.append(json.load(snapshot_file))
+            except (OSError, ValueError):
+                continue
+        return merge_snapshots(snapshots)
+
+
+_collector = None
+
+
+def get_collector():
+    global _collector
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if directory and (_collector is None or _collector.directory != directory):
+        _collector = FileCollector(directory)
+    return _collector if directory else None
+
+
+def current_snapshot():
+    """All-worker aggregates if METRICS_DIR is set, otherwise this process's."""
+    collector = get_collector()
+    if collector is not None:
+        return collector.collect()
+    return merge_snapshots([registry.snapshot()])
+
+
+class QueryTimer:
+    """`execute_wrapper` callable counting queries and their wall time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Record per-URL-name request, latency and SQL metrics.
+
+    Both sync and async capable, so async views under ASGI are not pushed
+    into a thread by this middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        return self.record(request, response, timer, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return await self.get_response(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = await self.get_response(request)
+        return self.record(request, response, timer, time.perf_counter() - started)
+
+    def record(self, request, response, timer, duration):
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match is not None and match.url_name else 'unmatched'
+        registry.record(view, request.method, response.status_code, duration, timer.count, timer.seconds)
+
+        response['Server-Timing'] = (
+            f'db;dur={timer.seconds * 1000:.1f};desc="{timer.count} queries", '
+            f'app;dur={duration * 1000:.1f}'
+        )
+
+        collector = get_collector()
+        if collector is not None:
+            collector.maybe_flush()
+        return response
+
+
+def _labels(names, key):
+    values = key.split(_SEPARATOR)
+    return ','.join(
+        '{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in zip(names, values)
+    )
+
+
+def render_prometheus(snapshot):
+    """Format a snapshot in the Prometheus text exposition format."""
+    lines = [
+        '# HELP hrms_http_requests_total HTTP requests by URL name, method and status.',
+        '# TYPE hrms_http_requests_total counter',
+    ]
+    for key, value in sorted(snapshot['requests'].items()):
+        lines.append(f"hrms_http_requests_total{{{_labels(('view', 'method', 'status'), key)}}} {value}")
+
+    lines += [
+        '# HELP hrms_http_request_duration_seconds Request latency by URL name.',
+        '# TYPE hrms_http_request_duration_seconds histogram',
+    ]
+    for view, values in sorted(snapshot['latency'].items()):
+        labels = _labels(('view',), view)
+        for bound, count in zip(LATENCY_BUCKETS, values):
+            lines.append(f'hrms_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'hrms_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {values[-2]}')
+        lines.append(f'hrms_http_request_duration_seconds_sum{{{labels}}} {values[-1]:.6f}')
+        lines.append(f'hrms_http_request_duration_seconds_count{{{labels}}} {values[-2]}')
+
+    lines += [
+        '# HELP hrms_db_queries_total SQL queries executed by URL name.',
+        '# TYPE hrms_db_queries_total counter',
+    ]
+    for view, value in sorted(snapshot['sql_queries'].items()):
+        lines.append(f"hrms_db_queries_total{{{_labels(('view',), view)}}} {value}")
+
+    lines += [
+        '# HELP hrms_db_query_seconds_total Time spent in SQL queries by URL name.',
+        '# TYPE hrms_db_query_seconds_total counter',
+    ]
+    for view, value in sorted(snapshot['sql_seconds'].items()):
+        lines.append(f"hrms_db_query_seconds_total{{{_labels(('view',), view)}}} {value:.6f}")
+
+    for name, (help_text, label_names, _) in sorted(COUNTER_SOURCES.items()):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for key, value in sorted(snapshot['counters'].get(name, {}).items()):
+            lines.append(f'{name}{{{_labels(label_names, key)}}} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint."""
+    return HttpResponse(
+        render_prometheus(current_snapshot()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_lite', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(help_text='SHA-1 of the normalized SQL', max_length=40, unique=True)),
+                ('sql', models.TextField(help_text='Normalized SQL')),
+                ('calls', models.PositiveBigIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('plan', models.TextField(blank=True, help_text='EXPLAIN output of the latest capture')),
+                ('explained_at', models.DateTimeField(blank=True, null=True)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Slow query',
+                'verbose_name_plural': 'Slow queries',
+                'db_table': 'slow_queries',
+                'ordering': ['-total_ms'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SlowQuerySource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view', models.CharField(help_text='URL name of the request', max_length=100)),
+                ('call_site', models.CharField(blank=True, help_text='file:line in function', max_length=300)),
+                ('calls', models.PositiveBigIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('query', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='hrms_lite.slowquery', to_field='fingerprint')),
+            ],
+            options={
+                'db_table': 'slow_query_sources',
+                'ordering': ['-total_ms'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='slowquerysource',
+            constraint=models.UniqueConstraint(fields=('query', 'view', 'call_site'), name='unique_slow_query_source'),
+        ),
+    ]
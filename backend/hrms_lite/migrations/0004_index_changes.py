@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hrms_lite', '0003_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.CharField(help_text="The index's version name", max_length=100)),
+                ('version', models.BigIntegerField()),
+                ('keys', models.JSONField(help_text='Null when the whole index must be rebuilt', null=True)),
+            ],
+            options={
+                'db_table': 'index_changes',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='indexchange',
+            constraint=models.UniqueConstraint(fields=('index', 'version'), name='index_changes_version_uniq'),
+        ),
+    ]
@@ -0,0 +1,135 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A unit of background work run by `hrms_lite.jobs` workers.
+
+    `args` are the task's keyword arguments and `payload` holds binary input
+    (large files are stored with `jobs.store_file` instead). A running job is leased
+    to one worker until `locked_until`; if the worker dies the lease
+    expires and another worker retries the job.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100, help_text="Registered task name")
+    args = models.JSONField(default=dict, blank=True)
+    payload = models.BinaryField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=1)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Not run before this time")
+    locked_until = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=200, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'jobs'
+        ordering = ['-created_at']
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            # Workers claiming the next job
+            models.Index(fields=['status', 'run_after'], name='jobs_ready_idx'),
+            # Pruning finished jobs
+            models.Index(fields=['finished_at'], name='jobs_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class Version(models.Model):
+    """
+    A counter shared by every worker (see `hrms_lite.versions`). Writes
+    advance it so that per-process caches notice their data is out of date.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'versions'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class IndexChange(models.Model):
+    """
+    The keys one committed write touched in a per-worker index (see
+    `hrms_lite.memory_index`), under the version it advanced the index to.
+    Other workers apply the changes they missed instead of rebuilding.
+    """
+    index = models.CharField(max_length=100, help_text="The index's version name")
+    version = models.BigIntegerField()
+    keys = models.JSONField(null=True, help_text="Null when the whole index must be rebuilt")
+
+    class Meta:
+        db_table = 'index_changes'
+        constraints = [
+            models.UniqueConstraint(fields=['index', 'version'], name='index_changes_version_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.index} @ {self.version}"
+
+
+class SlowQuery(models.Model):
+    """
+    A statement that took longer than SLOW_QUERY_THRESHOLD_MS, recorded by
+    `hrms_lite.slow_queries`. One row per fingerprint: the SQL with its
+    literals and parameter lists normalized, so repeats add up.
+    """
+    fingerprint = models.CharField(max_length=40, unique=True, help_text="SHA-1 of the normalized SQL")
+    sql = models.TextField(help_text="Normalized SQL")
+    calls = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    plan = models.TextField(blank=True, help_text="EXPLAIN output of the latest capture")
+    explained_at = models.DateTimeField(null=True, blank=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'slow_queries'
+        ordering = ['-total_ms']
+        verbose_name = 'Slow query'
+        verbose_name_plural = 'Slow queries'
+
+    def __str__(self):
+        return f"{self.fingerprint[:12]} ({self.calls} calls, {self.total_ms:.0f} ms)"
+
+
+class SlowQuerySource(models.Model):
+    """Where a slow query ran: the request's URL name and the app call site."""
+    query = models.ForeignKey(
+        SlowQuery, to_field='fingerprint', on_delete=models.CASCADE, related_name='sources'
+    )
+    view = models.CharField(max_length=100, help_text="URL name of the request")
+    call_site = models.CharField(max_length=300, blank=True, help_text="file:line in function")
+    calls = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+
+    class Meta:
+        db_table = 'slow_query_sources'
+        ordering = ['-total_ms']
+        constraints = [
+            models.UniqueConstraint(fields=['query', 'view', 'call_site'], name='unique_slow_query_source'),
+        ]
+
+    def __str__(self):
+        return f"{self.view} {self.call_site}"
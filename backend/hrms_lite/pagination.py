@@ -0,0 +1,179 @@
+"""
+Keyset (cursor) pagination helpers for the HRMS Lite API.
+
+Cursors are opaque, URL-safe tokens that encode the ordering values of the
+last row on a page. The next page is fetched with a range predicate on those
+values instead of an OFFSET, so page N costs the same as page 1.
+"""
+
+import base64
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    """Raised when a cursor or page size query parameter is invalid."""
+
+
+def encode_cursor(values):
+    """Encode a list of JSON-serializable ordering values as an opaque token."""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, length):
+    """Decode a token produced by `encode_cursor` and check its arity."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise PaginationError('Invalid cursor.')
+    if not isinstance(values, list) or len(values) != length:
+        raise PaginationError('Invalid cursor.')
+    return values
+
+
+def parse_cursor_values(model, ordering, values):
+    """
+    Convert decoded cursor values to the Python types of `model`'s ordering
+    fields, so a tampered cursor is a PaginationError rather than a database
+    error.
+    """
+    parsed = []
+    for field, value in zip(ordering, values):
+        # Keyset columns are never NULL
+        if value is None or isinstance(value, (bool, list, dict)):
+            raise PaginationError('Invalid cursor.')
+        try:
+            parsed.append(model._meta.get_field(field.lstrip('-')).to_python(value))
+        except (ValidationError, TypeError, ValueError):
+            raise PaginationError('Invalid cursor.')
+    return parsed
+
+
+def get_page_size(query_params, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse `page_size` from the query string, clamped to `maximum`."""
+    page_size = query_params.get('page_size')
+    if not page_size:
+        return default
+    try:
+        page_size = int(page_size)
+    except ValueError:
+        raise PaginationError('page_size must be a positive integer.')
+    if page_size < 1:
+        raise PaginationError('page_size must be a positive integer.')
+    return min(page_size, maximum)
+
+
+def keyset_filter(ordering, values):
+    """
+    Build a Q object selecting rows strictly after `values` in `ordering`.
+
+    `ordering` uses Django's syntax, e.g. ['-date', '-created_at', 'id'].
+    """
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        term = Q(**{f'{name}__{lookup}': values[index]})
+        for previous, value in zip(ordering[:index], values[:index]):
+            term &= Q(**{previous.lstrip('-'): value})
+        condition |= term
+    return condition
+
+
+def estimate_count(queryset):
+    """
+    Return a cheap row estimate for an unfiltered queryset, or None.
+
+    Uses the planner statistics on PostgreSQL, summed over the partitions of
+    a partitioned table; other backends have no cheap equivalent, so callers
+    should fall back to omitting the total.
+    """
+    if queryset.query.where or connections[queryset.db].vendor != 'postgresql':
+        return None
+    table = queryset.model._meta.db_table
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            'SELECT SUM(GREATEST(reltuples, 0))::bigint FROM pg_class '
+            'WHERE oid = to_regclass(%s) '
+            'OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))',
+            [table, table]
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def keyset_page(queryset, query_params, ordering):
+    """
+    Return (sliced queryset, page_size) for one page of `queryset` ordered by
+    `ordering`. The slice holds one extra row to learn whether another page
+    exists; pass the evaluated rows to `finish_page`.
+    """
+    page_size = get_page_size(query_params)
+    queryset = queryset.order_by(*ordering)
+
+    cursor = query_params.get('cursor')
+    if cursor:
+        values = parse_cursor_values(queryset.model, ordering, decode_cursor(cursor, len(ordering)))
+        queryset = queryset.filter(keyset_filter(ordering, values))
+    return queryset[:page_size + 1], page_size
+
+
+def finish_page(rows, page_size, cursor_values):
+    """Trim the lookahead row and build the next cursor; returns (rows, next_cursor)."""
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(cursor_values(rows[-1]))
+    return rows, next_cursor
+
+
+def paginate_keyset(queryset, query_params, ordering, cursor_values):
+    """
+    Return one page of `queryset` ordered by `ordering`.
+
+    `cursor_values` maps a row of the page to its ordering values. The result
+    is a tuple of (rows, next_cursor); `next_cursor` is None on the last page.
+    """
+    page, page_size = keyset_page(queryset, query_params, ordering)
+    return finish_page(list(page), page_size, cursor_values)
+
+
+async def apaginate_keyset(queryset, query_params, ordering, cursor_values):
+    """Async variant of `paginate_keyset` using async queryset iteration."""
+    page, page_size = keyset_page(queryset, query_params, ordering)
+    return finish_page([row async for row in page], page_size, cursor_values)
+
+
+def get_total(queryset, query_params):
+    """
+    Resolve the optional `total` query parameter for a paginated list.
+
+    `total=exact` runs a COUNT, `total=estimate` uses planner statistics where
+    available; anything else skips the count entirely.
+    """
+    mode = query_params.get('total')
+    if mode == 'exact':
+        return queryset.count()
+    if mode == 'estimate':
+        return estimate_count(queryset)
+    return None
+
+
+async def aget_total(queryset, query_params):
+    """Async variant of `get_total`."""
+    mode = query_params.get('total')
+    if mode == 'exact':
+        return await queryset.acount()
+    if mode == 'estimate':
+        return await sync_to_async(estimate_count)(queryset)
+    return None
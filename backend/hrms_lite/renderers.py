@@ -0,0 +1,66 @@
+"""
+Fast JSON rendering for read-heavy list endpoints.
+
+List views build plain dicts from `values_list()` tuples (see the
+`*_list_data` helpers in the app serializers) and render them here, skipping
+DRF's per-row field machinery. The output is byte-for-byte what DRF's
+`JSONRenderer` produces with the default settings: compact separators,
+UTF-8 without ASCII escaping, and U+2028/U+2029 escaped.
+
+`orjson` is used when installed; the standard library is the fallback.
+"""
+
+import json
+
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.response import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def datetime_formatter():
+    """
+    Return a function matching DRF's DateTimeField representation (current
+    timezone, 'Z' for UTC). The timezone is looked up once, not per row.
+    """
+    current_timezone = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        if value is None:
+            return None
+        value = value.astimezone(current_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return format_datetime
+
+
+def format_date(value):
+    """Match DRF's DateField representation."""
+    return value.isoformat() if value is not None else None
+
+
+def render_json(data):
+    """Render `data` (built from JSON primitives only) to bytes like JSONRenderer."""
+    if orjson is not None:
+        content = orjson.dumps(data)
+    else:
+        content = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+    # Same escaping as JSONRenderer: these are valid JSON but not valid JavaScript
+    return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def fast_json_response(request, data, status=200):
+    """
+    Render `data` with `render_json` when the client negotiated JSON; fall back
+    to a regular DRF Response (e.g. for the browsable API) otherwise.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    if renderer is not None and renderer.format != 'json':
+        return Response(data, status=status)
+    return HttpResponse(render_json(data), status=status, content_type='application/json')
@@ -0,0 +1,49 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import Job, SlowQuery, SlowQuerySource
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the status of a background job.
+    """
+    url = serializers.SerializerMethodField()
+    result_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ['id', 'name', 'status', 'attempts', 'max_attempts', 'error',
+                  'created_at', 'started_at', 'finished_at', 'url', 'result_url']
+        read_only_fields = fields
+
+    def get_url(self, job):
+        return reverse('job-detail', args=[job.pk])
+
+    def get_result_url(self, job):
+        return reverse('job-result', args=[job.pk])
+
+
+class SlowQuerySourceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SlowQuerySource
+        fields = ['view', 'call_site', 'calls', 'total_ms']
+        read_only_fields = fields
+
+
+class SlowQuerySerializer(serializers.ModelSerializer):
+    """
+    Serializer for a slow-query log entry, with the views and call sites
+    that ran it.
+    """
+    mean_ms = serializers.SerializerMethodField()
+    sources = SlowQuerySourceSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = SlowQuery
+        fields = ['fingerprint', 'sql', 'calls', 'total_ms', 'mean_ms', 'max_ms', 'plan',
+                  'explained_at', 'first_seen', 'last_seen', 'sources']
+        read_only_fields = fields
+
+    def get_mean_ms(self, query):
+        return query.total_ms / query.calls if query.calls else 0.0
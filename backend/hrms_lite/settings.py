@@ -31,12 +31,19 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     # Local apps
+    'hrms_lite',
     'employees',
     'attendance',
+    'sync',
 ]
 
 MIDDLEWARE = [
+    'hrms_lite.slow_queries.SlowQueryMiddleware',
+    'hrms_lite.metrics.MetricsMiddleware',
+    'hrms_lite.compression.CompressionMiddleware',
+    'hrms_lite.db_router.ReplicaMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'hrms_lite.admission.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -78,9 +85,140 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
         'PORT': os.getenv('DB_PORT', ''),
+        # Seconds to keep connections open between requests (0 = per request)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '0')),
     }
 }
 
+# Production SQLite profile (DB_ENGINE=hrms_lite.sqlite3): WAL journal, busy
+# timeout and BEGIN IMMEDIATE so several workers can write to one file
+if DATABASES['default']['ENGINE'] == 'hrms_lite.sqlite3':
+    # Reuse connections so the pragmas are not re-applied on every request
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+    DATABASES['default']['OPTIONS'] = {
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-64000')),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', '268435456')),
+    }
+
+# Optional read replica (hrms_lite.db_router). GET/HEAD requests read from it
+# unless they write, or any write happened in the last DB_REPLICA_PIN_SECONDS.
+# Connection values not set for the replica are taken from the primary.
+if os.getenv('DB_REPLICA_NAME') or os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['hrms_lite.db_router.ReplicaRouter']
+DB_REPLICA_PIN_SECONDS = float(os.getenv('DB_REPLICA_PIN_SECONDS', '2'))
+
+# Partition the attendance table by month on PostgreSQL (see
+# attendance/partitions.py); applied by migration 0005 or
+# `manage.py attendance_partitions convert`
+ATTENDANCE_PARTITIONING = os.getenv('ATTENDANCE_PARTITIONING', 'False').lower() in ('true', '1', 'yes')
+
+# Per-employee yearly attendance bitmaps held by each worker (see
+# attendance/bitsets.py); when on, they back the summary, per-employee totals,
+# matrix and day queries. PERSIST also stores them in the attendance_bitmaps
+# table, so workers load them without scanning every attendance record.
+ATTENDANCE_BITSETS = os.getenv('ATTENDANCE_BITSETS', 'False').lower() in ('true', '1', 'yes')
+ATTENDANCE_BITSETS_PERSIST = os.getenv('ATTENDANCE_BITSETS_PERSIST', 'False').lower() in ('true', '1', 'yes')
+
+# Backend of `GET /api/employees/?q=` (see employees/search.py): 'trigram'
+# queries pg_trgm indexes (PostgreSQL only), 'memory' keeps a per-worker index
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    INSTALLED_APPS.append('django.contrib.postgres')
+    EMPLOYEE_SEARCH = os.getenv('EMPLOYEE_SEARCH', 'trigram')
+else:
+    EMPLOYEE_SEARCH = os.getenv('EMPLOYEE_SEARCH', 'memory')
+
+# Cache
+# Also stores the response cache entries with RESPONSE_CACHE_BACKEND=django;
+# point this at a shared backend (e.g. FileBasedCache, DatabaseCache, Redis)
+# to share them across workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'hrms-lite'),
+    }
+}
+
+# Response cache for employee and attendance summary reads (hrms_lite.cache)
+RESPONSE_CACHE = {
+    'ENABLED': os.getenv('RESPONSE_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes'),
+    # 'lru' (per-process) or 'django' (the CACHE_ALIAS cache, shared across workers)
+    'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'lru'),
+    'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '256')),
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300')),
+}
+
+# Live attendance events at /api/attendance/events/ (hrms_lite.events), served
+# under ASGI. LIVE_EVENTS_FANOUT: 'local' (streams of the writing worker),
+# 'cache' (through the shared default cache) or a dotted fan-out class path.
+# LIVE_EVENTS_BACKLOG events per worker are kept for resuming clients.
+LIVE_EVENTS = os.getenv('LIVE_EVENTS', 'True').lower() in ('true', '1', 'yes')
+LIVE_EVENTS_FANOUT = os.getenv('LIVE_EVENTS_FANOUT', 'local')
+LIVE_EVENTS_BACKLOG = int(os.getenv('LIVE_EVENTS_BACKLOG', '1000'))
+
+# Delta sync (sync app): rows newer than the overlap are sent again in the
+# next round in case an older write commits late, so it must exceed the
+# longest write transaction (and replica lag). Tombstones are kept for the
+# retention period by `manage.py sync_compact`.
+SYNC_OVERLAP_SECONDS = int(os.getenv('SYNC_OVERLAP_SECONDS', '30'))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Deleting an employee hides it at once; its attendance history is purged
+# afterwards by a background job, in batches of EMPLOYEE_PURGE_BATCH_SIZE rows
+# (employees/purge.py).
+EMPLOYEE_PURGE_BATCH_SIZE = int(os.getenv('EMPLOYEE_PURGE_BATCH_SIZE', '500'))
+
+# Background jobs (hrms_lite.jobs), run by `manage.py run_workers`. A job is
+# leased to its worker for JOBS_VISIBILITY_TIMEOUT seconds (renewed while it
+# runs) and claimed again if the worker dies; failed attempts are retried
+# after JOBS_RETRY_DELAY seconds, doubling each time. JOBS_EMBEDDED_WORKER
+# also runs jobs in a thread of the web worker that queued them (and of every
+# web worker from its first request, for jobs a dead one left); off by
+# default, for sites without a worker process. Uploads for jobs are stored in
+# JOBS_FILES_DIR (default: a directory in the temp dir), which the workers
+# must be able to read.
+JOBS_EMBEDDED_WORKER = os.getenv('JOBS_EMBEDDED_WORKER', 'False').lower() in ('true', '1', 'yes')
+JOBS_FILES_DIR = os.getenv('JOBS_FILES_DIR', '')
+JOBS_VISIBILITY_TIMEOUT = int(os.getenv('JOBS_VISIBILITY_TIMEOUT', '300'))
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', '3'))
+JOBS_RETRY_DELAY = int(os.getenv('JOBS_RETRY_DELAY', '30'))
+JOBS_POLL_SECONDS = float(os.getenv('JOBS_POLL_SECONDS', '1'))
+JOBS_RETENTION_DAYS = int(os.getenv('JOBS_RETENTION_DAYS', '7'))
+
+# brotli/gzip compression of JSON and text responses (hrms_lite.compression)
+RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', 'True').lower() in ('true', '1', 'yes')
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+
+# Request metrics (hrms_lite.metrics), served at /api/metrics/
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('true', '1', 'yes')
+# Directory shared by all workers for multi-process aggregation; unset = per-process
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+
+# Slow-query log (hrms_lite.slow_queries), off by default: statements over
+# SLOW_QUERY_THRESHOLD_MS are stored with their URL name, the call site in
+# SLOW_QUERY_APPS and an EXPLAIN plan (ANALYZE re-runs SELECTs on PostgreSQL).
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'False').lower() in ('true', '1', 'yes')
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '100'))
+SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'True').lower() in ('true', '1', 'yes')
+SLOW_QUERY_ANALYZE = os.getenv('SLOW_QUERY_ANALYZE', 'True').lower() in ('true', '1', 'yes')
+SLOW_QUERY_APPS = ['employees', 'attendance']
+
+# Serve JSON reads with the async views (employees/attendance `async_views`).
+# hrms_lite.asgi turns this on by default; under WSGI it only adds overhead.
+ASYNC_READS = os.getenv('ASYNC_READS', 'False').lower() in ('true', '1', 'yes')
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -130,6 +268,47 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.JSONParser',
     ],
     'EXCEPTION_HANDLER': 'hrms_lite.exceptions.custom_exception_handler',
+    # `format` is an application-level query parameter (e.g. export format),
+    # not a renderer override
+    'URL_FORMAT_OVERRIDE': None,
+    # Reverse proxies in front of the app, for telling clients apart by
+    # X-Forwarded-For (rate limits below). 0 uses REMOTE_ADDR, as any
+    # client can send the header
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+    # Rate limits and concurrency caps (hrms_lite.admission). Rates are
+    # 'N/s|m|h|d' token buckets per client; endpoints are URL names.
+    'ADMISSION_CONTROL': {
+        'ENABLED': os.getenv('ADMISSION_CONTROL', 'False').lower() in ('true', '1', 'yes'),
+        # Only these are limited; writes always go through
+        'METHODS': ['GET', 'HEAD'],
+        # 'sqlite' (a file shared by the workers of one box), 'local' or a dotted class path
+        'STORE': os.getenv('ADMISSION_STORE', 'sqlite'),
+        'STORE_PATH': os.getenv('ADMISSION_STORE_PATH', ''),
+        # Every request of a client, across endpoints
+        'CLIENT_RATE': os.getenv('ADMISSION_CLIENT_RATE', '50/s'),
+        'CLIENT_BURST': int(os.getenv('ADMISSION_CLIENT_BURST', '200')),
+        # (rate, burst) per client for expensive endpoints
+        'ENDPOINT_RATES': {
+            'attendance-summary': ('5/s', 20),
+            'attendance-matrix': ('2/s', 10),
+            'attendance-analytics': ('5/s', 20),
+            'attendance-list-create': ('10/s', 40),
+            'employee-list-create': ('10/s', 40),
+        },
+        # Requests of these endpoints running at once across all workers;
+        # more are shed with 503 so the rest of the API stays responsive
+        'CONCURRENCY_LIMITS': {
+            'attendance-summary': 2,
+            'attendance-matrix': 2,
+            'attendance-analytics': 2,
+            'attendance-list-create': 4,
+            'attendance-export': 2,
+            'employee-export': 2,
+        },
+        'CONCURRENCY_LEASE_SECONDS': 120,
+        'SHED_RETRY_AFTER': 1,
+        'EXEMPT': ['health-check', 'metrics', 'admission-stats', 'attendance-events'],
+    },
 }
 
 # Only add BrowsableAPIRenderer in debug mode
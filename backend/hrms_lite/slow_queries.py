@@ -0,0 +1,336 @@
+"""
+Slow-query log: which SQL an endpoint spends its time in.
+
+With SLOW_QUERY_LOG on, `SlowQueryMiddleware` wraps every query of a
+request (``connection.execute_wrapper``) and keeps the ones slower than
+SLOW_QUERY_THRESHOLD_MS. Each is stored with the request's URL name and
+the innermost call site in the SLOW_QUERY_APPS apps, for example
+``attendance/views.py:212 in attendance_summary``. Queries run while a
+streaming response is sent (exports) count too. Async streams (live
+events) don't.
+
+Statements are grouped by fingerprint. The fingerprint normalizes the SQL's
+literals, placeholder lists and whitespace, so ``IN (%s, %s)`` and
+``IN (%s)`` count as one statement. The first time a process sees a
+fingerprint, it captures the plan:
+
+- SQLite uses ``EXPLAIN QUERY PLAN``.
+- PostgreSQL uses ``EXPLAIN ANALYZE`` for SELECTs, which runs the query a
+  second time. Other statements get a plain ``EXPLAIN``.
+
+The plan is read on a cursor that bypasses the wrappers. On PostgreSQL this
+happens inside a savepoint, so a failing EXPLAIN can't break the request's
+transaction.
+
+After each request, its slow queries are added to the `SlowQuery` and
+`SlowQuerySource` tables, which every worker shares. `manage.py
+slow_queries` and `/api/slow-queries/` (staff only) list the top offenders.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import SlowQuery, SlowQuerySource
+
+
+logger = logging.getLogger(__name__)
+
+ORDERINGS = {
+    'total': '-total_ms',
+    'max': '-max_ms',
+    'calls': '-calls',
+    'recent': '-last_seen',
+}
+
+# Applied in order: literals and placeholders become `?`, then lists of
+# them (IN lists, multi-row VALUES) collapse to one
+_NORMALIZE = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s|\?'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+_EXPLAINABLE = re.compile(r'\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+_READ = re.compile(r'\s*SELECT\b', re.IGNORECASE)
+
+# Fingerprints whose plan this process has captured
+_explained = set()
+_explained_lock = threading.Lock()
+MAX_EXPLAINED = 10000
+
+
+def fingerprint(sql):
+    """(normalized SQL, its SHA-1) for grouping repeats of a statement."""
+    normalized = sql
+    for pattern, replacement in _NORMALIZE:
+        normalized = pattern.sub(replacement, normalized)
+    normalized = normalized.strip()
+    return normalized, hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def _where(frame):
+    filename = os.path.relpath(frame.f_code.co_filename, settings.BASE_DIR)
+    return f'{filename}:{frame.f_lineno} in {frame.f_code.co_name}'
+
+
+def call_site(frame):
+    """
+    'app/file.py:line in function' of the innermost SLOW_QUERY_APPS frame.
+    Without one (e.g. a query run by a shared helper while a response
+    streams) the innermost frame of other project code, not counting
+    middleware; '' for ORM calls awaited by async views, whose frames
+    aren't on the thread running the query.
+    """
+    roots = tuple(
+        apps.get_app_config(label).path + os.sep
+        for label in settings.SLOW_QUERY_APPS if apps.is_installed(label)
+    )
+    project = str(settings.BASE_DIR) + os.sep
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(roots):
+            return _where(frame)
+        if (fallback is None and filename.startswith(project) and 'site-packages' not in filename
+                and frame.f_code.co_name not in ('__call__', '__acall__')):
+            fallback = frame
+        frame = frame.f_back
+    return _where(fallback) if fallback is not None else ''
+
+
+def explain(connection, sql, params):
+    """The plan of `sql` as text, or the error EXPLAIN raised."""
+    if connection.vendor == 'postgresql' and settings.SLOW_QUERY_ANALYZE and _READ.match(sql):
+        prefix = connection.ops.explain_query_prefix(analyze=True)
+    else:
+        prefix = connection.ops.explain_query_prefix()
+    # The backend's own cursor: no execute wrappers, so neither this log
+    # nor the request metrics see the EXPLAIN
+    cursor = connection.create_cursor()
+    savepoint = connection.vendor == 'postgresql' and connection.in_atomic_block
+    try:
+        if savepoint:
+            cursor.execute('SAVEPOINT hrms_explain')
+        try:
+            cursor.execute(f'{prefix} {sql}', params)
+            rows = cursor.fetchall()
+        except Exception:
+            if savepoint:
+                cursor.execute('ROLLBACK TO SAVEPOINT hrms_explain')
+            raise
+        if savepoint:
+            cursor.execute('RELEASE SAVEPOINT hrms_explain')
+    except Exception as exc:
+        return f'EXPLAIN failed: {type(exc).__name__}: {exc}'
+    finally:
+        cursor.close()
+
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail): indent each step under its parent
+        depths, lines = {}, []
+        for step, parent, _, detail in rows:
+            depths[step] = depths.get(parent, -1) + 1
+            lines.append('  ' * depths[step] + detail)
+        return '\n'.join(lines)
+    return '\n'.join(' '.join(str(column) for column in row) for row in rows)
+
+
+def needs_plan(key):
+    """True the first time this process sees fingerprint `key`."""
+    with _explained_lock:
+        if key in _explained:
+            return False
+        if len(_explained) >= MAX_EXPLAINED:
+            _explained.clear()
+        _explained.add(key)
+        return True
+
+
+class SlowQueryRecorder:
+    """`execute_wrapper` callable collecting one request's slow queries."""
+
+    def __init__(self, request):
+        self.request = request
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.samples = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - started
+        if duration >= self.threshold:
+            self.record(context['connection'], sql, params, many, duration)
+        return result
+
+    def record(self, connection, sql, params, many, duration):
+        normalized, key = fingerprint(sql)
+        plan = None
+        if settings.SLOW_QUERY_EXPLAIN and not many and _EXPLAINABLE.match(sql) and needs_plan(key):
+            plan = explain(connection, sql, params)
+        match = getattr(self.request, 'resolver_match', None)
+        self.samples.append({
+            'fingerprint': key,
+            'sql': normalized,
+            'view': match.url_name if match is not None and match.url_name else 'unmatched',
+            # Skip this method and __call__
+            'call_site': call_site(sys._getframe(2)),
+            'ms': duration * 1000,
+            'plan': plan,
+        })
+
+    def watching(self):
+        """Context manager installing the recorder on every connection."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+def _add(model, lookup, changes, defaults):
+    """UPDATE the row matching `lookup` with `changes`, or create it."""
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **defaults)
+    except IntegrityError:
+        # Another worker created it first
+        model.objects.filter(**lookup).update(**changes)
+
+
+def save(samples):
+    """Add a request's slow queries to the log tables."""
+    queries, sources = {}, {}
+    for sample in samples:
+        query = queries.setdefault(sample['fingerprint'], {
+            'sql': sample['sql'], 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'plan': None
+        })
+        query['calls'] += 1
+        query['total_ms'] += sample['ms']
+        query['max_ms'] = max(query['max_ms'], sample['ms'])
+        if sample['plan'] is not None:
+            query['plan'] = sample['plan']
+        source = sources.setdefault((sample['fingerprint'], sample['view'], sample['call_site']), {
+            'calls': 0, 'total_ms': 0.0
+        })
+        source['calls'] += 1
+        source['total_ms'] += sample['ms']
+
+    now = timezone.now()
+    with transaction.atomic():
+        for key, query in queries.items():
+            plan = {} if query['plan'] is None else {'plan': query['plan'], 'explained_at': now}
+            _add(
+                SlowQuery, {'fingerprint': key},
+                changes={
+                    'calls': F('calls') + query['calls'],
+                    'total_ms': F('total_ms') + query['total_ms'],
+                    'max_ms': Greatest('max_ms', Value(query['max_ms'])),
+                    'last_seen': now,
+                    **plan,
+                },
+                defaults={
+                    'sql': query['sql'], 'calls': query['calls'], 'total_ms': query['total_ms'],
+                    'max_ms': query['max_ms'], 'last_seen': now, **plan,
+                }
+            )
+        for (key, view, site), source in sources.items():
+            _add(
+                SlowQuerySource, {'query_id': key, 'view': view, 'call_site': site[:300]},
+                changes={'calls': F('calls') + source['calls'], 'total_ms': F('total_ms') + source['total_ms']},
+                defaults=source
+            )
+
+
+def save_quietly(recorder):
+    """`save`, logging rather than raising: the log must never fail a request."""
+    if not recorder.samples:
+        return
+    try:
+        save(recorder.samples)
+    except DatabaseError:
+        logger.warning('Could not save %d slow queries', len(recorder.samples), exc_info=True)
+    recorder.samples = []
+
+
+def watch_stream(content, recorder):
+    """Record the queries run while a streaming response is sent."""
+    try:
+        with recorder.watching():
+            yield from content
+    finally:
+        save_quietly(recorder)
+
+
+def top(order='total', limit=20):
+    """The worst logged queries by `order` (see ORDERINGS), with their sources."""
+    return SlowQuery.objects.prefetch_related('sources').order_by(ORDERINGS[order])[:limit]
+
+
+def clear():
+    """Empty the log; returns how many queries were removed."""
+    deleted = SlowQuery.objects.count()
+    SlowQuerySource.objects.all().delete()
+    SlowQuery.objects.all().delete()
+    with _explained_lock:
+        _explained.clear()
+    return deleted
+
+
+class SlowQueryMiddleware:
+    """
+    Record the slow queries of each request when SLOW_QUERY_LOG is on.
+
+    Both sync and async capable. Placed first, so its own writes happen
+    outside `MetricsMiddleware` and don't count toward the request's SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.SLOW_QUERY_LOG:
+            return self.get_response(request)
+
+        recorder = SlowQueryRecorder(request)
+        with recorder.watching():
+            response = self.get_response(request)
+        if response.streaming and not response.is_async:
+            response.streaming_content = watch_stream(response.streaming_content, recorder)
+        else:
+            save_quietly(recorder)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.SLOW_QUERY_LOG:
+            return await self.get_response(request)
+
+        recorder = SlowQueryRecorder(request)
+        with recorder.watching():
+            response = await self.get_response(request)
+        if recorder.samples:
+            await sync_to_async(save_quietly)(recorder)
+        return response
@@ -0,0 +1,47 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from . import slow_queries
+from .serializers import SlowQuerySerializer
+
+
+MAX_LIMIT = 100
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def slow_query_list(request):
+    """
+    GET: The worst queries in the slow-query log (staff only)
+
+    `order` is total (time, the default), max, calls or recent; `limit`
+    defaults to 20.
+    """
+    errors = {}
+    order = request.query_params.get('order', 'total')
+    if order not in slow_queries.ORDERINGS:
+        errors['order'] = [f"Order must be one of: {', '.join(slow_queries.ORDERINGS)}."]
+    try:
+        limit = int(request.query_params.get('limit', 20))
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError
+    except ValueError:
+        errors['limit'] = [f'Limit must be a whole number from 1 to {MAX_LIMIT}.']
+    if errors:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Validation failed',
+                'details': errors
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    data = SlowQuerySerializer(slow_queries.top(order, limit), many=True).data
+    return Response({
+        'success': True,
+        'count': len(data),
+        'data': data
+    })
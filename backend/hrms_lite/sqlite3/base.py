@@ -0,0 +1,73 @@
+"""
+SQLite backend tuned for several worker processes writing to one file.
+
+Use it with ``DB_ENGINE=hrms_lite.sqlite3``. On top of Django's backend it:
+
+- applies the pragmas below on every new connection (write-ahead logging,
+  so readers never block the writer, plus a busy timeout, so writers queue
+  instead of failing with "database is locked");
+- starts transactions with ``BEGIN IMMEDIATE``. A deferred transaction that
+  reads and then writes cannot wait for the write lock: SQLite fails it at
+  once with "database is locked", whatever the busy timeout. Taking the
+  lock up front makes it queue behind the busy timeout instead.
+
+Each pragma can be overridden through ``OPTIONS`` in ``settings.DATABASES``.
+``transaction_mode`` (``IMMEDIATE``, ``DEFERRED`` or ``EXCLUSIVE``) matches
+the option Django 5.1 adds to its own backend.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+
+PRAGMA_DEFAULTS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',    # durable in WAL mode except on power loss
+    'busy_timeout': 5000,       # milliseconds
+    'cache_size': -64000,       # negative = KiB, i.e. 64 MiB per connection
+    'mmap_size': 268435456,     # 256 MiB
+    'temp_store': 'MEMORY',
+}
+
+_KEYWORD_PRAGMAS = {
+    'journal_mode': ('WAL', 'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'OFF'),
+    'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+    'temp_store': ('DEFAULT', 'FILE', 'MEMORY'),
+}
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def _pragma_value(name, value):
+    if name in _KEYWORD_PRAGMAS:
+        value = str(value).upper()
+        if value not in _KEYWORD_PRAGMAS[name]:
+            raise ImproperlyConfigured(f"Invalid SQLite {name} {value!r}.")
+        return value
+    return int(value)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, settings_dict, *args, **kwargs):
+        options = dict(settings_dict.get('OPTIONS', {}))
+        self.pragmas = {
+            name: _pragma_value(name, options.pop(name, default))
+            for name, default in PRAGMA_DEFAULTS.items()
+        }
+        self.transaction_mode = str(options.pop('transaction_mode', 'IMMEDIATE')).upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"Invalid SQLite transaction_mode {self.transaction_mode!r}.")
+        # The remaining options are passed to sqlite3.connect()
+        settings_dict = {**settings_dict, 'OPTIONS': options}
+        super().__init__(settings_dict, *args, **kwargs)
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        # journal_mode must be set outside a transaction; it persists in the
+        # file, the others are per connection
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,78 @@
+"""
+Streaming export helpers for the HRMS Lite API.
+
+Rows are written to the response one at a time as CSV or newline-delimited
+JSON, so exports run in constant memory regardless of how many rows match.
+"""
+
+import csv
+import datetime
+import json
+
+from django.http import StreamingHttpResponse
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """File-like object whose write() hands the value straight back."""
+
+    def write(self, value):
+        return value
+
+
+def format_value(value):
+    """Render dates and datetimes the same way the JSON API does."""
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def csv_stream(fields, rows):
+    """Yield a CSV header line followed by one line per row."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+def ndjson_stream(fields, rows):
+    """Yield one JSON object per row, each terminated by a newline."""
+    for row in rows:
+        record = {field: format_value(value) for field, value in zip(fields, row)}
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def export_response(export_format, filename, fields, rows):
+    """
+    Build a streaming response for `rows` (an iterable of tuples in `fields` order).
+    """
+    if export_format == 'csv':
+        content = csv_stream(fields, rows)
+    else:
+        content = ndjson_stream(fields, rows)
+
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    # Ask reverse proxies not to buffer the body so the first rows arrive immediately
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def invalid_format_details(export_format):
+    """Error details for an unsupported `format` query parameter."""
+    return {
+        'format': [
+            f"Unsupported export format '{export_format}'. "
+            f"Choose one of: {', '.join(EXPORT_FORMATS)}."
+        ]
+    }
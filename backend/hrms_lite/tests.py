@@ -0,0 +1,439 @@
+"""
+Tests for the shared infrastructure in hrms_lite.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from attendance import async_views as attendance_async_views
+from attendance.models import Attendance
+from employees.models import Employee
+from . import admission, cache, compression, jobs, versions
+from .models import Job, Version
+
+
+CALLS = []
+
+
+@jobs.task('tests.echo')
+def echo_task(job, value):
+    CALLS.append(value)
+    return {'value': value}
+
+
+@jobs.task('tests.fail', max_attempts=2)
+def fail_task(job):
+    raise RuntimeError('boom')
+
+
+@override_settings(JOBS_EMBEDDED_WORKER=False, JOBS_MAX_ATTEMPTS=3, JOBS_RETRY_DELAY=30)
+class JobTests(TestCase):
+    """The database-backed job queue (user-023)."""
+
+    def setUp(self):
+        CALLS.clear()
+        files_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, files_dir, ignore_errors=True)
+        settings_override = override_settings(JOBS_FILES_DIR=files_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def run_next(self, worker='test:1'):
+        job = jobs.claim(worker)
+        if job is not None:
+            jobs.execute(job, worker)
+            job.refresh_from_db()
+        return job
+
+    def test_enqueue_and_run(self):
+        job = jobs.enqueue('tests.echo', value=3)
+        self.assertEqual((job.status, job.max_attempts), (Job.QUEUED, 3))
+        job = self.run_next()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.SUCCEEDED, 1, {'value': 3}))
+        self.assertEqual(CALLS, [3])
+        self.assertIsNone(self.run_next())
+
+    def test_unknown_task_is_refused(self):
+        with self.assertRaises(LookupError):
+            jobs.enqueue('tests.missing')
+
+    def test_enqueue_once_returns_the_pending_job(self):
+        first, created = jobs.enqueue_once('tests.echo', value=1)
+        self.assertTrue(created)
+        second, created = jobs.enqueue_once('tests.echo', value=1)
+        self.assertFalse(created)
+        self.assertEqual(second.pk, first.pk)
+
+        jobs.claim('test:1')
+        self.assertEqual(jobs.enqueue_once('tests.echo', value=1)[0].pk, first.pk)
+        jobs.execute(Job.objects.get(pk=first.pk), 'test:1')
+        self.assertTrue(jobs.enqueue_once('tests.echo', value=1)[1])
+
+    def test_failures_are_retried_with_backoff_then_fail(self):
+        job = jobs.enqueue('tests.fail')
+        with self.assertLogs('hrms_lite.jobs', 'ERROR'):
+            job = self.run_next()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('RuntimeError: boom', job.error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=25))
+        self.assertIsNone(self.run_next())
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs('hrms_lite.jobs', 'ERROR'):
+            job = self.run_next()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_expired_lease_is_claimed_again(self):
+        job = jobs.enqueue('tests.echo', value=5)
+        jobs.claim('dead:1')
+        self.assertIsNone(jobs.claim('test:1'))
+
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.next_due(), Job.objects.get(pk=job.pk).locked_until)
+        job = self.run_next()
+        self.assertEqual((job.status, job.attempts, job.worker), (Job.SUCCEEDED, 2, 'test:1'))
+
+    def test_expired_lease_on_last_attempt_fails(self):
+        job = jobs.enqueue('tests.echo', value=5)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING, attempts=3, locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertIsNone(jobs.claim('test:1'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('stopped responding', job.error)
+
+    def test_a_lost_attempt_cannot_overwrite_the_new_one(self):
+        job = jobs.enqueue('tests.echo', value=7)
+        lost = jobs.claim('dead:1')
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        current = jobs.claim('test:1')
+        jobs.execute(lost, 'dead:1')
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.RUNNING)
+        jobs.execute(current, 'test:1')
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.SUCCEEDED)
+
+    def test_prune_deletes_old_jobs_and_files(self):
+        old = jobs.enqueue('tests.echo', value=1)
+        recent = jobs.enqueue('tests.echo', value=2)
+        Job.objects.filter(pk=old.pk).update(status=Job.SUCCEEDED, finished_at=timezone.now() - timedelta(days=30))
+        Job.objects.filter(pk=recent.pk).update(status=Job.SUCCEEDED, finished_at=timezone.now())
+        stale, fresh = jobs.store_file([b'old']), jobs.store_file([b'new'])
+        month_ago = (timezone.now() - timedelta(days=30)).timestamp()
+        os.utime(os.path.join(jobs.files_dir(), stale), (month_ago, month_ago))
+
+        self.assertEqual(jobs.prune(), 1)
+        self.assertEqual(list(Job.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertEqual(os.listdir(jobs.files_dir()), [fresh])
+
+    def test_job_files(self):
+        name = jobs.store_file([b'a,b\n', b'1,2\n'])
+        with jobs.open_file(name) as file:
+            self.assertEqual(file.read(), b'a,b\n1,2\n')
+        jobs.delete_file(name)
+        jobs.delete_file(name)
+        self.assertEqual(os.listdir(jobs.files_dir()), [])
+
+    def test_status_and_result_endpoints(self):
+        job = jobs.enqueue('tests.echo', value=9)
+        body = self.client.get(f'/api/jobs/{job.pk}/').json()
+        self.assertEqual(body['data']['status'], Job.QUEUED)
+        self.assertEqual(self.client.get(f'/api/jobs/{job.pk}/result/').status_code, 409)
+        self.run_next()
+        self.assertEqual(self.client.get(f'/api/jobs/{job.pk}/result/').json()['data'], {'value': 9})
+        self.assertEqual(self.client.get('/api/jobs/999999/').status_code, 404)
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': True, 'BACKEND': 'lru', 'MAX_ENTRIES': 256, 'TIMEOUT': 300})
+class ResponseCacheTests(TestCase):
+    """Versioned response cache and its invalidation (user-007)."""
+
+    def setUp(self):
+        cache.reset_backend()
+        self.addCleanup(cache.reset_backend)
+        Employee.objects.create(
+            employee_id='EMP001', full_name='Ada Lovelace', email='ada@example.com', department='Engineering'
+        )
+
+    def get(self, path='/api/employees/'):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_second_read_is_a_hit(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        hit = self.get()
+        self.assertEqual(hit['X-Cache'], 'HIT')
+        self.assertEqual(hit.json()['count'], 1)
+        self.assertEqual(self.get('/api/employees/?department=Sales')['X-Cache'], 'MISS')
+
+    def test_write_invalidates(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/employees/', {
+                'employee_id': 'EMP002', 'full_name': 'Grace Hopper', 'email': 'grace@example.com',
+                'department': 'Engineering'
+            }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        response = self.get()
+        self.assertEqual((response['X-Cache'], response.json()['count']), ('MISS', 2))
+
+    def test_write_in_another_worker_invalidates(self):
+        self.get()
+        # What another process's commit does: only the shared counter moves
+        Version.objects.filter(name='response-cache:employees').update(value=F('value') + 1)
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+    def test_attendance_write_invalidates_the_summary(self):
+        self.get('/api/attendance/summary/')
+        self.assertEqual(self.get('/api/attendance/summary/')['X-Cache'], 'HIT')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/attendance/', {
+                'employee_id': Employee.objects.get().pk, 'date': '2024-03-01', 'status': 'present'
+            }, content_type='application/json')
+        response = self.get('/api/attendance/summary/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['data'][0]['total_present'], 1)
+
+    def test_errors_are_not_cached(self):
+        self.assertEqual(self.client.get('/api/employees/999999/').status_code, 404)
+        self.assertEqual(self.client.get('/api/employees/999999/')['X-Cache'], 'MISS')
+
+    def test_disabled(self):
+        with self.settings(RESPONSE_CACHE={'ENABLED': False}):
+            self.get()
+            self.assertFalse(self.get().has_header('X-Cache'))
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class ConditionalRequestTests(TestCase):
+    """ETag / Last-Modified validators and 304 answers (user-008)."""
+
+    def setUp(self):
+        self.employee = Employee.objects.create(
+            employee_id='EMP001', full_name='Ada Lovelace', email='ada@example.com', department='Engineering'
+        )
+        Attendance.objects.create(employee=self.employee, date=date(2024, 5, 6), status='present')
+
+    def test_list_etag_and_304(self):
+        response = self.client.get('/api/employees/')
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+        not_modified = self.client.get('/api/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((not_modified.status_code, not_modified.content), (304, b''))
+        self.assertNotEqual(self.client.get('/api/employees/?department=Sales')['ETag'], etag)
+
+    def test_list_etag_changes_with_a_write(self):
+        etag = self.client.get('/api/attendance/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.get().delete()
+        response = self.client.get('/api/attendance/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.json()['count']), (200, 0))
+
+        etag = response['ETag']
+        # What another process's commit does: only the shared counter moves
+        Version.objects.filter(name='response-cache:employees').update(value=F('value') + 1)
+        self.assertEqual(self.client.get('/api/attendance/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_validator_does_not_scan_the_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/attendance/?page_size=10')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper()])
+        self.assertEqual(
+            self.client.get('/api/attendance/?page_size=10', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+        )
+
+    def test_detail_validators(self):
+        path = f'/api/employees/{self.employee.pk}/'
+        response = self.client.get(path)
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(
+            self.client.get(path, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+        response = self.client.put(path, {'full_name': 'Ada King'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get('/api/employees/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_async_list(self):
+        factory = RequestFactory()
+        view = async_to_sync(attendance_async_views.attendance_list_create)
+        response = view(factory.get('/api/attendance/'))
+        self.assertEqual(response['ETag'], self.client.get('/api/attendance/')['ETag'])
+        self.assertEqual(view(factory.get('/api/attendance/', HTTP_IF_NONE_MATCH=response['ETag'])).status_code, 304)
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False}, RESPONSE_COMPRESSION=True, RESPONSE_COMPRESSION_MIN_SIZE=1024)
+class CompressionTests(TestCase):
+    """Accept-Encoding negotiation for large JSON bodies (user-019)."""
+
+    def setUp(self):
+        Employee.objects.bulk_create([
+            Employee(employee_id=f'EMP{number:03d}', full_name=f'Employee {number}',
+                     email=f'employee{number}@example.com', department='Engineering')
+            for number in range(50)
+        ])
+
+    def test_choose_encoding(self):
+        self.assertEqual(compression.choose_encoding('gzip;q=0, identity'), None)
+        self.assertEqual(compression.choose_encoding('deflate, gzip;q=0.5'), 'gzip')
+        self.assertIsNone(compression.choose_encoding(''))
+
+    def test_large_json_is_gzipped(self):
+        with mock.patch.object(compression, 'brotli', None):
+            response = self.client.get('/api/employees/', HTTP_ACCEPT_ENCODING='br, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['count'], 50)
+
+    def test_small_or_unaccepted_bodies_are_sent_as_is(self):
+        self.assertFalse(self.client.get('/api/employees/').has_header('Content-Encoding'))
+        response = self.client.get('/api/employees/?fields=id&page_size=1', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+def admission_control(**options):
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'ADMISSION_CONTROL': {
+            **settings.REST_FRAMEWORK['ADMISSION_CONTROL'],
+            'ENABLED': True, 'STORE': 'local', 'CLIENT_RATE': None, 'ENDPOINT_RATES': {},
+            'CONCURRENCY_LIMITS': {}, **options
+        }
+    })
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class AdmissionTests(TestCase):
+    """Rate limits and concurrency caps (user-024)."""
+
+    def setUp(self):
+        stats_patch = mock.patch.object(admission, 'stats', admission.AdmissionStats())
+        stats_patch.start()
+        self.addCleanup(stats_patch.stop)
+
+    def get(self, path='/api/attendance/summary/', **headers):
+        return self.client.get(path, **headers).status_code
+
+    @admission_control(ENABLED=False, CLIENT_RATE='1/m', CLIENT_BURST=1)
+    def test_disabled(self):
+        self.assertEqual({self.get() for _ in range(5)}, {200})
+        self.assertEqual(admission.stats.snapshot(), {})
+
+    @admission_control(ENDPOINT_RATES={'attendance-summary': ('1/m', 2)})
+    def test_endpoint_rate(self):
+        self.assertEqual([self.get() for _ in range(3)], [200, 200, 429])
+        response = self.client.get('/api/attendance/summary/')
+        self.assertEqual(response.json()['error']['status_code'], 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        # Other endpoints and other clients have their own buckets
+        self.assertEqual(self.get('/api/employees/'), 200)
+        self.assertEqual(self.get(REMOTE_ADDR='10.0.0.2'), 200)
+        self.assertEqual(
+            self.client.get('/api/admission/stats/').json()['data']['attendance-summary'],
+            {'allowed': 3, 'throttled': 2, 'shed': 0, 'error': 0}
+        )
+
+    @admission_control(CLIENT_RATE='1/m', CLIENT_BURST=1)
+    def test_writes_and_exempt_views_are_not_limited(self):
+        self.assertEqual([self.get('/api/employees/'), self.get('/api/employees/')], [200, 429])
+        response = self.client.post('/api/employees/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.get('/api/health/'), 200)
+
+    @admission_control(CLIENT_RATE='1/m', CLIENT_BURST=1)
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        self.assertEqual(self.get(HTTP_X_FORWARDED_FOR='10.0.0.1'), 200)
+        self.assertEqual(self.get(HTTP_X_FORWARDED_FOR='10.0.0.2'), 429)
+
+    @admission_control(CONCURRENCY_LIMITS={'attendance-summary': 1})
+    def test_concurrency_limit(self):
+        # Each finished request gives its slot back
+        self.assertEqual([self.get(), self.get()], [200, 200])
+        token = admission.get_store().acquire('concurrency:attendance-summary', 1, 60)
+        response = self.client.get('/api/attendance/summary/')
+        self.assertEqual((response.status_code, response['Retry-After']), (503, '1'))
+        admission.get_store().release('concurrency:attendance-summary', token)
+        self.assertEqual(self.get(), 200)
+
+    @admission_control(ENDPOINT_RATES={'attendance-summary': ('1/m', 1)})
+    def test_store_failure_lets_requests_through(self):
+        with mock.patch.object(admission.LocalStore, 'take', side_effect=OSError('disk full')), \
+                self.assertLogs('hrms_lite.admission', 'WARNING'):
+            self.assertEqual([self.get(), self.get()], [200, 200])
+        self.assertEqual(admission.stats.snapshot()['attendance-summary']['error'], 2)
+
+
+class AdmissionStoreTests(SimpleTestCase):
+    def test_sqlite_store_is_shared(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'admission.sqlite3')
+        # Two stores on one file stand in for two worker processes
+        first, second = admission.SQLiteStore(path), admission.SQLiteStore(path)
+        buckets = [admission.bucket('client:a', '1/m', 2)]
+        self.assertEqual([first.take(buckets)[0], second.take(buckets)[0]], [None, None])
+        empty, wait = first.take(buckets)
+        self.assertEqual(empty, 0)
+        self.assertGreater(wait, 50)
+
+        token = first.acquire('concurrency:x', 1, 60)
+        self.assertIsNone(second.acquire('concurrency:x', 1, 60))
+        second.release('concurrency:x', token)
+        self.assertIsNotNone(second.acquire('concurrency:x', 1, 60))
+
+    def test_parse_rate(self):
+        self.assertEqual(admission.parse_rate('20/s'), 20)
+        self.assertEqual(admission.parse_rate('600/min'), 10)
+        self.assertEqual(admission.bucket('k', '1/m'), ('k', 1 / 60, 1))
+
+
+class VersionTests(TestCase):
+    def test_counters(self):
+        first, second = versions.get_many(['a', 'b'])
+        self.assertEqual(versions.get('a'), first)
+        self.assertEqual(versions.bump('a'), first + 1)
+        self.assertEqual(versions.get_many(['b', 'a']), [second, first + 1])
+        self.assertEqual(versions.bump('new'), versions.get('new'))
+
+    def test_bump_on_commit(self):
+        before = versions.get('a')
+        with self.captureOnCommitCallbacks(execute=True):
+            versions.bump_on_commit('a')
+            self.assertEqual(versions.get('a'), before)
+        self.assertEqual(versions.get('a'), before + 1)
+
+
+class LRUBackendTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        backend = cache.LRUBackend(max_entries=2, timeout=60)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')
+        backend.set('c', 3)
+        self.assertEqual((backend.get('a'), backend.get('b'), backend.get('c')), (1, None, 3))
+
+    def test_entries_expire(self):
+        backend = cache.LRUBackend(max_entries=2, timeout=60)
+        with mock.patch('hrms_lite.cache.time.monotonic', return_value=1000):
+            backend.set('a', 1)
+        with mock.patch('hrms_lite.cache.time.monotonic', return_value=1061):
+            self.assertIsNone(backend.get('a'))
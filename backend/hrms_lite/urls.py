@@ -6,6 +6,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
 
+from . import admission, job_views, slow_query_views
+from .cache import get_setting, stats
+from .metrics import metrics_view
+
 
 def api_root(request):
     """API root endpoint with available endpoints info."""
@@ -16,6 +20,7 @@ def api_root(request):
         'endpoints': {
             'employees': '/api/employees/',
             'attendance': '/api/attendance/',
+            'sync': '/api/sync/',
             'health': '/api/health/',
         }
     })
@@ -30,10 +35,37 @@ def health_check(request):
     })
 
 
+def cache_stats(request):
+    """Response cache hit/miss counters for this worker process."""
+    return JsonResponse({
+        'success': True,
+        'backend': get_setting('BACKEND'),
+        'enabled': get_setting('ENABLED'),
+        'data': stats.snapshot()
+    })
+
+
+def admission_stats(request):
+    """Admission control decisions per view for this worker process."""
+    return JsonResponse({
+        'success': True,
+        'enabled': admission.get_setting('ENABLED'),
+        'store': admission.get_setting('STORE'),
+        'data': admission.stats.snapshot()
+    })
+
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', api_root, name='api-root'),
     path('api/health/', health_check, name='health-check'),
+    path('api/cache/stats/', cache_stats, name='cache-stats'),
+    path('api/metrics/', metrics_view, name='metrics'),
+    path('api/admission/stats/', admission_stats, name='admission-stats'),
+    path('api/jobs/<int:pk>/', job_views.job_detail, name='job-detail'),
+    path('api/jobs/<int:pk>/result/', job_views.job_result, name='job-result'),
+    path('api/slow-queries/', slow_query_views.slow_query_list, name='slow-queries'),
     path('api/employees/', include('employees.urls')),
     path('api/attendance/', include('attendance.urls')),
+    path('api/sync/', include('sync.urls')),
 ]
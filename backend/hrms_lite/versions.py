@@ -0,0 +1,56 @@
+"""
+Version counters shared by every worker, kept in the database.
+
+Per-process caches (the response cache LRU, `WorkerIndex`es, cached
+analytics buckets) tag what they hold with the version of the data it came
+from, and writers advance the version once they commit. The counters live
+in a table rather than in the default cache. The default cache is per
+process unless configured otherwise, and then a write would only reach the
+worker that made it. Reading a counter is a primary-key lookup.
+"""
+
+import random
+
+from django.db import router, transaction
+from django.db.models import F
+
+from .models import Version
+
+
+def _create(names):
+    # Start at a random point, so values handed out before the table was
+    # emptied (e.g. by `flush`) aren't handed out again
+    Version.objects.bulk_create(
+        [Version(name=name, value=random.getrandbits(48)) for name in names], ignore_conflicts=True
+    )
+
+
+def get_many(names):
+    """The current value of each of `names`."""
+    found = dict(Version.objects.filter(name__in=names).values_list('name', 'value'))
+    missing = [name for name in names if name not in found]
+    if missing:
+        _create(missing)
+        found.update(
+            Version.objects.using(router.db_for_write(Version))
+            .filter(name__in=missing).values_list('name', 'value')
+        )
+    return [found[name] for name in names]
+
+
+def get(name):
+    return get_many([name])[0]
+
+
+def bump(name):
+    """Advance `name`; returns its new value."""
+    database = router.db_for_write(Version)
+    with transaction.atomic(using=database):
+        if not Version.objects.using(database).filter(name=name).update(value=F('value') + 1):
+            _create([name])
+        return Version.objects.using(database).get(name=name).value
+
+
+def bump_on_commit(name):
+    """Bump `name` once the current transaction (if any) commits."""
+    transaction.on_commit(lambda: bump(name))
@@ -0,0 +1,181 @@
+"""
+Changes since a cursor, behind `GET /api/sync/`.
+
+Three streams are read in `(timestamp, id)` order from indexes: employees
+and attendance records by `updated_at`, and tombstones by `deleted_at`.
+The cursor holds a position in each stream, so a client that is up to
+date costs three short index range scans, whatever the table sizes.
+
+Timestamps are taken when a row is written, but rows become visible when
+their transaction commits, so a row can appear behind a position already
+handed out. Rows newer than SYNC_OVERLAP_SECONDS are therefore treated as
+unsettled: once a stream reaches them, the cursor that completes the round
+(the last page, without `has_more`) rewinds to where they began, and the
+next round sends them again. Clients
+apply changes as upserts and deletes by id, so repeats are harmless. The
+overlap must exceed the longest write transaction.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from attendance.models import Attendance
+from attendance.serializers import ATTENDANCE_FIELDS
+from employees.models import Employee
+from employees.serializers import EMPLOYEE_FIELDS
+from hrms_lite.fieldsets import Fieldset
+from hrms_lite.pagination import PaginationError, decode_cursor, encode_cursor
+from . import tombstones
+from .models import Tombstone
+
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Attendance is sent with the employee's pk rather than embedded employee
+# fields, which would go stale without the record changing
+SYNC_ATTENDANCE_FIELDS = ['id', 'employee_id', 'date', 'status', 'created_at', 'updated_at']
+
+
+class CursorExpired(Exception):
+    """Raised when changes after the cursor were compacted or reset."""
+
+
+class Position:
+    """
+    A place in one stream: after row (`timestamp`, `row_id`), plus `rewind`,
+    the timestamp to restart from once the current round is complete.
+    """
+
+    def __init__(self, timestamp=None, row_id=0, rewind=None):
+        self.timestamp = timestamp
+        self.row_id = row_id
+        self.rewind = rewind
+
+    def filter(self, field):
+        """Q for rows after this position; `field >= timestamp` keeps it an index range."""
+        if self.timestamp is None:
+            return Q()
+        return Q(**{f'{field}__gte': self.timestamp}) & (
+            Q(**{f'{field}__gt': self.timestamp}) | Q(id__gt=self.row_id)
+        )
+
+    def to_values(self):
+        return [
+            self.timestamp.isoformat() if self.timestamp else None,
+            self.row_id,
+            self.rewind.isoformat() if self.rewind else None,
+        ]
+
+    def restart(self):
+        """The position to start the next round from."""
+        if self.rewind is not None:
+            return Position(self.rewind, 0)
+        return Position(self.timestamp, self.row_id)
+
+    @classmethod
+    def from_values(cls, values):
+        timestamp, row_id, rewind = values
+        if not isinstance(row_id, int):
+            raise PaginationError('Invalid cursor.')
+        try:
+            return cls(
+                datetime.datetime.fromisoformat(timestamp) if timestamp else None,
+                row_id,
+                datetime.datetime.fromisoformat(rewind) if rewind else None,
+            )
+        except (TypeError, ValueError):
+            raise PaginationError('Invalid cursor.')
+
+
+def decode(token):
+    """(employees, attendance, tombstones) positions of a cursor token."""
+    values = decode_cursor(token, 9)
+    return tuple(Position.from_values(values[index:index + 3]) for index in (0, 3, 6))
+
+
+def encode(positions):
+    return encode_cursor([value for position in positions for value in position.to_values()])
+
+
+def read_stream(queryset, field, columns, position, limit, settled):
+    """
+    Up to `limit` rows (as `columns` + [field, 'id'] tuples) after
+    `position`, the next position and whether more rows follow.
+    """
+    rows = list(
+        queryset.filter(position.filter(field)).order_by(field, 'id').values_list(*columns, field, 'id')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        timestamp, row_id = rows[-1][-2:]
+    else:
+        timestamp, row_id = position.timestamp, position.row_id
+    reached_unsettled = timestamp is None or timestamp >= settled
+
+    rewind = position.rewind
+    if rewind is None and reached_unsettled:
+        rewind = settled
+    return rows, Position(timestamp, row_id, rewind), has_more
+
+
+def changes(token, limit):
+    """
+    Changes after cursor `token` (None for a full sync), at most `limit` per
+    stream: returns (data, next cursor, whether more follow). Raises
+    PaginationError for a malformed cursor and CursorExpired when it has to
+    be dropped.
+    """
+    now = timezone.now()
+    settled = now - datetime.timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+    last_reset = tombstones.latest_reset()
+
+    if token:
+        employee_position, attendance_position, tombstone_position = decode(token)
+        if last_reset is not None and tombstone_position.timestamp is not None \
+                and last_reset > tombstone_position.timestamp:
+            raise CursorExpired()
+    else:
+        # A full sync sends every row; deletions count from when it started
+        employee_position, attendance_position = Position(), Position()
+        tombstone_position = Position(max(settled, last_reset) if last_reset else settled)
+
+    employee_fields = Fieldset(EMPLOYEE_FIELDS, list(EMPLOYEE_FIELDS))
+    employee_rows, employee_position, employees_more = read_stream(
+        Employee.objects.all(), 'updated_at', employee_fields.columns, employee_position, limit, settled
+    )
+    attendance_fields = Fieldset(ATTENDANCE_FIELDS, SYNC_ATTENDANCE_FIELDS)
+    attendance_rows, attendance_position, attendance_more = read_stream(
+        Attendance.objects.all(), 'updated_at', attendance_fields.columns, attendance_position, limit, settled
+    )
+    tombstone_rows, tombstone_position, tombstones_more = read_stream(
+        Tombstone.objects.exclude(resource=Tombstone.RESET), 'deleted_at', ['resource', 'object_id'],
+        tombstone_position, limit, settled
+    )
+    has_more = employees_more or attendance_more or tombstones_more
+    if not has_more:
+        employee_position = employee_position.restart()
+        attendance_position = attendance_position.restart()
+        tombstone_position = tombstone_position.restart()
+    if last_reset is not None and tombstone_position.timestamp < last_reset:
+        # Never rewind behind a reset the client has already passed
+        tombstone_position = Position(last_reset, 0, tombstone_position.rewind)
+
+    deleted = {Tombstone.EMPLOYEE: [], Tombstone.ATTENDANCE: []}
+    for resource, object_id, *_ in tombstone_rows:
+        deleted[resource].append(object_id)
+
+    data = {
+        'employees': employee_fields.data(employee_rows),
+        'attendance': attendance_fields.data(attendance_rows),
+        'deleted': {
+            'employees': deleted[Tombstone.EMPLOYEE],
+            'attendance': deleted[Tombstone.ATTENDANCE],
+        },
+    }
+    next_cursor = encode((employee_position, attendance_position, tombstone_position))
+    return data, next_cursor, has_more
@@ -0,0 +1,25 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync import tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete delta sync tombstones older than the retention period. Clients '
+        'with an older cursor have to sync from scratch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help='Keep tombstones this many days (default: SYNC_TOMBSTONE_RETENTION_DAYS)'
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - datetime.timedelta(days=options['days'])
+        deleted = tombstones.compact(before)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones older than {before:%Y-%m-%d %H:%M}.'))
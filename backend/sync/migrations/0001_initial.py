@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('employee', 'Employee'), ('attendance', 'Attendance'), ('reset', 'Reset')], max_length=20)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Tombstone',
+                'verbose_name_plural': 'Tombstones',
+                'db_table': 'sync_tombstones',
+                'indexes': [models.Index(fields=['deleted_at', 'id'], name='sync_tombstone_keyset_idx'), models.Index(fields=['resource', 'deleted_at'], name='sync_tombstone_resource_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    A deleted employee or attendance record, kept so delta sync clients can
+    drop it too.
+
+    A `reset` tombstone marks changes that left no per-record trace (a bulk
+    clear, retired attendance partitions, compacted tombstones): clients that
+    synced before it must start over.
+    """
+    EMPLOYEE = 'employee'
+    ATTENDANCE = 'attendance'
+    RESET = 'reset'
+    RESOURCE_CHOICES = [
+        (EMPLOYEE, 'Employee'),
+        (ATTENDANCE, 'Attendance'),
+        (RESET, 'Reset'),
+    ]
+
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'sync_tombstones'
+        verbose_name = 'Tombstone'
+        verbose_name_plural = 'Tombstones'
+        indexes = [
+            # Keyset order of the sync tombstone stream
+            models.Index(fields=['deleted_at', 'id'], name='sync_tombstone_keyset_idx'),
+            # Latest reset
+            models.Index(fields=['resource', 'deleted_at'], name='sync_tombstone_resource_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.resource} {self.object_id} deleted {self.deleted_at}"
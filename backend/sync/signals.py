@@ -0,0 +1,33 @@
+"""
+Signal handlers writing tombstones for deleted employees and attendance,
+including removed employees and the records their purge deletes.
+"""
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from attendance.models import Attendance
+from employees.models import Employee
+from employees.signals import employee_removed, records_purged
+from . import tombstones
+from .models import Tombstone
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    tombstones.record_deleted(Tombstone.EMPLOYEE, instance.pk)
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    tombstones.record_deleted(Tombstone.ATTENDANCE, instance.pk)
+
+
+@receiver(employee_removed)
+def employee_removed_handler(sender, instance, **kwargs):
+    tombstones.record_deleted(Tombstone.EMPLOYEE, instance.pk)
+
+
+@receiver(records_purged, sender=Attendance)
+def attendance_purged(sender, pks, **kwargs):
+    tombstones.record_deleted_many(Tombstone.ATTENDANCE, pks)
@@ -0,0 +1,45 @@
+"""
+The tombstone log behind delta sync deletes.
+
+Deleting an employee or attendance record leaves a `Tombstone` in the same
+transaction (see `signals`), as does the batched purge of a removed
+employee's records. Other bulk deletions that bypass the ORM call
+`record_reset` instead. `compact` drops old tombstones; clients whose cursor
+is older than the compaction cutoff then have to sync from scratch.
+"""
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Tombstone
+
+
+def record_deleted(resource, object_id):
+    Tombstone.objects.create(resource=resource, object_id=object_id)
+
+
+def record_deleted_many(resource, object_ids):
+    Tombstone.objects.bulk_create([Tombstone(resource=resource, object_id=object_id) for object_id in object_ids])
+
+
+def record_reset(at=None):
+    """Invalidate every sync cursor issued before `at` (default: now)."""
+    Tombstone.objects.create(resource=Tombstone.RESET, deleted_at=at or timezone.now())
+
+
+def latest_reset():
+    """When the newest reset was recorded, or None."""
+    return Tombstone.objects.filter(resource=Tombstone.RESET).aggregate(latest=Max('deleted_at'))['latest']
+
+
+def compact(before):
+    """
+    Delete the tombstones older than `before`, leaving a reset at `before`
+    in their place. Returns the number deleted.
+    """
+    with transaction.atomic():
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=before).delete()
+        if deleted:
+            record_reset(before)
+    return deleted
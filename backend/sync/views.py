@@ -0,0 +1,45 @@
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from hrms_lite.pagination import PaginationError, get_page_size
+from hrms_lite.renderers import fast_json_response
+from .changes import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, CursorExpired, changes
+
+
+@api_view(['GET'])
+def sync_changes(request):
+    """
+    GET: Employees and attendance records created, updated or deleted since
+         `cursor` (omit it for a full sync), up to `page_size` per stream.
+         Repeat with `next` while `has_more` is true.
+    """
+    try:
+        limit = get_page_size(request.query_params, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        data, next_cursor, has_more = changes(request.query_params.get('cursor'), limit)
+    except PaginationError as exc:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 400,
+                'message': 'Invalid pagination parameters',
+                'details': {'pagination': [str(exc)]}
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except CursorExpired:
+        return Response({
+            'success': False,
+            'error': {
+                'status_code': 410,
+                'message': 'Sync cursor expired',
+                'details': {'cursor': ['Changes since this cursor are no longer available; sync again without a cursor.']}
+            }
+        }, status=status.HTTP_410_GONE)
+
+    return fast_json_response(request, {
+        'success': True,
+        'count': len(data['employees']) + len(data['attendance'])
+                 + len(data['deleted']['employees']) + len(data['deleted']['attendance']),
+        'has_more': has_more,
+        'next': next_cursor,
+        'data': data
+    })